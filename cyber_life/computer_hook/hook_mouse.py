@@ -1,13 +1,15 @@
 from functools import lru_cache
-from random import random
 
 from PIL import ImageGrab
 from pynput.mouse import Listener
 
+from cyber_life.service.rng import RNG
 from cyber_life.service.settings import SETTINGS
 from cyber_life.static import TANK_SCREEN_WIDTH
 from cyber_life.tools.singleton import SingletonMeta
 
+_random = RNG.stream('mouse_hook')
+
 
 class MouseHook(metaclass=SingletonMeta):
     """
@@ -41,7 +43,7 @@ class MouseHook(metaclass=SingletonMeta):
         if button == button.left and pressed:
             # 将鼠标相对于屏幕的x位置转换为相对于小鱼缸窗口的位置
             cyber_x = x / self.screen_width * TANK_SCREEN_WIDTH
-            if 0 < cyber_x < TANK_SCREEN_WIDTH and random() < SETTINGS.put_food_rate:  # 点击后只有一定概率产生食物
+            if 0 < cyber_x < TANK_SCREEN_WIDTH and _random.random() < SETTINGS.put_food_rate:  # 点击后只有一定概率产生食物
                 self.life_manager.add_food(cyber_x)  # 按鼠标相对屏幕位置映射食物在鱼缸中出现位置
 
     def start(self):
@@ -7,10 +7,12 @@ from abc import abstractmethod, ABCMeta
 class Inspector(metaclass=ABCMeta):
     """
     抽象类，用于检测计算机信息。
-    每一个检测者都将会开启一个线程，每隔一段时间（INSPECTION_INTERVAL）检测一次。
+    所有检测者由同一个调度线程（InspectionScheduler）调度，每隔一段时间（INSPECTION_INTERVAL）检测一次。
+    构造时不要检测，先给出一个中性的占位结果，第一次检测放到后台线程里，避免拖慢启动。
     """
 
     INSPECTION_INTERVAL = 1  # 检测间隔，单位为秒
+    IS_SLOW = False  # 检测是否很慢，慢的检测放到线程池中运行，不阻塞调度线程
 
     @abstractmethod
     def inspect(self):
@@ -1,5 +1,4 @@
-from typing import List
-
+import numpy as np
 import psutil
 
 from .inspector_abc import Inspector
@@ -10,12 +9,15 @@ class InspectorCpu(Inspector):
 
     def __init__(self):
         super().__init__()
-        self.performance_percent_per_core = [0.0 for _ in range(psutil.cpu_count())]
+        self.performance_percent_per_core = np.zeros(psutil.cpu_count())
 
     def inspect(self):
         new_cpu_percent = psutil.cpu_percent(interval=None, percpu=True)
-        for i in range(len(new_cpu_percent)):
-            self.performance_percent_per_core[i] = new_cpu_percent[i] / 100.0
+        # 整体替换数组，界面线程拿到的永远是一份完整的结果
+        self.performance_percent_per_core = np.asarray(new_cpu_percent, dtype=np.float64) / 100.0
 
-    def get_current_result(self) -> List[float]:
+    def get_current_result(self) -> np.ndarray:
+        """
+        :return: 每个核的使用率 0 ~ 1.0
+        """
         return self.performance_percent_per_core
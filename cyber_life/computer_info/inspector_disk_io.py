@@ -7,8 +7,8 @@ from .inspector_abc import Inspector
 
 class DiskIoResult:
     def __init__(self, read_bytes: int, write_bytes: int):
-        self.read_bytes: int = read_bytes  # in KB
-        self.write_bytes: int = write_bytes  # in KB
+        self.read_bytes: int = read_bytes  # in KB/s
+        self.write_bytes: int = write_bytes  # in KB/s
 
 
 class InspectorDiskIO(Inspector):
@@ -20,11 +20,25 @@ class InspectorDiskIO(Inspector):
     def __init__(self):
         super().__init__()
         self.current_result = DiskIoResult(0, 0)
+        # 上一次采样的计数器和时间，速度由两次采样之间的差值计算，不需要在 inspect 里 sleep
+        self._last_counters = None
+        self._last_time = 0.0
 
     def inspect(self):
-        disk_io_first = psutil.disk_io_counters()
-        time.sleep(0.5)
-        disk_io_second = psutil.disk_io_counters()
-        read_bytes = (disk_io_second.read_bytes - disk_io_first.read_bytes) / 1024
-        write_bytes = (disk_io_second.write_bytes - disk_io_first.write_bytes) / 1024
+        counters = psutil.disk_io_counters()
+        now = time.monotonic()
+        # 没有磁盘（比如某些容器里）时返回 None
+        if counters is None:
+            return
+
+        last_counters, last_time = self._last_counters, self._last_time
+        self._last_counters, self._last_time = counters, now
+
+        # 第一次采样，没有可以比较的数据
+        if last_counters is None or now <= last_time:
+            return
+
+        interval = now - last_time
+        read_bytes = max(counters.read_bytes - last_counters.read_bytes, 0) / 1024 / interval
+        write_bytes = max(counters.write_bytes - last_counters.write_bytes, 0) / 1024 / interval
         self.current_result = DiskIoResult(round(read_bytes), round(write_bytes))
@@ -20,7 +20,6 @@ class InspectorMemory(Inspector):
     def __init__(self):
         super().__init__()
         self.memory_info = MemoryInfo(0, 0, 0, 0)
-        self.inspect()
 
     def inspect(self):
         self.memory_info = MemoryInfo(
@@ -18,59 +18,32 @@ class NetworkSpeed:
 
 
 class InspectorNetwork(Inspector):
-    INSPECTION_INTERVAL = 1
+    INSPECTION_INTERVAL = 0.5
 
     def __init__(self):
         super().__init__()
         self.network_speeds = NetworkSpeed(0, 0)
-        self.inspect()
+        # 上一次采样的计数器和时间，速度由两次采样之间的差值计算，不需要在 inspect 里 sleep
+        self._last_stats = None
+        self._last_time = 0.0
 
     def get_current_result(self) -> NetworkSpeed:
         return self.network_speeds
 
     def inspect(self):
-        # 这是新的 inspect 方法
-        # 旧的改名为 _old_inspect
-        # 不确定新的是否在所有电脑上都能正常工作，所以保留旧的
-        # TODO: 移除 _old_inspect 方法
-
-        interval = 0.5  # 采样间隔
-
-        # 采样网络信息
-
         # psutil.net_io_counters() 函数 pernic=False 表示获取所有网络接口的统计信息
         # 已经求和，无需遍历
+        stats = psutil.net_io_counters()
+        now = time.monotonic()
 
-        first_stats = psutil.net_io_counters()
-        time.sleep(interval)  # 等待指定时间间隔
-        second_stats = psutil.net_io_counters()
-
-        # 更新网络速度
-        self.network_speeds.sent_speed = (second_stats.bytes_sent - first_stats.bytes_sent) / interval
-        self.network_speeds.recv_speed = (second_stats.bytes_recv - first_stats.bytes_recv) / interval
-
-    def _old_inspect(self):
-        interval = 0.5  # 采样间隔
-        first_stats = psutil.net_io_counters(pernic=True)
-        time.sleep(interval)  # 等待指定时间间隔
-        second_stats = psutil.net_io_counters(pernic=True)
-
-        network_speeds = {}
-        for interface in set(first_stats.keys()).intersection(second_stats.keys()):
-            sent_diff = second_stats[interface].bytes_sent - first_stats[interface].bytes_sent
-            recv_diff = second_stats[interface].bytes_recv - first_stats[interface].bytes_recv
-            network_speeds[interface] = {
-                'sent_speed': sent_diff / interval,
-                'recv_speed': recv_diff / interval,
-            }
-
-        # 直接将字典中每一项累加
-        # 这样网络信息可能来自无线，有线，以太网，所以需要遍历所有接口
+        last_stats, last_time = self._last_stats, self._last_time
+        self._last_stats, self._last_time = stats, now
 
-        self.network_speeds.reset()  # 一定要先重置
+        # 第一次采样，没有可以比较的数据
+        if last_stats is None or now <= last_time:
+            return
 
-        for k, v in network_speeds.items():
-            self.network_speeds.sent_speed += v['sent_speed']
-            self.network_speeds.recv_speed += v['recv_speed']
-            print(k, v)
-        print("\n" * 4)
+        interval = now - last_time
+        # 网卡被禁用或重置时计数器会归零，此时差值为负，当作 0 处理
+        self.network_speeds.sent_speed = max(stats.bytes_sent - last_stats.bytes_sent, 0) / interval
+        self.network_speeds.recv_speed = max(stats.bytes_recv - last_stats.bytes_recv, 0) / interval
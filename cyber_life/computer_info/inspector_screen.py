@@ -1,19 +1,48 @@
 import logging
-from random import randint
 
-from PIL import ImageGrab
+import numpy as np
+from PIL import Image, ImageGrab, ImageStat
 
 from .inspector_abc import Inspector
 
 lg = logging.getLogger(__name__)
 
+# Rec.709 亮度系数，人眼对绿色最敏感，对蓝色最不敏感
+LUMA_WEIGHTS = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def get_brightness(im: Image.Image, stride: int = 1) -> float:
+    """
+    计算图片的平均感知亮度，[0, 1]
+    先在 C 里每隔 stride 个像素取一个（最近邻缩小），再在 C 里统计每个通道的直方图得到平均值，
+    不需要在 Python 里逐个像素取值，也不需要把像素复制成 NumPy 数组
+    平均亮度等于各通道平均值的加权和，所以只需要对三个平均值加权
+
+    :param im: 图片
+    :param stride: 采样步长，每 stride x stride 个像素取一个
+    """
+
+    if stride > 1:
+        width, height = im.size
+        im = im.resize((max(width // stride, 1), max(height // stride, 1)), Image.NEAREST)
+    if im.mode not in ('RGB', 'RGBA'):
+        im = im.convert('RGB')
+    # RGBA 的第四个通道是透明度，不参与计算
+    channel_mean = ImageStat.Stat(im).mean[:3]
+    return float(np.dot(channel_mean, LUMA_WEIGHTS)) / 255
+
 
 class InspectorScreen(Inspector):
     INSPECTION_INTERVAL = 5
+    IS_SLOW = True  # 截屏很慢
+    SAMPLE_STRIDE = 8  # 采样步长，4K 屏幕只取 480x270 个像素
 
     def __init__(self):
         super().__init__()
         self.screen_brightness = 0.0
+        # 检测的区域 (left, top, right, bottom)，桌面坐标，一般是小鱼缸所在的那块屏幕
+        # None 表示主屏幕
+        self.region: tuple[int, int, int, int] | None = None
 
     def get_current_result(self) -> float:
         return self.screen_brightness
@@ -21,16 +50,10 @@ class InspectorScreen(Inspector):
     def inspect(self):
         # 因为发现休眠后会因为捕捉不到屏幕而报错，线程终止，无法更新系统信息
         try:
-            im = ImageGrab.grab()
-            width, height = im.size
-            screen_brightness = 0.0
-            for i in range(100):
-                x = randint(0, width - 1)
-                y = randint(0, height - 1)
-                r, g, b = im.getpixel((x, y))
-                screen_brightness += (r + g + b) / 3.0 / 255.0
-            screen_brightness /= 100.0
-            self.screen_brightness = screen_brightness
+            region = self.region
+            # all_screens 只在 Windows 下有效，region 可能在副屏上，需要截取所有屏幕再裁剪
+            im = ImageGrab.grab(bbox=region, all_screens=region is not None)
+            self.screen_brightness = get_brightness(im, self.SAMPLE_STRIDE)
         except OSError:
             # 捕捉不到屏幕，屏幕亮度为0
             lg.warning('无法捕捉到屏幕，可能是因为系统休眠')
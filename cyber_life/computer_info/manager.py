@@ -1,7 +1,3 @@
-import time
-from threading import Thread, Event
-from typing import List, Callable
-
 from cyber_life.tools.singleton import SingletonMeta
 from .inspector_abc import Inspector
 from .inspector_cpu import InspectorCpu
@@ -10,6 +6,7 @@ from .inspector_disk_usage import InspectorDiskUsage
 from .inspector_memory import InspectorMemory
 from .inspector_network import InspectorNetwork
 from .inspector_screen import InspectorScreen
+from .scheduler import InspectionScheduler, InspectionStats
 
 
 class _SystemInfoManager(metaclass=SingletonMeta):
@@ -24,52 +21,41 @@ class _SystemInfoManager(metaclass=SingletonMeta):
     INSPECTOR_DISK_IO = InspectorDiskIO()
 
     def __init__(self):
-        self._interval_functions: List[Callable] = []
-        self._is_running = False
-        self._threads: List[Thread] = []
-        self._event: Event = Event()
+        # 所有监测者共用一个调度线程
+        self._scheduler = InspectionScheduler()
+        # 属性名 -> 监测者
+        self.inspectors: dict[str, Inspector] = {}
 
-        # 先初始化所有监测者的线程调用函数
         for attr in dir(self):  # 获取实例的属性、方法列表（字符串形式）
             # 找到'INSPECTOR_'开头的属性和方法，并判断是否是Inspector类的实例
             if attr.startswith('INSPECTOR_') and isinstance(instance := getattr(self, attr), Inspector):
-                self._interval_functions.append(
-                    self._get_interval_function(  # 创建定时器，周期执行监控类实例的inspect方法
-                        instance.inspect,
-                        instance.INSPECTION_INTERVAL,
-                    )
-                )
-        # 初始化线程列表
-        for function in self._interval_functions:
-            self._threads.append(Thread(target=function, daemon=True))
+                self.inspectors[attr] = instance
+                self._scheduler.add(instance)
 
     def start(self):
         """
         让自身的每一个监测者开始监测
         :return:
         """
-        if self._is_running:
-            return
 
-        # 启动所有监测者的线程
-        for thread in self._threads:
-            thread.start()
-        self._is_running = True
+        self._scheduler.start()
+
+    def stop(self):
+        self._scheduler.stop()
 
-    @staticmethod
-    def _get_interval_function(inspect_function: Callable, interval=1):
-        """获取定时器函数"""
+    def set_interval_scale(self, scale: float):
+        """
+        把所有监测者的检测间隔放大 scale 倍，1 表示恢复正常
+        """
 
-        def timer_function():
-            while True:
-                inspect_function()
-                time.sleep(interval)
+        self._scheduler.set_interval_scale(scale)
 
-        return timer_function
+    def get_inspection_stats(self) -> dict[str, InspectionStats]:
+        """
+        获取每个监测者的检测耗时和超时次数，以监测者类名为键
+        """
 
-    def stop(self):
-        # 暂不需要，因为 daemon=True 的线程会自动结束
-        pass
+        return self._scheduler.stats
 
 
 SYSTEM_INFO_MANAGER = _SystemInfoManager()
@@ -0,0 +1,218 @@
+"""
+监测调度器
+所有监测者共用一个调度线程，按照各自的检测间隔（INSPECTION_INTERVAL）排成一个截止时间的小根堆，
+到期的监测者依次检测。比较慢的监测者（比如截屏）交给一个小线程池，不阻塞调度线程。
+"""
+import heapq
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Thread, Event, Lock
+
+from .inspector_abc import Inspector
+
+lg = logging.getLogger(__name__)
+
+
+class InspectionStats:
+    """
+    单个监测者的统计信息
+    """
+
+    __slots__ = ('count', 'overrun_count', 'last_latency', 'max_latency', 'total_latency')
+
+    def __init__(self):
+        # 检测次数
+        self.count = 0
+        # 超时次数，即错过了的截止时间的个数
+        self.overrun_count = 0
+        # 检测耗时，单位为秒
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        """
+        平均检测耗时，单位为秒
+        """
+
+        return self.total_latency / self.count if self.count else 0.0
+
+    def record(self, latency: float):
+        self.count += 1
+        self.last_latency = latency
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(count={self.count}, overrun_count={self.overrun_count}, '
+                f'average_latency={self.average_latency:.4f}, max_latency={self.max_latency:.4f})')
+
+
+class InspectionScheduler:
+    """
+    监测调度器
+
+    截止时间按照 开始时间 + n * 间隔 计算，不受每次检测耗时的影响，所以不会越跑越慢。
+    如果检测太慢错过了截止时间，直接跳到下一个还没过去的截止时间，并记为超时。
+    间隔可以整体放大（比如窗口隐藏时），缩小时所有监测者立即重新检测一次。
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """
+        :param max_workers: 运行慢速监测者的线程池大小
+        """
+
+        self._inspectors: list[Inspector] = []
+        # 小根堆，元素为 (截止时间, 序号, 监测者)，序号保证截止时间相同时不去比较监测者
+        self._queue: list[tuple[float, int, Inspector]] = []
+        self._counter = itertools.count()
+        self._max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        # 线程池中正在运行的检测
+        self._futures: dict[Inspector, Future] = {}
+
+        # 所有监测者的间隔都乘以这个倍数
+        self.interval_scale = 1.0
+        self._pending_interval_scale: float | None = None
+
+        self._thread: Thread | None = None
+        self._stop_event = Event()
+        # 用于打断调度线程的等待，比如间隔倍数改变了
+        self._wakeup_event = Event()
+        self._stats_lock = Lock()
+        # 以监测者的类名为键
+        self.stats: dict[str, InspectionStats] = {}
+
+    def add(self, inspector: Inspector):
+        """
+        添加一个监测者，需要在 start 之前调用
+        """
+
+        assert self._thread is None, '调度器启动后不能再添加监测者'
+
+        self._inspectors.append(inspector)
+        self.stats[inspector.__class__.__name__] = InspectionStats()
+
+    def start(self):
+        """
+        启动调度线程，所有监测者立即进行第一次检测
+        """
+
+        if self._thread is not None:
+            return
+
+        if any(inspector.IS_SLOW for inspector in self._inspectors):
+            self._executor = ThreadPoolExecutor(self._max_workers, thread_name_prefix='inspector')
+
+        now = time.monotonic()
+        for inspector in self._inspectors:
+            heapq.heappush(self._queue, (now, next(self._counter), inspector))
+
+        self._thread = Thread(target=self._loop, name='inspection-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        停止调度，等待调度线程中正在运行的检测结束，线程池中的检测不等待
+        """
+
+        self._stop_event.set()
+        self._wakeup_event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=1)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def set_interval_scale(self, scale: float):
+        """
+        把所有监测者的检测间隔放大 scale 倍，可以在其它线程中调用
+        放大时已经排好的下一次检测不变，之后按新的间隔；缩小时所有监测者立即检测一次，避免显示过时的结果
+        """
+
+        assert scale > 0
+        self._pending_interval_scale = scale
+        self._wakeup_event.set()
+
+    def _apply_interval_scale(self):
+        scale = self._pending_interval_scale
+        self._pending_interval_scale = None
+        if scale is None or scale == self.interval_scale:
+            return
+        if scale < self.interval_scale:
+            now = time.monotonic()
+            self._queue = [(now, counter, inspector) for _, counter, inspector in self._queue]
+            heapq.heapify(self._queue)
+        self.interval_scale = scale
+
+    def _loop(self):
+        if not self._queue:
+            return
+        while not self._stop_event.is_set():
+            if self._wakeup_event.is_set():
+                self._wakeup_event.clear()
+                self._apply_interval_scale()
+                continue
+
+            deadline, _, inspector = self._queue[0]
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                self._wakeup_event.wait(delay)
+                continue
+
+            heapq.heappop(self._queue)
+            if inspector.IS_SLOW:
+                self._submit(inspector)
+            else:
+                self._run(inspector)
+            heapq.heappush(self._queue, (self._next_deadline(inspector, deadline), next(self._counter), inspector))
+
+    def _next_deadline(self, inspector: Inspector, deadline: float) -> float:
+        """
+        计算下一个截止时间，跳过已经错过的
+        """
+
+        interval = inspector.INSPECTION_INTERVAL * self.interval_scale
+        next_deadline = deadline + interval
+        now = time.monotonic()
+        if next_deadline <= now:
+            missed = int((now - next_deadline) // interval) + 1
+            next_deadline += missed * interval
+            with self._stats_lock:
+                self.stats[inspector.__class__.__name__].overrun_count += missed
+        return next_deadline
+
+    def _submit(self, inspector: Inspector):
+        """
+        把慢速检测交给线程池，上一次还没结束就跳过这一次
+        """
+
+        future = self._futures.get(inspector)
+        if future is not None and not future.done():
+            with self._stats_lock:
+                self.stats[inspector.__class__.__name__].overrun_count += 1
+            return
+        try:
+            self._futures[inspector] = self._executor.submit(self._run, inspector)
+        except RuntimeError:
+            # 线程池已经关闭，调度器正在停止
+            pass
+
+    def _run(self, inspector: Inspector):
+        """
+        检测一次，并记录耗时
+        监测者抛出的异常只记录日志，不能让调度线程终止
+        """
+
+        start = time.perf_counter()
+        try:
+            inspector.inspect()
+        except Exception as e:
+            lg.error(f'{inspector.__class__.__name__} 检测失败: {e}')
+        latency = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.stats[inspector.__class__.__name__].record(latency)
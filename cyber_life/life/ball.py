@@ -1,95 +1,196 @@
-from random import random, randint
+import numpy as np
+from PyQt5.QtGui import QPainter, QColor
 
-from PyQt5.QtGui import QPainter, QColor, QPen
-
-from cyber_life.tools.compute import lerp
+from cyber_life.service.rng import RNG
+from cyber_life.tools.color import ColorRamp
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_cache import PAINT_CACHE
+from cyber_life.tools.progress_bar import ProgressFloatArray
 from cyber_life.tools.vector import Vector
-from .life_mixin.breathable_mixin import BreathableMixin
-from .life_mixin.organism_mixin import OrganismMixin
+from .gas_ledger import GAS_LEDGER, OXYGEN, CARBON_DIOXIDE
 from .tank import LIFE_TANK
 
+_random = RNG.stream('ball')
+
 
-class LifeBall(BreathableMixin, OrganismMixin):
+class LifeBallGroup:
     """
-    生物球，用于反应CPU每个核的使用状态
+    一群生物球，每个生物球反应CPU一个核的使用状态
     可以看作生物球是一个绿色植物细胞
     当CPU核处于运算状态时，生物球的呼吸作用会显著，颜色变黄，移动速度增加，体积变大，表示兴奋。
     当CPU核处于空闲状态时，生物球没有呼吸作用，光合作用主导，颜色变绿。
+
+    核数很多的机器上会有几百个生物球，所以不再给每个球建一个对象，
+    而是把所有球的位置、速度、活跃度、颜色等按列存在 NumPy 数组里，每帧用向量运算一次更新全部球。
+    第 i 个球的数据就是每个数组的第 i 行。
     """
 
-    def __init__(self):
-        super().__init__()
-        x = randint(0, LIFE_TANK.width)
-        y = randint(
-            round(LIFE_TANK.division[0]),
-            round(LIFE_TANK.division[1])
-        )
-        # 球心坐标
-        self.location = Vector(x, y)
-        self.radius = 4
-        # 随机速度
-        self.velocity = Vector(random() * 2 - 1, random() * 2 - 1).normalize() * 0.1
-        self.acceleration = Vector(0, 0)
+    SPECIES = 'LifeBall'
+    RADIUS = 4
+    # 一次光合作用请求量
+    CO2_PRE_REQUEST = 0.04
+    # 一次呼吸作用请求量的基础值，还要加上活跃程度
+    O2_PRE_REQUEST_BASE = 0.01
+    ENERGY_MAX = 1_0000
+    # 颜色随活跃程度从默认颜色渐变到活跃颜色，预先分好级
+    COLOR_RAMP = ColorRamp((QColor(10, 150, 10, 255), QColor(255, 255, 0, 255)))
+    COLOR_BORDER = (23, 76, 23)
 
+    def __init__(self, count: int):
+        self.count = count
+        locations = []
+        velocities = []
+        for _ in range(count):
+            x = _random.randint(0, LIFE_TANK.width)
+            y = _random.randint(
+                round(LIFE_TANK.division[0]),
+                round(LIFE_TANK.division[1])
+            )
+            velocity = Vector(_random.random() * 2 - 1, _random.random() * 2 - 1).normalize() * 0.1
+            locations.append((x, y))
+            velocities.append((velocity.x, velocity.y))
+
+        # 球心坐标，shape = (count, 2)
+        self.location = np.array(locations, dtype=np.float64).reshape(count, 2)
+        # 上一帧的球心坐标，绘制时在上一帧和这一帧之间插值
+        self.previous_location = self.location.copy()
+        # 速度，shape = (count, 2)
+        self.velocity = np.array(velocities, dtype=np.float64).reshape(count, 2)
         # 活跃程度，越大越活跃 0 ~ 1.0
-        self.activity = 0.0
-        # 界定颜色变化的范围
-        self.color_default = QColor(10, 150, 10)
-        self.color_active = QColor(255, 255, 0)
-
-        # 固定的碳
-        self.fixed_carbon = 100
-        self.o2_pre_request = 0.01
-        self.co2_pre_request = 0.04
-
-    def set_activity(self, activity):
-        assert isinstance(activity, float)
-
-        self.activity = activity
-        # 让速度方向向垂直向上的方向旋转一定程度
-        self.velocity = self.velocity.rotate(activity * 15)
+        self.activity = np.zeros(count)
+        # 体内固定的碳
+        self.carbon = np.zeros(count)
+        # 能量，0 ~ ENERGY_MAX
+        self.energy = ProgressFloatArray(np.zeros(count), self.ENERGY_MAX)
+        self.o2_pre_request = np.full(count, self.O2_PRE_REQUEST_BASE)
+        # 这一帧向气体账本请求的量，结算时用
+        self._o2_request = np.zeros(count)
+        self._o2_request_total = 0.0
+        # 填充颜色在 COLOR_RAMP 中的级数，shape = (count,)
+        self.color_indices = self.COLOR_RAMP.indices(self.activity)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def set_activity(self, activity: np.ndarray):
+        """
+        设置每个球的活跃程度，一般直接传入 InspectorCpu 的结果
+        结果比球少时，多出来的球保持原来的活跃程度；结果比球多时，多出来的结果被忽略
+        """
+
+        n = min(self.count, len(activity))
+        self.activity[:n] = activity[:n]
+
+        # 让速度方向向垂直向上的方向旋转一定程度，和 Vector.rotate 一样把三角函数值保留 15 位小数
+        theta = np.radians(self.activity * 15)
+        cos_theta = np.round(np.cos(theta), 15)
+        sin_theta = np.round(np.sin(theta), 15)
+        vx = self.velocity[:, 0].copy()
+        vy = self.velocity[:, 1]
+        self.velocity[:, 0] = vx * cos_theta - vy * sin_theta
+        self.velocity[:, 1] = vx * sin_theta + vy * cos_theta
+
         # 让活跃度和呼吸作用相关联
-        self.o2_pre_request = 0.01 + self.activity
+        np.add(self.activity, self.O2_PRE_REQUEST_BASE, out=self.o2_pre_request)
+        self.color_indices = self.COLOR_RAMP.indices(self.activity)
+
+    def save_previous_state(self):
+        """
+        记下这一帧的位置，作为下一帧绘制时插值的起点
+        """
+
+        self.previous_location[:] = self.location
+
+    def render_location(self, blend: float = 1.0) -> np.ndarray:
+        """
+        绘制时的球心坐标，在上一帧和这一帧之间插值，blend 为 1 时就是这一帧的位置
+        """
+
+        if blend >= 1:
+            return self.location
+        return self.previous_location + (self.location - self.previous_location) * blend
 
     def tick(self):
-        self.velocity += self.acceleration
-        self.location += self.velocity * (1 + self.activity * 50)
+        self.save_previous_state()
+        self.location += self.velocity * (1 + self.activity * 50)[:, np.newaxis]
+
+        x = self.location[:, 0]
+        y = self.location[:, 1]
+        vx = self.velocity[:, 0]
+        vy = self.velocity[:, 1]
         # 左右边界检测
-        if self.location.x - self.radius < 0:
-            self.velocity.x = abs(self.velocity.x)
-        elif self.location.x + self.radius > LIFE_TANK.width:
-            self.velocity.x = -abs(self.velocity.x)
+        too_left = x - self.RADIUS < 0
+        too_right = ~too_left & (x + self.RADIUS > LIFE_TANK.width)
+        vx[too_left] = np.abs(vx[too_left])
+        vx[too_right] = -np.abs(vx[too_right])
         # 上下边界检测
         # 高出水位线，必须让球掉入水中
-        if self.location.y < LIFE_TANK.division[0]:
-            self.velocity.y = abs(self.velocity.y)
-            self.location.y = LIFE_TANK.division[0]
+        water_top = LIFE_TANK.division[0]
+        too_high = y < water_top
+        vy[too_high] = np.abs(vy[too_high])
+        y[too_high] = water_top
         # 低于缸底，必须让球回到缸底
-        if self.location.y > LIFE_TANK.division[1] - self.radius:
-            self.velocity.y = -abs(self.velocity.y)
-            self.location.y = LIFE_TANK.division[1] - self.radius
+        bottom = LIFE_TANK.division[1] - self.RADIUS
+        too_low = y > bottom
+        vy[too_low] = -np.abs(vy[too_low])
+        y[too_low] = bottom
 
         # 光合优先于呼吸
-        self.photosynthesis()
-        self.breath()
-
-    def paint(self, painter: QPainter):
-        # 设置画笔颜色和线条宽度
-        pen = QPen(QColor(23, 76, 23))
-        pen.setWidth(2)  # 设置线条宽度为2像素
-        painter.setPen(pen)
-
-        # 设置画刷颜色和样式
-        painter.setBrush(
-            lerp(
-                self.color_default,
-                self.color_active,
-                self.activity
-            )
-        )
-        painter.drawEllipse(
-            round(self.location.x - self.radius),
-            round(self.location.y - self.radius),
-            round(self.radius * 2 + (self.activity * 20)),
-            round(self.radius * 2 + (self.activity * 20))
-        )
+        self._exchange_gas()
+
+    def _exchange_gas(self):
+        """
+        所有球的光合作用和呼吸作用，整群球向气体账本各请求一次
+        帧末结算时每个球分到同样比例的气体，再按比例增加碳、能量
+        """
+
+        # 光合作用 CO2 --light--> O2 + C
+        co2_cost = self.CO2_PRE_REQUEST * LIFE_TANK.light_brightness_current
+        GAS_LEDGER.consume(self.SPECIES, CARBON_DIOXIDE, co2_cost * self.count, self._on_carbon_dioxide_granted)
+
+        # 呼吸作用 O2 + C --> CO2 + 100能量，体内没有足够的碳的球不呼吸
+        self._o2_request = np.where(self.o2_pre_request <= self.carbon, self.o2_pre_request, 0.0)
+        self._o2_request_total = float(self._o2_request.sum())
+        GAS_LEDGER.consume(self.SPECIES, OXYGEN, self._o2_request_total, self._on_oxygen_granted)
+
+    def _on_carbon_dioxide_granted(self, amount: float):
+        GAS_LEDGER.produce(self.SPECIES, OXYGEN, amount)
+        self.carbon += amount / self.count
+
+    def _on_oxygen_granted(self, amount: float):
+        breath = self._o2_request * (amount / self._o2_request_total)
+        self.carbon -= breath
+        self.energy += breath * 100
+        GAS_LEDGER.produce(self.SPECIES, CARBON_DIOXIDE, amount)
+
+    @property
+    def colors(self) -> np.ndarray:
+        """
+        每个球的填充颜色，RGBA 整数，shape = (count, 4)
+        """
+
+        return self.COLOR_RAMP.rgba[self.color_indices]
+
+    def report_bounds(self, dirty: DirtyRegion, blend: float = 1.0):
+        """
+        报告每个球的外接矩形，边框线宽 2 像素，向外画出 1 像素
+        """
+
+        rects = np.empty((self.count, 4))
+        rects[:, :2] = self.render_location(blend) - self.RADIUS
+        rects[:, 2] = self.RADIUS * 2 + self.activity * 20
+        rects[:, 3] = rects[:, 2]
+        dirty.add_rects(rects, margin=1)
+
+    def paint(self, painter: QPainter, blend: float = 1.0):
+        # 设置画笔颜色和线条宽度为2像素，所有球共用
+        painter.setPen(PAINT_CACHE.pen(*self.COLOR_BORDER, width=2))
+
+        location = self.render_location(blend)
+        lefts = np.round(location[:, 0] - self.RADIUS).astype(np.int32).tolist()
+        tops = np.round(location[:, 1] - self.RADIUS).astype(np.int32).tolist()
+        sizes = np.round(self.RADIUS * 2 + self.activity * 20).astype(np.int32).tolist()
+        colors = self.COLOR_RAMP
+        for left, top, size, index in zip(lefts, tops, sizes, self.color_indices.tolist()):
+            painter.setBrush(colors[index])
+            painter.drawEllipse(left, top, size, size)
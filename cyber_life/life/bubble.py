@@ -1,60 +1,123 @@
-from random import random
-
+import numpy as np
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPainter
+from PyQt5.QtGui import QPen, QColor
 
-from cyber_life.tools.vector import Vector
-from .gas_manager import GAS_MANAGER
+from cyber_life.service.rng import RNG
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_batch import PaintBatch
+from cyber_life.tools.particle_pool import ParticlePool
+from .gas_ledger import GAS_LEDGER, OXYGEN, CARBON_DIOXIDE
 from .tank import LIFE_TANK
 
+_random = RNG.stream('bubble')
+
 
-class LifeBubble:
+class LifeBubbleGroup:
     """
-    单个气泡的类
+    一群气泡，由气泡流生成
+    上传网速很大时每帧都会生成气泡，所以不再给每个气泡建一个对象，
+    而是把位置、速度存在定长的粒子池里，每帧用向量运算一次更新全部气泡。
+    气泡只会竖直加速，水平方向只有随机的左右晃动，所以只存竖直方向的速度。
+    px、py 是上一帧的位置，绘制时在上一帧和这一帧之间插值。
     """
 
-    def __init__(self, x):
-        self.location = Vector(x, LIFE_TANK.division[1])
-        self.velocity = Vector(0, 0)
-        # 默认有一个向上的加速度，因为有浮力
-        self.acceleration = Vector(0, -0.01)
+    SPECIES = 'LifeBubble'
+    BUOYANCY = 0.01  # 浮力产生的向上的加速度
+    GAS_PRE_TICK = 0.01  # 每帧和水接触增加的氧气、二氧化碳
+    # 规定气泡大小的变化动态范围
+    RADIUS_MIN = 2
+    RADIUS_MAX = 4
+    PEN = QPen(QColor(Qt.cyan))
+
+    def __init__(self, capacity: int):
+        self.pool = ParticlePool(capacity, ('x', 'y', 'vy', 'px', 'py'))
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+    def spawn(self, x: float, y: float | None = None, vy: float = 0.0):
+        """
+        在缸底生成一个气泡，y 为 None 时在缸底
+        """
+
+        if y is None:
+            y = LIFE_TANK.division[1]
+        self.pool.spawn(x=x, y=y, vy=vy, px=x, py=y)
+
+    def clear(self):
+        self.pool.clear()
 
-        # 规定气泡大小的变化动态范围
-        self.radius_min = 2
-        self.radius_max = 4
-        # 当气泡脱离小鱼缸时，气泡变为死亡状态
-        self.is_alive = True
+    def locations(self, blend: float = 1.0) -> tuple[np.ndarray, np.ndarray]:
+        """
+        按生成顺序排列的所有气泡的 x, y
 
-    @property
-    def radius(self):
+        :param blend: 在上一帧和这一帧之间插值，1 是这一帧的位置
+        """
+
+        slots = self.pool.slots()
+        x, y = self.pool['x'][slots], self.pool['y'][slots]
+        if blend >= 1:
+            return x, y
+        px, py = self.pool['px'][slots], self.pool['py'][slots]
+        return px + (x - px) * blend, py + (y - py) * blend
+
+    def save_previous_state(self):
+        """
+        记下这一帧的位置，作为下一帧绘制时插值的起点
+        """
+
+        slots = self.pool.slots()
+        self.pool['px'][slots] = self.pool['x'][slots]
+        self.pool['py'][slots] = self.pool['y'][slots]
+
+    def radius(self, y: np.ndarray) -> np.ndarray:
         """
         气泡的半径大小，由自身位置在小鱼缸中的位置决定
         因为越接近水面，压强越小，气泡的半径越大。
         """
 
         # 气泡到达水面的进度 0~1
-        rate = (LIFE_TANK.division[1] - self.location.y) / (
-                LIFE_TANK.division[1] - LIFE_TANK.division[0])
-        return self.radius_min + (self.radius_max - self.radius_min) * rate
+        rate = (LIFE_TANK.division[1] - y) / (LIFE_TANK.division[1] - LIFE_TANK.division[0])
+        return self.RADIUS_MIN + (self.RADIUS_MAX - self.RADIUS_MIN) * rate
 
     def tick(self):
-        if self.location.y < LIFE_TANK.division[0]:
-            self.is_alive = False
-        self.velocity += self.acceleration
-        self.location += self.velocity
-        # 增加气泡左右随机移动的效果
-        self.location.x += (random() - 0.5) * 0.5
+        slots = self.pool.slots()
+        if len(slots) == 0:
+            return
+        x = self.pool['x']
+        y = self.pool['y']
+        vy = self.pool['vy']
+        # 记下上一帧的位置，和 save_previous_state 一样，不再重新取一次槽位
+        self.pool['px'][slots] = x[slots]
+        self.pool['py'][slots] = y[slots]
+        # 上一帧已经离开水面的气泡，这一帧再动一次之后消失
+        expired = slots[y[slots] < LIFE_TANK.division[0]]
+        vy[slots] -= self.BUOYANCY
+        y[slots] += vy[slots]
+        # 增加气泡左右随机移动的效果，按生成顺序取随机数
+        x[slots] += (np.array([_random.random() for _ in range(len(slots))]) - 0.5) * 0.5
 
         # 气泡在和水的接触中会增加气体
-        GAS_MANAGER.add_oxygen(0.01)
-        GAS_MANAGER.add_carbon_dioxide(0.01)
-
-    def paint(self, painter: QPainter):
-        painter.setPen(Qt.cyan)
-        painter.setBrush(Qt.NoBrush)
-        painter.drawEllipse(
-            round(self.location.x - self.radius),
-            round(self.location.y - self.radius),
-            round(2 * self.radius),
-            round(2 * self.radius)
-        )
+        gas = self.GAS_PRE_TICK * len(slots)
+        GAS_LEDGER.produce(self.SPECIES, OXYGEN, gas)
+        GAS_LEDGER.produce(self.SPECIES, CARBON_DIOXIDE, gas)
+
+        self.pool.kill(expired)
+
+    def report_bounds(self, dirty: DirtyRegion, blend: float = 1.0):
+        """
+        气泡排成一列，报告整列的外接矩形，不逐个报告
+        """
+
+        x, y = self.locations(blend)
+        if len(x) == 0:
+            return
+        left = x.min() - self.RADIUS_MAX
+        top = y.min() - self.RADIUS_MAX
+        dirty.add_rect(left, top, x.max() + self.RADIUS_MAX - left, y.max() + self.RADIUS_MAX - top)
+
+    def batch_paint(self, batch: PaintBatch, blend: float = 1.0):
+        x, y = self.locations(blend)
+        radius = self.radius(y)
+        rects = np.column_stack((x - radius, y - radius, 2 * radius, 2 * radius))
+        batch.add_ellipses('bubble', self.PEN, Qt.NoBrush, rects)
@@ -1,9 +1,8 @@
-from typing import List
-
-from PyQt5.QtGui import QPainter
-
 from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
-from .bubble import LifeBubble
+from cyber_life.static import MAX_BUBBLES
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_batch import PaintBatch
+from .bubble import LifeBubbleGroup
 
 
 class LifeBubbleFlow:
@@ -13,9 +12,9 @@ class LifeBubbleFlow:
     对气泡状态进行更新
     """
 
-    def __init__(self, x):
+    def __init__(self, x, capacity: int = MAX_BUBBLES):
         self.x = x
-        self.bubbles: List[LifeBubble] = []
+        self.bubbles = LifeBubbleGroup(capacity)
         self.time = 0
 
     @property
@@ -47,18 +46,19 @@ class LifeBubbleFlow:
 
         # 每隔一段时间，生成一个新的气泡
         if self.time % self.bubble_interval == 0:
-            self.bubbles.append(LifeBubble(self.x))
-        for bubble in self.bubbles:
-            bubble.tick()
-        # 移除消亡的气泡
-        self.bubbles = [bubble for bubble in self.bubbles if bubble.is_alive]
+            self.bubbles.spawn(self.x)
+        # 离开水面的气泡在这里消失，槽位留给之后的气泡
+        self.bubbles.tick()
 
         self.time += 1
 
-    def paint(self, painter: QPainter):
+    def report_bounds(self, dirty: DirtyRegion, blend: float = 1.0):
+        self.bubbles.report_bounds(dirty, blend)
+
+    def batch_paint(self, batch: PaintBatch, blend: float = 1.0):
         """
         绘制
+        :param blend: 在上一帧和这一帧之间插值，1 是这一帧的样子
         """
 
-        for bubble in self.bubbles:
-            bubble.paint(painter)
+        self.bubbles.batch_paint(batch, blend)
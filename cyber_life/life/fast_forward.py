@@ -0,0 +1,350 @@
+"""
+快进
+电脑睡眠、休眠之后，中间错过了几十万帧。按 100 帧/秒 逐帧补上要算很久，直接丢掉又像是时间停止了。
+快进不逐帧模拟，而是把变化缓慢的状态按解析式或者大步长一次推进：
+
+1. 水中的氧气、二氧化碳，生物球的碳和能量：一步之内每帧的请求量不变，按气体账本同样的规则按比例分配
+2. 鱼的能量、碳、体内氧气：每种行为状态下每帧的变化量是常数，一步推进到下一次状态切换（或者死亡、吃到食物）为止
+3. 食物：漂浮倒计时、下沉、被微生物分解，直接算出若干帧之后的位置和碳量
+4. 水草：每帧以固定的概率长出新节点，直接抽取这段时间里长了几次
+5. 小鱼缸的分界线、亮度：指数逼近目标值，直接算出若干帧之后的值
+
+生物球、鱼的位置、气泡、震荡波这些很快变化的状态不推进，快进之后正常的 tick 很快就会让它们恢复自然。
+"""
+import logging
+import math
+import time
+
+import numpy as np
+
+from cyber_life.service.rng import RNG
+from cyber_life.static import SIM_TICK_RATE
+from cyber_life.tools.singleton import SingletonMeta
+from .bubble import LifeBubbleGroup
+from .fish.guppy_fish import GuppyFish
+from .fish.state_enum import State
+from .gas_ledger import GAS_LEDGER, OXYGEN
+from .gas_manager import GAS_MANAGER
+from .plant import LifePlant
+from .tank import LIFE_TANK
+
+lg = logging.getLogger(__name__)
+_random = RNG.stream('plant')
+
+
+def ticks_until(value: float, rate: float, threshold: float) -> float:
+    """
+    value 每帧变化 rate，多少帧之后越过 threshold，永远不会越过时返回 inf
+
+    >>> ticks_until(10, -0.5, 8), ticks_until(10, 0.5, 8), ticks_until(1, 0.3, 2)
+    (4, inf, 4)
+    """
+
+    if rate < 0 < value - threshold:
+        return math.ceil((value - threshold) / -rate)
+    if rate > 0 > value - threshold:
+        return math.ceil((threshold - value) / rate)
+    return math.inf
+
+
+class FastForward(metaclass=SingletonMeta):
+    """
+    把小鱼缸快进若干帧，只能在两次 tick 之间调用
+    """
+
+    # 一步至少推进多少帧，鱼的状态频繁切换时也不会拆成太多步
+    MIN_STEP = 100
+    # 一次快进最多分成多少步，超过之后每一步的帧数相应变大
+    MAX_STEPS = 1000
+    # 一步之内光合作用和呼吸作用循环，二分查找光合作用分到的二氧化碳的次数
+    GAS_BISECTIONS = 40
+
+    def __init__(self):
+        # 最近一次快进的帧数、步数、耗时（秒）
+        self.last_ticks = 0
+        self.last_steps = 0
+        self.last_seconds = 0.0
+        # 上一步水中氧气满足需求的比例，用来估计鱼体内氧气的变化
+        self._oxygen_ratio = 1.0
+
+    def advance(self, life_manager, ticks: int):
+        """
+        快进 ticks 帧
+        """
+
+        if ticks <= 0:
+            return
+        # 快进的帧数由真实时间决定，也是外部输入，记录下来回放时才能得到同样的结果
+        if life_manager.input_hook is not None:
+            life_manager.input_hook.on_fast_forward(ticks)
+        start = time.perf_counter()
+
+        min_step = max(self.MIN_STEP, math.ceil(ticks / self.MAX_STEPS))
+        self._oxygen_ratio = GAS_LEDGER.grant_ratio[OXYGEN]
+        elapsed = 0
+        steps = 0
+        while elapsed < ticks:
+            remaining = ticks - elapsed
+            step = min(remaining, max(min_step, self._plan_step(life_manager, min_step)))
+            self._step(life_manager, step)
+            elapsed += step
+            steps += 1
+
+        self._grow_plant(life_manager.plant, ticks)
+        self._advance_tank(ticks)
+        life_manager.bubble_flow.time += ticks
+        # 快进是一下子跳过去的，插值绘制时不要画出中间的过程
+        life_manager.save_previous_state()
+
+        self.last_ticks = ticks
+        self.last_steps = steps
+        self.last_seconds = time.perf_counter() - start
+        lg.info(f'快进 {ticks} 帧（{ticks / SIM_TICK_RATE:.0f} 秒），分 {steps} 步，耗时 {self.last_seconds * 1000:.2f} ms')
+
+    # ---------------------------------------- 每一步 ----------------------------------------
+
+    @staticmethod
+    def _bubble_gas_rate(life_manager) -> float:
+        """
+        气泡每帧增加的氧气（也是二氧化碳），按稳定时水中的气泡数量估算
+        气泡从缸底匀加速上升到水面，水中的气泡数量 = 一个气泡的寿命 / 生成间隔
+        """
+
+        depth = max(LIFE_TANK.division[1] - LIFE_TANK.division[0], 0)
+        lifetime = math.sqrt(2 * depth / LifeBubbleGroup.BUOYANCY)
+        return lifetime / life_manager.bubble_flow.bubble_interval * LifeBubbleGroup.GAS_PRE_TICK
+
+    def _plan_step(self, life_manager, min_step: int) -> float:
+        """
+        和 tick 一样给每条鱼选择状态，返回距离下一个事件还有多少帧，到那时需要重新计算每帧的变化量
+        事件包括：鱼切换状态、死亡、吃到食物，食物被分解完，水中某种气体耗尽
+        """
+
+        from .fish.fake_ai import get_best_state
+        from .fish.state import set_state_params
+
+        events = [math.inf]
+        oxygen_demand = 0.0
+        for fish in life_manager.fish_list:
+            fish.die_if_improper()
+            fish.state = get_best_state(fish)
+            set_state_params(fish, fish.state)
+            events.append(self._fish_event(life_manager, fish))
+            oxygen_demand += fish.o2_pre_request
+
+        for food in life_manager.food_list:
+            events.append(max(food.float_remaining, 0) + food.carbon / food.microbe_decompose_speed)
+
+        # 假设每个请求都能满足，估计每帧气体的净变化
+        balls = life_manager.balls
+        bubble_rate = self._bubble_gas_rate(life_manager)
+        photosynthesis = balls.CO2_PRE_REQUEST * LIFE_TANK.light_brightness_current * balls.count
+        respiration = float(balls.o2_pre_request[balls.carbon > 0].sum())
+        gas_events = [
+            ticks_until(GAS_MANAGER.oxygen, bubble_rate + photosynthesis - respiration - oxygen_demand, 0),
+            ticks_until(GAS_MANAGER.carbon_dioxide, bubble_rate + respiration + oxygen_demand - photosynthesis, 0),
+        ]
+        # 已经快耗尽的气体在一步之内按比例分配就行了，不用再拆成很多小步
+        events.extend(event for event in gas_events if event > min_step)
+        return min(events)
+
+    def _fish_event(self, life_manager, fish: GuppyFish) -> float:
+        """
+        鱼在当前状态下多少帧之后需要重新选择状态
+        """
+
+        from .fish.state import SURFACE_OXYGEN_GAIN, SLEEP_ENERGY_GAIN
+
+        if fish.state == State.DEAD:
+            return math.inf
+
+        o2 = fish.o2_pre_request
+        oxygen_rate = (SURFACE_OXYGEN_GAIN if fish.state == State.SURFACE else 0) - o2 * (1 - self._oxygen_ratio)
+        energy_rate = o2 * 0.1 - fish.energy_pre_cost + (SLEEP_ENERGY_GAIN if fish.state == State.SLEEP else 0)
+        events = [
+            # 死亡
+            ticks_until(fish.carbon, -o2, o2),
+            ticks_until(fish.energy.current_value, energy_rate, fish.energy_pre_cost),
+            ticks_until(fish.oxygen.current_value, oxygen_rate, o2),
+            # 状态切换，阈值和 get_best_state 一致
+            ticks_until(fish.oxygen.rate, oxygen_rate / fish.oxygen.max_value, 0.2),
+            ticks_until(fish.oxygen.rate, oxygen_rate / fish.oxygen.max_value, 1),
+            ticks_until(fish.carbon, -o2, 500),
+            ticks_until(fish.energy.rate, energy_rate / fish.energy.max_value, 0.2),
+            ticks_until(fish.energy.rate, energy_rate / fish.energy.max_value, 0.8),
+        ]
+        if fish.state == State.FIND_FOOD:
+            food = fish.target_food or life_manager.choice_food_in_water(fish)
+            if food is not None:
+                events.append(math.ceil(max(fish.location.distance(food.location) - 10, 0) / fish.speed) + 1)
+        return min(events)
+
+    def _step(self, life_manager, ticks: int):
+        """
+        推进一步，这一步之内每帧的请求量不变
+        """
+
+        self._step_gas(life_manager, ticks)
+        self._step_food(life_manager, ticks)
+        for fish in life_manager.fish_list:
+            self._step_fish_motion(life_manager, fish, ticks)
+
+    def _step_gas(self, life_manager, ticks: int):
+        """
+        生物球的光合、呼吸和鱼的呼吸，规则和气体账本一样：
+        需求超过供给时每个请求按同样的比例分配，这一步中气泡、光合作用产生的气体也算在供给里
+        """
+
+        from .fish.state import SURFACE_OXYGEN_GAIN
+
+        balls = life_manager.balls
+        bubble_gas = self._bubble_gas_rate(life_manager) * ticks
+        fish_list = [fish for fish in life_manager.fish_list if fish.state != State.DEAD]
+        fish_oxygen = sum(fish.o2_pre_request for fish in fish_list) * ticks
+
+        # 光合作用产生的氧气和呼吸作用产生的二氧化碳互相是对方的来源，一大步之内要考虑这种循环
+        # 光合作用分到的二氧化碳 co2 越多，呼吸作用能分到的氧气越多，又产生越多的二氧化碳，
+        # 但二氧化碳的供给增加得比 co2 慢，所以满足 co2 <= 供给 的 co2 是一个区间 [0, 最大值]，二分查找最大值
+        co2_demand = balls.CO2_PRE_REQUEST * LIFE_TANK.light_brightness_current * ticks * balls.count
+        ball_o2_request = balls.o2_pre_request * ticks
+
+        def breathe(co2: float) -> tuple[np.ndarray, float]:
+            # 呼吸作用，体内的碳用完就不能再呼吸
+            ball_o2_demand = np.minimum(ball_o2_request, np.maximum(balls.carbon + co2 / balls.count, 0))
+            o2_demand = float(ball_o2_demand.sum()) + fish_oxygen
+            o2_supply = GAS_MANAGER.oxygen + bubble_gas + co2
+            ratio = 1.0 if o2_demand <= o2_supply else o2_supply / o2_demand
+            return ball_o2_demand * ratio, ratio
+
+        def co2_supply(co2: float) -> float:
+            return GAS_MANAGER.carbon_dioxide + bubble_gas + fish_oxygen + float(breathe(co2)[0].sum())
+
+        if co2_supply(co2_demand) >= co2_demand:
+            co2_granted = co2_demand
+        else:
+            low, high = 0.0, co2_demand
+            for _ in range(self.GAS_BISECTIONS):
+                middle = (low + high) / 2
+                if co2_supply(middle) >= middle:
+                    low = middle
+                else:
+                    high = middle
+            co2_granted = low
+        ball_breath, o2_ratio = breathe(co2_granted)
+        ball_breath_total = float(ball_breath.sum())
+
+        self._oxygen_ratio = o2_ratio
+        balls.carbon += co2_granted / balls.count - ball_breath
+        balls.energy += ball_breath * 100
+
+        # 鱼每帧先消耗体内的氧气，再从水中补充，水中不够时体内的氧气越来越少
+        for fish in fish_list:
+            o2 = fish.o2_pre_request * ticks
+            fish.carbon = max(fish.carbon - o2, 0.0)
+            fish.energy += o2 * 0.1 - fish.energy_pre_cost * ticks
+            fish.oxygen -= o2 * (1 - o2_ratio)
+            if fish.state == State.SURFACE:
+                fish.oxygen += SURFACE_OXYGEN_GAIN * ticks
+
+        GAS_MANAGER.carbon_dioxide += bubble_gas + ball_breath_total + fish_oxygen - co2_granted
+        GAS_MANAGER.oxygen += bubble_gas + co2_granted - ball_breath_total - fish_oxygen * o2_ratio
+
+    @staticmethod
+    def _step_food(life_manager, ticks: int):
+        """
+        食物先漂浮，漂浮倒计时结束后下沉，同时被微生物分解
+        """
+
+        water_top, bottom = LIFE_TANK.division[0], LIFE_TANK.division[1]
+        for food in life_manager.food_list:
+            floating = min(ticks, max(food.float_remaining, 0))
+            sinking = ticks - floating
+            food.float_remaining -= ticks
+            y = food.location.y
+            if floating:
+                if y < water_top:
+                    y = min(y + 2 * floating, water_top)
+                elif y < bottom:
+                    y = max(y - 0.1 * floating, water_top)
+                else:
+                    y = bottom
+            if sinking:
+                y = min(max(y, water_top) + 0.1 * sinking, bottom)
+                food.carbon -= food.microbe_decompose_speed * sinking
+            food.location.y = y
+            if food.carbon <= 0:
+                food.is_deleted = True
+
+        for food in life_manager.food_list:
+            if food.is_deleted:
+                life_manager.food_grid.remove(food)
+            else:
+                life_manager.food_grid.move(food, food.location.x, food.location.y)
+        life_manager.food_list = [food for food in life_manager.food_list if not food.is_deleted]
+
+    @staticmethod
+    def _step_fish_motion(life_manager, fish: GuppyFish, ticks: int):
+        """
+        鱼的位置只关心最后停在哪里：睡觉沉底、呼吸浮到水面、死了漂到水面、找食物游向食物
+        """
+
+        from .fish.state import SLEEP_ENERGY_GAIN
+
+        fish.time += ticks
+        fish.img_index_swim = (fish.img_index_swim + ticks // fish.animation_interval) % 10
+        if fish.target_food is not None and fish.target_food.is_deleted:
+            fish.target_food = None
+
+        if fish.state == State.SLEEP:
+            fish.location.y = LIFE_TANK.division[1] - (fish.height / 2 - 5)
+            fish.energy += SLEEP_ENERGY_GAIN * ticks
+        elif fish.state in (State.SURFACE, State.DEAD):
+            fish.location.y = LIFE_TANK.division[0] + (5 if fish.state == State.SURFACE else 0)
+        elif fish.state == State.FIND_FOOD:
+            food = fish.target_food or life_manager.choice_food_in_water(fish)
+            if food is None:
+                return
+            fish.target_food = food
+            fish.location_goal = food.location
+            fish.location.move_towards(food.location, fish.speed * ticks)
+            if fish.location.distance(food.location) <= 10:
+                fish.carbon += food.carbon
+                food.is_deleted = True
+                fish.target_food = None
+                fish.location_goal = fish.get_random_location()
+                life_manager.food_grid.remove(food)
+                life_manager.food_list.remove(food)
+
+    # ---------------------------------------- 整段推进 ----------------------------------------
+
+    @staticmethod
+    def _grow_plant(plant: LifePlant, ticks: int):
+        """
+        水草每帧以 GROW_PROBABILITY 的概率生长，两次生长间隔的帧数服从几何分布，直接抽取
+        """
+
+        log_q = math.log1p(-plant.GROW_PROBABILITY)
+        tick = 0
+        while True:
+            tick += int(math.log(1 - _random.random()) / log_q) + 1
+            if tick > ticks:
+                break
+            plant.grow_node()
+
+    @staticmethod
+    def _advance_tank(ticks: int):
+        """
+        分界线和亮度每帧向目标值移动差值的 ALPHA 倍，n 帧之后剩下的差值是原来的 (1 - ALPHA) ^ n
+        """
+
+        keep = (1 - LIFE_TANK.ALPHA) ** ticks
+        LIFE_TANK.division = [
+            target + (current - target) * keep
+            for current, target in zip(LIFE_TANK.division, LIFE_TANK.division_target)
+        ]
+        target = LIFE_TANK.light_brightness_target
+        LIFE_TANK.light_brightness_current = target + (LIFE_TANK.light_brightness_current - target) * keep
+        LIFE_TANK.time += ticks
+
+
+FAST_FORWARD = FastForward()
@@ -1,19 +1,23 @@
 import logging
-from random import randint, uniform
-
 from PyQt5.QtCore import QRect, Qt
-from PyQt5.QtGui import QPainter, QPixmap, QTransform, QColor, QFont
+from PyQt5.QtGui import QPainter
 
+from cyber_life.life.fish.sprite_atlas import FISH_SPRITE_ATLAS
 from cyber_life.life.fish.state_enum import State
 from cyber_life.life.food import Food
-from cyber_life.life.gas_manager import GAS_MANAGER
+from cyber_life.life.gas_ledger import GAS_LEDGER, OXYGEN, CARBON_DIOXIDE
 from cyber_life.life.life_mixin.breathable_mixin import BreathableMixin
 from cyber_life.life.tank import LIFE_TANK
+from cyber_life.service.rng import RNG
 from cyber_life.service.settings import SETTINGS
+from cyber_life.static import FISH_ATLAS_CACHE_FILE
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_cache import PAINT_CACHE
 from cyber_life.tools.progress_bar import ProgressFloat
 from cyber_life.tools.vector import Vector
 
 lg = logging.getLogger(__name__)
+_random = RNG.stream('fish')
 
 
 class GuppyFish(BreathableMixin):
@@ -26,40 +30,18 @@ class GuppyFish(BreathableMixin):
         super().__init__()
         # 鱼的位置坐标，其位置是贴图的中心点
         self.location = Vector(
-            randint(30, LIFE_TANK.width - 30),
-            randint(
+            _random.randint(30, LIFE_TANK.width - 30),
+            _random.randint(
                 round(LIFE_TANK.division[0]),
                 round(LIFE_TANK.division[1]),
             ),
         )
+        # 上一帧的位置，绘制时在上一帧和这一帧之间插值
+        self.previous_location = Vector(self.location.x, self.location.y)
 
         self.time = 0
         self.animation_interval = 10  # 动画间隔（帧），越小越快
 
-        # 动画序列图
-        self.animate_swim_left = [QPixmap(self._get_assert_path(f"fish_{i}.png")) for i in range(10)]
-
-        self.animate_swim_right = [
-            QPixmap(self._get_assert_path(f"fish_{i}.png")).transformed(QTransform().scale(-1, 1))
-            for i in range(10)
-        ]
-        self.animate_surface_left = [
-            QPixmap(self._get_assert_path(f"fish_{i}.png")).transformed(QTransform().rotate(45))
-            for i in range(10)
-        ]
-        self.animate_surface_right = [
-            QPixmap(self._get_assert_path(f"fish_{i}.png")).transformed(
-                QTransform().scale(-1, 1).rotate(45)
-            )
-            for i in range(10)
-        ]
-        self.animate_die_left = QPixmap(
-            self._get_assert_path(f"die.png")
-        )  # 目前懒得搞动画，直接用一张死鱼图代替
-        self.animate_die_right = QPixmap(self._get_assert_path(f"die.png")).transformed(
-            QTransform().scale(-1, 1)
-        )
-
         # 当前游泳状态的动画 帧索引
         self.img_index_swim = 0
         # 大小就是图片的宽高
@@ -91,10 +73,6 @@ class GuppyFish(BreathableMixin):
         # 目标食物
         self.target_food: Food | None = None
 
-    @staticmethod
-    def _get_assert_path(file_name):
-        return f":/{file_name}"
-
     def breath(self):
         """
         鱼呼吸
@@ -103,12 +81,17 @@ class GuppyFish(BreathableMixin):
         self.carbon -= self.o2_pre_request
         self.energy += self.o2_pre_request * 0.1
         self.oxygen -= self.o2_pre_request
-        # 优先消耗体腔内的氧气，再从外部补充到体腔内
-        if GAS_MANAGER.oxygen > self.o2_pre_request:
-            GAS_MANAGER.reduce_oxygen(self.o2_pre_request)
-            self.oxygen += self.o2_pre_request
+        # 优先消耗体腔内的氧气，再从外部补充到体腔内，帧末由气体账本分配
+        GAS_LEDGER.consume('GuppyFish', OXYGEN, self.o2_pre_request, self._on_oxygen_granted)
         # 呼吸产生二氧化碳
-        GAS_MANAGER.add_carbon_dioxide(self.o2_pre_request)
+        GAS_LEDGER.produce('GuppyFish', CARBON_DIOXIDE, self.o2_pre_request)
+
+    def _on_oxygen_granted(self, amount: float):
+        """
+        从水中补充到体腔内的氧气结算
+        """
+
+        self.oxygen += amount
 
     def cost_energy(self):
         """
@@ -127,6 +110,7 @@ class GuppyFish(BreathableMixin):
         )
         from cyber_life.life.fish.fake_ai import get_best_state
 
+        self.save_previous_state()
         self.time += 1
 
         self.breath()  # 鱼呼吸
@@ -163,8 +147,8 @@ class GuppyFish(BreathableMixin):
     @staticmethod
     def get_random_location():
         try:
-            x = uniform(30, LIFE_TANK.width - 30)
-            y = uniform(LIFE_TANK.division[0] + 30, LIFE_TANK.division[1] - 30)
+            x = _random.uniform(30, LIFE_TANK.width - 30)
+            y = _random.uniform(LIFE_TANK.division[0] + 30, LIFE_TANK.division[1] - 30)
         except Exception as e:
             lg.error(f'鱼无法获取随机位置：{e}')
             return
@@ -178,28 +162,64 @@ class GuppyFish(BreathableMixin):
         speed_vector = self.location_goal - self.location
         return speed_vector.x < 0
 
-    def paint(self, painter: QPainter):
+    def save_previous_state(self):
+        """
+        记下这一帧的位置，作为下一帧绘制时插值的起点
+        """
+
+        self.previous_location = Vector(self.location.x, self.location.y)
+
+    def render_location(self, blend: float = 1.0) -> Vector:
+        """
+        绘制时的位置，在上一帧和这一帧之间插值，blend 为 1 时就是这一帧的位置
+        """
+
+        if blend >= 1:
+            return self.location
+        return self.previous_location + (self.location - self.previous_location) * blend
+
+    def report_bounds(self, dirty: DirtyRegion, blend: float = 1.0):
+        """
+        报告贴图和信息文字的范围，和 paint 画的位置一致
+        """
+
+        if not SETTINGS.is_fish_visible:
+            return
+        location = self.render_location(blend)
+        # 上浮的贴图旋转了 45 度，比 width、height 大，但不超过 1.5 倍
+        dirty.add_rect(
+            location.x - self.width / 2,
+            location.y - self.height / 2,
+            self.width * 1.5,
+            self.height * 1.5
+        )
+        if SETTINGS.is_fish_info_visible:
+            dirty.add_rect(location.x - 20, location.y - 30, 200, 100)
+
+    def paint(self, painter: QPainter, blend: float = 1.0):
         if not SETTINGS.is_fish_visible:
             return
+        location = self.render_location(blend)
+        # 所有鱼共用一份动画帧，第一次绘制时才加载，无界面运行（cyber_life.sim）时不需要
+        FISH_SPRITE_ATLAS.load(FISH_ATLAS_CACHE_FILE)
         # 判断鱼是否面向左边
         pixmap = self.select_pixmap()
         if self.state == State.DEAD:
             painter.setOpacity(0.8)
         painter.drawPixmap(
-            round(self.location.x - self.width / 2),
-            round(self.location.y - self.height / 2),
+            round(location.x - self.width / 2),
+            round(location.y - self.height / 2),
             pixmap,
         )
         painter.setOpacity(1)
         if SETTINGS.is_fish_info_visible:
             # 设置字体颜色
-            painter.setPen(QColor(255, 255, 255))
+            painter.setPen(PAINT_CACHE.color(255, 255, 255))
             # 设置字体大小和字体类型
-            font = QFont('Arial', 6)  # Arial字体，大小为12
-            painter.setFont(font)
+            painter.setFont(PAINT_CACHE.font('Arial', 6))
             rect = QRect(
-                round(self.location.x - 20),
-                round(self.location.y - 30),
+                round(location.x - 20),
+                round(location.y - 30),
                 200,
                 100
             )  # 宽度为200，高度为100的矩形区域
@@ -220,19 +240,19 @@ class GuppyFish(BreathableMixin):
                 or self.state == State.SLEEP
         ):
             if self.is_face_to_left():
-                return self.animate_swim_left[self.img_index_swim]
+                return FISH_SPRITE_ATLAS.swim_left[self.img_index_swim]
             else:
-                return self.animate_swim_right[self.img_index_swim]
+                return FISH_SPRITE_ATLAS.swim_right[self.img_index_swim]
         elif self.state == State.SURFACE:
             if self.is_face_to_left():
-                return self.animate_surface_left[self.img_index_swim]
+                return FISH_SPRITE_ATLAS.surface_left[self.img_index_swim]
             else:
-                return self.animate_surface_right[self.img_index_swim]
+                return FISH_SPRITE_ATLAS.surface_right[self.img_index_swim]
         elif self.state == State.DEAD:
             if self.is_face_to_left():
-                return self.animate_die_left
+                return FISH_SPRITE_ATLAS.die_left
             else:
-                return self.animate_die_right
+                return FISH_SPRITE_ATLAS.die_right
         else:
             lg.error(f'select_pixmap: 未知的鱼状态 {self.state}')
             raise ValueError(f"未知的鱼状态 {self.state}")
@@ -0,0 +1,142 @@
+"""
+孔雀鱼的动画帧图集
+所有鱼共用一份，每张图只解码、变换一次
+"""
+import logging
+import os
+
+from PyQt5.QtCore import QFile, QIODevice, QDataStream, QSaveFile
+from PyQt5.QtGui import QPixmap, QTransform
+
+from cyber_life.tools.singleton import SingletonMeta
+
+lg = logging.getLogger(__name__)
+
+
+class FishSpriteAtlas(metaclass=SingletonMeta):
+    """
+    孔雀鱼动画帧图集
+    QPixmap 必须在 QApplication 创建之后才能构造，所以第一次绘制时才调用 load
+    """
+
+    FRAME_COUNT = 10  # 游泳动画只有 10 张
+    # 缓存文件的格式，修改了贴图或者变换方式之后需要加一，旧的缓存文件会被重新生成
+    CACHE_MAGIC = 'cyber-life-fish-atlas'
+    CACHE_VERSION = 1
+
+    def __init__(self):
+        self.swim_left: list[QPixmap] = []
+        self.swim_right: list[QPixmap] = []
+        self.surface_left: list[QPixmap] = []
+        self.surface_right: list[QPixmap] = []
+        self.die_left: QPixmap | None = None  # 目前懒得搞动画，直接用一张死鱼图代替
+        self.die_right: QPixmap | None = None
+
+        self.is_loaded = False
+
+    def load(self, cache_file: str | None = None):
+        """
+        加载图集，已经加载过就什么也不做
+
+        :param cache_file: 变换好的图集缓存文件，存在时直接读取，不存在时生成之后写入，None 表示不使用缓存
+        """
+
+        if self.is_loaded:
+            return
+
+        if cache_file is None or not self._load_cache(cache_file):
+            self._build()
+            if cache_file is not None:
+                self._save_cache(cache_file)
+
+        self.is_loaded = True
+
+    def _build(self):
+        """
+        从资源文件解码，并做翻转、旋转
+        """
+
+        flip = QTransform().scale(-1, 1)
+
+        self.swim_left = [QPixmap(f":/fish_{i}.png") for i in range(self.FRAME_COUNT)]
+        self.swim_right = [pixmap.transformed(flip) for pixmap in self.swim_left]
+        self.surface_left = [pixmap.transformed(QTransform().rotate(45)) for pixmap in self.swim_left]
+        self.surface_right = [pixmap.transformed(QTransform().scale(-1, 1).rotate(45)) for pixmap in self.swim_left]
+        self.die_left = QPixmap(":/die.png")
+        self.die_right = self.die_left.transformed(flip)
+
+    def _groups(self) -> list[list[QPixmap]]:
+        return [
+            self.swim_left, self.swim_right, self.surface_left, self.surface_right,
+            [self.die_left], [self.die_right],
+        ]
+
+    def _group_sizes(self) -> list[int]:
+        """
+        _groups 中每一组的图片数量，读取缓存时用来检查文件里的数量
+        """
+
+        return [self.FRAME_COUNT] * 4 + [1, 1]
+
+    def _save_cache(self, cache_file: str):
+        """
+        把变换好的图集写入缓存文件，QSaveFile 先写临时文件再替换，不会留下写了一半的文件
+        """
+
+        file = QSaveFile(cache_file)
+        if not file.open(QIODevice.WriteOnly):
+            lg.warning(f'无法写入鱼的图集缓存 {cache_file}')
+            return
+        stream = QDataStream(file)
+        stream.writeQString(self.CACHE_MAGIC)
+        stream.writeInt32(self.CACHE_VERSION)
+        for group in self._groups():
+            stream.writeInt32(len(group))
+            for pixmap in group:
+                stream << pixmap
+        if not file.commit():
+            lg.warning(f'无法写入鱼的图集缓存 {cache_file}')
+
+    def _load_cache(self, cache_file: str) -> bool:
+        """
+        读取图集缓存文件
+
+        :return: 是否读取成功
+        """
+
+        if not os.path.isfile(cache_file):
+            return False
+
+        file = QFile(cache_file)
+        if not file.open(QIODevice.ReadOnly):
+            return False
+        try:
+            stream = QDataStream(file)
+            if stream.readQString() != self.CACHE_MAGIC or stream.readInt32() != self.CACHE_VERSION:
+                lg.info('鱼的图集缓存版本不一致，重新生成')
+                return False
+
+            # 文件里的数量不可信，和每组已知的数量不一致就不读，损坏的文件不会让启动卡在一个很大的循环里
+            groups = []
+            for size in self._group_sizes():
+                if stream.readInt32() != size:
+                    lg.warning('鱼的图集缓存已损坏，重新生成')
+                    return False
+                group = []
+                for _ in range(size):
+                    pixmap = QPixmap()
+                    stream >> pixmap
+                    if stream.status() != QDataStream.Ok or pixmap.isNull():
+                        lg.warning('鱼的图集缓存已损坏，重新生成')
+                        return False
+                    group.append(pixmap)
+                groups.append(group)
+        finally:
+            file.close()
+
+        self.swim_left, self.swim_right, self.surface_left, self.surface_right, die_left, die_right = groups
+        self.die_left, self.die_right = die_left[0], die_right[0]
+        return True
+
+
+FISH_SPRITE_ATLAS = FishSpriteAtlas()
@@ -15,8 +15,24 @@
 """
 
 from cyber_life.life.fish.guppy_fish import GuppyFish
+from cyber_life.life.fish.state_enum import State
 from cyber_life.life.tank import LIFE_TANK
-from cyber_life.tools.vector import Vector
+
+# 每个状态下鱼的参数：(每帧消耗的能量, 每帧需要的氧气量, 动画间隔, 移动速率)
+# 快进（cyber_life.life.fast_forward）也按这张表推算每帧的变化量
+STATE_PARAMS = {
+    State.DEAD: (0, 0, 10, 0),
+    State.IDLE: (0.01, 0.1, 10, 0.1),
+    State.SURFACE: (0.02, 0.1, 5, 0.1),
+    State.SLEEP: (0.001, 0.01, 20, 0),
+    State.FIND_FOOD: (0.05, 0.2, 5, 0.4),
+}
+SURFACE_OXYGEN_GAIN = 1  # 水面呼吸时每帧吸入的氧气
+SLEEP_ENERGY_GAIN = 1  # 沉底睡觉时每帧恢复的能量
+
+
+def set_state_params(fish: GuppyFish, state: State):
+    fish.energy_pre_cost, fish.o2_pre_request, fish.animation_interval, fish.speed = STATE_PARAMS[state]
 
 
 def tick_death(fish: GuppyFish):
@@ -24,10 +40,7 @@ def tick_death(fish: GuppyFish):
     鱼死亡状态
     """
 
-    fish.energy_pre_cost = 0
-    fish.o2_pre_request = 0
-    fish.animation_interval = 10
-    fish.speed = 0
+    set_state_params(fish, State.DEAD)
 
     # 尸体开始漂浮
 
@@ -37,13 +50,13 @@ def tick_death(fish: GuppyFish):
         if fish.location.y + fish.height / 2 > LIFE_TANK.division[1]:
             fish.velocity.y = -abs(fish.velocity.y / 2)  # 碰了一下地面，速度大小减半
 
-        fish.velocity += Vector(0, -0.001)  # 浮力的体现
+        fish.velocity.y -= 0.001  # 浮力的体现
         fish.velocity.limit(2)  # 阻力的体现
 
     # 水面以上
     elif fish.location.y < LIFE_TANK.division[0]:
         # 在水面以上
-        fish.velocity += Vector(0, 0.01)
+        fish.velocity.y += 0.01
 
     fish.location += fish.velocity
 
@@ -53,10 +66,7 @@ def tick_idle(fish: GuppyFish):
     鱼处于空闲状态，不做任何事情，较小能量消耗
     """
 
-    fish.energy_pre_cost = 0.01
-    fish.o2_pre_request = 0.1
-    fish.animation_interval = 10
-    fish.speed = 0.1
+    set_state_params(fish, State.IDLE)
 
     # 防止鱼浮出水面和进入沙子
     fish.location.y = max(LIFE_TANK.division[0], min(LIFE_TANK.division[1], fish.location.y))
@@ -68,7 +78,7 @@ def tick_idle(fish: GuppyFish):
     if fish.location.distance(fish.location_goal) < 10:  # 已经到达目标，再开一个
         fish.location_goal = fish.get_random_location()
 
-    fish.location += (fish.location_goal - fish.location).normalize() * fish.speed  # 向着目标移动
+    fish.location.move_towards(fish.location_goal, fish.speed)  # 向着目标移动
 
 
 def tick_surface(fish: GuppyFish):
@@ -77,13 +87,10 @@ def tick_surface(fish: GuppyFish):
     但这个模式的缺点是不能去水中觅食以及其他活动，只能在水面呼吸
     """
 
-    fish.energy_pre_cost = 0.02
-    fish.o2_pre_request = 0.1
-    fish.animation_interval = 5
-    fish.speed = 0.1
+    set_state_params(fish, State.SURFACE)
 
     # 吸气
-    fish.oxygen += 1
+    fish.oxygen += SURFACE_OXYGEN_GAIN
 
     margin = 5  # 实际上是让鱼的中心与水面对齐，但再往下压一段距离，让鱼的头部与水面对齐
     # 往上浮，但不能超过水面
@@ -95,10 +102,7 @@ def tick_sleep(fish: GuppyFish):
     鱼睡眠状态，进入低功耗，增加精力的状态
     """
 
-    fish.energy_pre_cost = 0.001
-    fish.o2_pre_request = 0.01
-    fish.animation_interval = 20
-    fish.speed = 0
+    set_state_params(fish, State.SLEEP)
 
     drag_down_distance = fish.height / 2 - 5  # 鱼贴图中心与底部的距离
 
@@ -107,7 +111,7 @@ def tick_sleep(fish: GuppyFish):
 
     # 已经沉底，开始睡觉
     if fish.location.y == LIFE_TANK.division[1] - drag_down_distance:
-        fish.energy += 1
+        fish.energy += SLEEP_ENERGY_GAIN
 
 
 def tick_find_food(fish: GuppyFish):
@@ -115,10 +119,7 @@ def tick_find_food(fish: GuppyFish):
     鱼寻找食物状态
     """
 
-    fish.speed = 0.4
-    fish.o2_pre_request = 0.2
-    fish.animation_interval = 5
-    fish.energy_pre_cost = 0.05
+    set_state_params(fish, State.FIND_FOOD)
 
     from cyber_life.life.life_manager import LifeManager
     from cyber_life.life.food import Food
@@ -142,7 +143,7 @@ def tick_find_food(fish: GuppyFish):
             if fish.location.distance(fish.location_goal) > 10:
                 fish.location_goal.y = max(LIFE_TANK.division[0] + 30,
                                            min(LIFE_TANK.division[1] - 30, fish.location_goal.y))
-                fish.location += (fish.location_goal - fish.location).normalize() * fish.speed
+                fish.location.move_towards(fish.location_goal, fish.speed)
             else:
                 fish.location_goal = fish.get_random_location()
 
@@ -150,7 +151,7 @@ def tick_find_food(fish: GuppyFish):
     else:
         # 向着目标前进
         if fish.location.distance(fish.target_food.location) > 10:
-            fish.location += (fish.target_food.location - fish.location).normalize() * fish.speed
+            fish.location.move_towards(fish.target_food.location, fish.speed)
         # 已经到达目标，开始吃食物
         else:
             fish.carbon += fish.target_food.carbon
@@ -1,7 +1,9 @@
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPainter
+from PyQt5.QtGui import QPen, QColor
 
 from cyber_life.life.tank import LIFE_TANK
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_batch import PaintBatch
 from cyber_life.tools.vector import Vector
 
 
@@ -17,21 +19,50 @@ class Food:
     # 微生物的分解速度 单位：碳/帧
     microbe_decompose_speed = 0.01
     radius = 2  # 半径
+    PEN = QPen(QColor(Qt.darkYellow))
+    BRUSH = QColor(Qt.yellow)
 
     def __init__(self, x: float):
         self.location = Vector(x, 0)
+        # 上一帧的位置，绘制时在上一帧和这一帧之间插值
+        self.previous_location = Vector(x, 0)
         self.float_remaining = 1000  # 饲料下沉倒计时
         self.carbon = 400  # 碳量
         self.is_deleted = False  # 是否被 应该被 删除
 
-    def paint(self, painter: QPainter):
-        painter.setPen(Qt.darkYellow)
-        painter.setBrush(Qt.yellow)
-        painter.drawEllipse(
-            round(self.location.x - Food.radius),
-            round(self.location.y - Food.radius),
-            round(2 * Food.radius),
-            round(2 * Food.radius)
+    def save_previous_state(self):
+        """
+        记下这一帧的位置，作为下一帧绘制时插值的起点
+        """
+
+        self.previous_location = Vector(self.location.x, self.location.y)
+
+    def render_location(self, blend: float = 1.0) -> Vector:
+        """
+        绘制时的位置，在上一帧和这一帧之间插值，blend 为 1 时就是这一帧的位置
+        """
+
+        if blend >= 1:
+            return self.location
+        return self.previous_location + (self.location - self.previous_location) * blend
+
+    def batch_paint(self, batch: PaintBatch, blend: float = 1.0):
+        location = self.render_location(blend)
+        batch.add_ellipse(
+            'food', self.PEN, self.BRUSH,
+            location.x - Food.radius,
+            location.y - Food.radius,
+            2 * Food.radius,
+            2 * Food.radius
+        )
+
+    def report_bounds(self, dirty: DirtyRegion, blend: float = 1.0):
+        location = self.render_location(blend)
+        dirty.add_rect(
+            location.x - Food.radius,
+            location.y - Food.radius,
+            2 * Food.radius,
+            2 * Food.radius
         )
 
     def __repr__(self):
@@ -39,6 +70,7 @@ class Food:
         return f"Food({self.location.x}, {self.location.y}, {self.carbon})"
 
     def tick(self):
+        self.save_previous_state()
         self.float_remaining -= 1
 
         if self.carbon <= 0:
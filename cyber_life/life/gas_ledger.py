@@ -0,0 +1,96 @@
+"""
+气体账本
+一帧之内所有生物对水中气体的消耗和产生都先记在账本上，帧末（LifeManager.tick 的最后）一次性结算到 GAS_MANAGER。
+
+结算规则：
+1. 先结算消耗。能用的量是帧初水中的含量，这一帧产生的气体下一帧才能用。
+2. 需求超过含量时按比例分配，每个请求都拿到同样比例的气体，不再是谁先请求谁先拿。
+3. 消耗结算后通知请求者实际拿到了多少，请求者据此增加体内的碳、能量，并登记产生的气体（比如呼吸产生的二氧化碳）。
+4. 最后把这一帧产生的气体全部加到水中。
+"""
+from threading import Lock
+from typing import Callable
+
+from cyber_life.tools.singleton import SingletonMeta
+from .gas_manager import GAS_MANAGER, GasManager
+
+OXYGEN = 'oxygen'
+CARBON_DIOXIDE = 'carbon_dioxide'
+GASES = (OXYGEN, CARBON_DIOXIDE)
+
+
+class GasLedger(metaclass=SingletonMeta):
+    """
+    一帧内的气体账本，可以在其它线程中记账，结算只在 LifeManager.tick 中进行
+    """
+
+    def __init__(self, gas_manager: GasManager = GAS_MANAGER):
+        self._gas_manager = gas_manager
+        self._lock = Lock()
+        # 这一帧产生的气体
+        self._produced = {gas: 0.0 for gas in GASES}
+        # 这一帧消耗的请求 (物种, 气体, 请求量, 结算回调)
+        self._requests: list[tuple[str, str, float, Callable[[float], None] | None]] = []
+        # 上一次结算时每种气体满足了需求的比例，1 表示全部满足
+        self.grant_ratio = {gas: 1.0 for gas in GASES}
+        # 每个物种累计净产生的气体，消耗为负，用于观察气体的流向
+        self.flux_totals: dict[str, dict[str, float]] = {}
+
+    def produce(self, species: str, gas: str, amount: float):
+        """
+        登记产生气体，结算时加到水中
+        """
+
+        with self._lock:
+            self._produced[gas] += amount
+            self._add_flux(species, gas, amount)
+
+    def consume(self, species: str, gas: str, amount: float, on_granted: Callable[[float], None] | None = None):
+        """
+        登记消耗气体的请求
+        :param on_granted: 结算后调用，参数为实际分到的量，0 ~ amount
+        """
+
+        if amount <= 0:
+            return
+        with self._lock:
+            self._requests.append((species, gas, amount, on_granted))
+
+    def commit(self):
+        """
+        结算这一帧的账
+        """
+
+        with self._lock:
+            requests, self._requests = self._requests, []
+
+            demand = {gas: 0.0 for gas in GASES}
+            for _, gas, amount, _ in requests:
+                demand[gas] += amount
+            for gas in GASES:
+                supply = max(getattr(self._gas_manager, gas), 0)
+                ratio = 1.0 if demand[gas] <= supply else supply / demand[gas]
+                self.grant_ratio[gas] = ratio
+                setattr(self._gas_manager, gas, getattr(self._gas_manager, gas) - demand[gas] * ratio)
+
+            for species, gas, amount, _ in requests:
+                self._add_flux(species, gas, -amount * self.grant_ratio[gas])
+
+        # 回调中会登记产生的气体，需要获取锁，所以放在锁外面
+        for _, gas, amount, on_granted in requests:
+            if on_granted is not None:
+                on_granted(amount * self.grant_ratio[gas])
+
+        with self._lock:
+            for gas in GASES:
+                setattr(self._gas_manager, gas, getattr(self._gas_manager, gas) + self._produced[gas])
+                self._produced[gas] = 0.0
+
+    def _add_flux(self, species: str, gas: str, amount: float):
+        flux = self.flux_totals.get(species)
+        if flux is None:
+            flux = self.flux_totals[species] = {g: 0.0 for g in GASES}
+        flux[gas] += amount
+
+
+GAS_LEDGER = GasLedger()
@@ -12,6 +12,8 @@ class GasManager(metaclass=SingletonMeta):
     通常情况下，每克鱼体重每小时大约需要1毫克氧气。
     ...内容作废，直接先用最简单的数字表示氧气含量。
     ```
+
+    鱼缸里的生物不直接调用这里的加减方法，而是在气体账本 GAS_LEDGER 上记账，每帧结束时统一结算
     """
 
     def __init__(self):
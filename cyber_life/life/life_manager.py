@@ -2,18 +2,23 @@
 类似上帝，指挥控制着缸内所有物体的进展与迭代变化
 
 """
+from collections import deque
 from typing import List
 
 import psutil
 
 from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
-from cyber_life.life.ball import LifeBall
+from cyber_life.life.ball import LifeBallGroup
 from cyber_life.life.bubble_flow import LifeBubbleFlow
 from cyber_life.life.fish.guppy_fish import GuppyFish
 from cyber_life.life.food import Food
+from cyber_life.life.gas_ledger import GAS_LEDGER
 from cyber_life.life.plant import LifePlant
 from cyber_life.life.tank import LIFE_TANK
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_batch import PaintBatch
 from cyber_life.tools.singleton import SingletonMeta
+from cyber_life.tools.spatial_grid import SpatialGrid
 
 
 class LifeManager(metaclass=SingletonMeta):
@@ -21,12 +26,22 @@ class LifeManager(metaclass=SingletonMeta):
     管理小鱼缸的一切内容，包括生物球、小鱼缸、水草、气泡流、鱼等
     """
 
+    FOOD_GRID_CELL_SIZE = 20  # 食物空间索引的格子边长，px
+
     def __init__(self):
-        self.balls: List[LifeBall] = [LifeBall() for _ in range(psutil.cpu_count())]
+        self.balls = LifeBallGroup(psutil.cpu_count())
         self.plant = LifePlant()
         self.bubble_flow = LifeBubbleFlow(LIFE_TANK.width / 2)
         self.fish_list: List[GuppyFish] = [GuppyFish()]
         self.food_list: List[Food] = []
+        # 食物的空间索引，鱼找最近的食物时不需要遍历、排序全部食物
+        self.food_grid = SpatialGrid(self.FOOD_GRID_CELL_SIZE)
+        # 鼠标钩子线程投喂的食物位置先放在这里，在 tick 中再放入鱼缸，避免两个线程同时修改食物列表
+        self._pending_food: deque[float] = deque()
+        # 外部输入的钩子，用于记录或回放每一帧的输入，见 cyber_life.service.replay
+        self.input_hook = None
+        # 绘制时收集图元，见 paint
+        self._paint_batch = PaintBatch()
 
     def tick(self):
         """
@@ -45,19 +60,32 @@ class LifeManager(metaclass=SingletonMeta):
         4. 水草
         5. 鱼
         6. 气泡流
+        最后结算这一帧所有生物对气体的消耗和产生
         """
 
+        # 0. 取出这一帧的外部输入
+        food_positions = self._take_pending_food()
+        if self.input_hook is not None:
+            food_positions = self.input_hook.before_tick(self, food_positions)
+
         # 1. 更新小鱼缸
         LIFE_TANK.tick()
 
         # 2. 更新生物球位置
-        for ball, activity in zip(self.balls, SYSTEM_INFO_MANAGER.INSPECTOR_CPU.get_current_result()):  # 使用 zip 并行迭代
-            ball.set_activity(activity)
-            ball.tick()
+        self.balls.set_activity(SYSTEM_INFO_MANAGER.INSPECTOR_CPU.get_current_result())
+        self.balls.tick()
 
         # 3. 更新食物
+        for x in food_positions:
+            food = Food(x)
+            self.food_list.append(food)
+            self.food_grid.insert(food, food.location.x, food.location.y)
         for food in self.food_list:
             food.tick()
+            if food.is_deleted:
+                self.food_grid.remove(food)
+            else:
+                self.food_grid.move(food, food.location.x, food.location.y)
         self.food_list = list(filter(lambda x: not x.is_deleted, self.food_list))  # 清理食物
 
         # 4. 更新水草
@@ -70,47 +98,101 @@ class LifeManager(metaclass=SingletonMeta):
         # 6. 更新气泡流
         self.bubble_flow.tick()
 
+        # 结算气体
+        GAS_LEDGER.commit()
+
     def is_food_in_water(self):
         """
         专门为鱼提供，判断水中是否有食物
+        已经被别的鱼吃掉、还没来得及清理的食物不算
         """
 
-        return any(food.location.y >= LIFE_TANK.division[0] for food in self.food_list)
+        return self.food_grid.exists(LIFE_TANK.division[0], self._is_food_available)
 
-    def choice_food_in_water(self, fish: GuppyFish):
+    def choice_food_in_water(self, fish: GuppyFish) -> Food | None:
         """
-        专门为鱼提供，随机选择水中食物
+        专门为鱼提供，选择离鱼最近的水中食物
         """
 
-        # 按照距离鱼的距离排序
-        return sorted((food for food in self.food_list if food.location.y >= LIFE_TANK.division[0]),
-                      key=lambda fd: fd.location.distance(fish.location))[0]
+        return self.food_grid.nearest(
+            fish.location.x, fish.location.y, LIFE_TANK.division[0], self._is_food_available
+        )
+
+    @staticmethod
+    def _is_food_available(food: Food) -> bool:
+        return not food.is_deleted
 
     def add_food(self, x: float):
-        self.food_list.append(Food(x))
+        """
+        投喂食物，可以在其它线程中调用，食物在下一次 tick 时出现
+        """
+
+        self._pending_food.append(x)
+
+    def _take_pending_food(self) -> list[float]:
+        food_positions = []
+        while self._pending_food:
+            food_positions.append(self._pending_food.popleft())
+        return food_positions
+
+    def save_previous_state(self):
+        """
+        把这一帧的样子当作上一帧，之后插值绘制时直接画这一帧
+        各个生物 tick 时会自己记下上一帧，恢复快照、快进这些不经过 tick 改变状态的地方之后调用
+        """
 
-    def paint(self, painter):
+        LIFE_TANK.save_previous_state()
+        self.balls.save_previous_state()
+        for food in self.food_list:
+            food.save_previous_state()
+        for fish in self.fish_list:
+            fish.save_previous_state()
+        self.bubble_flow.bubbles.save_previous_state()
+
+    def report_bounds(self, dirty: DirtyRegion, blend: float = 1.0):
+        """
+        报告这一帧所有会变化的地方，在 tick 之后、绘制之前调用
+        blend 要和绘制时的一样
+        """
+
+        LIFE_TANK.report_bounds(dirty, blend)
+        self.bubble_flow.report_bounds(dirty, blend)
+        self.balls.report_bounds(dirty, blend)
+        for fish in self.fish_list:
+            fish.report_bounds(dirty, blend)
+        self.plant.report_bounds(dirty)
+        for food in self.food_list:
+            food.report_bounds(dirty, blend)
+
+    def paint(self, painter, blend: float = 1.0):
         """
         绘制鱼缸内的所有内容
+
+        :param blend: 在上一帧和这一帧之间插值的比例，0 是上一帧的样子，1 是这一帧的样子，见 cyber_life.service.game_loop
+                      水草每帧只动零点几像素，不插值
         """
 
+        # 气泡、水草、食物把图元交给批量绘制，同一种画笔画刷的图元一起提交
+        batch = self._paint_batch
+
         # 1. 绘制气泡流
-        self.bubble_flow.paint(painter)
+        self.bubble_flow.batch_paint(batch, blend)
+        batch.flush(painter)
 
         # 2. 绘制生物球
-        for ball in self.balls:
-            ball.paint(painter)
+        self.balls.paint(painter, blend)
 
         # 3. 绘制鱼
         for fish in self.fish_list:
-            fish.paint(painter)
+            fish.paint(painter, blend)
 
         # 4. 绘制生长植物
-        self.plant.paint(painter)
+        self.plant.batch_paint(batch)
 
         # 5. 绘制食物
         for food in self.food_list:
-            food.paint(painter)
+            food.batch_paint(batch, blend)
+        batch.flush(painter)
 
         # 6. 绘制小鱼缸
-        LIFE_TANK.paint(painter)
+        LIFE_TANK.paint(painter, blend)
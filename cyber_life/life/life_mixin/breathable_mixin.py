@@ -1,4 +1,4 @@
-from cyber_life.life.gas_manager import GAS_MANAGER
+from cyber_life.life.gas_ledger import GAS_LEDGER, OXYGEN, CARBON_DIOXIDE
 from cyber_life.life.life_mixin.life import Life
 
 
@@ -11,6 +11,7 @@ class BreathableMixin(Life):
         """
         呼吸作用，O2 + C --> CO2 + 100能量
         这里是公式的简化
+        氧气在帧末由气体账本统一分配，分到多少氧气就消耗多少碳
         """
 
         # 一次呼吸作用需要的碳量和氧气量是一样的
@@ -18,12 +19,14 @@ class BreathableMixin(Life):
         if carbon_request > self.carbon:
             # 呼吸不了了，没有足够的碳，或许只能死了
             return
-        if GAS_MANAGER.oxygen < self.o2_pre_request:
-            # 没有足够的氧气
-            return
-        # 呼吸作用请求成功
 
-        self.carbon -= carbon_request
-        self.energy += self.o2_pre_request * 100
-        GAS_MANAGER.reduce_oxygen(self.o2_pre_request)
-        GAS_MANAGER.add_carbon_dioxide(self.o2_pre_request)
+        GAS_LEDGER.consume(type(self).__name__, OXYGEN, self.o2_pre_request, self._on_oxygen_granted)
+
+    def _on_oxygen_granted(self, amount: float):
+        """
+        呼吸作用请求结算，amount 为分到的氧气量
+        """
+
+        self.carbon -= amount
+        self.energy += amount * 100
+        GAS_LEDGER.produce(type(self).__name__, CARBON_DIOXIDE, amount)
@@ -1,4 +1,4 @@
-from cyber_life.life.gas_manager import GAS_MANAGER
+from cyber_life.life.gas_ledger import GAS_LEDGER, OXYGEN, CARBON_DIOXIDE
 from cyber_life.life.life_mixin.life import Life
 from cyber_life.life.tank import LIFE_TANK
 
@@ -13,15 +13,17 @@ class OrganismMixin(Life):
         光合作用 在一帧内完成
         在一帧内光合作用，CO2 --light_intensity--> O2 + C
         实际上光合作用有水的参与，这里就简化公式了。
+        二氧化碳在帧末由气体账本统一分配，环境中二氧化碳不够时按比例少分一些
         :return:
         """
         co2_cost = self.co2_pre_request * LIFE_TANK.light_brightness_current
 
-        if GAS_MANAGER.carbon_dioxide < co2_cost:
-            # 光合作用不了了，因为环境中没有足够的二氧化碳
-            return
+        GAS_LEDGER.consume(type(self).__name__, CARBON_DIOXIDE, co2_cost, self._on_carbon_dioxide_granted)
 
-        GAS_MANAGER.reduce_carbon_dioxide(co2_cost)
-        GAS_MANAGER.add_oxygen(co2_cost)  # 一份CO2产生一份氧气
+    def _on_carbon_dioxide_granted(self, amount: float):
+        """
+        光合作用请求结算，amount 为分到的二氧化碳量
+        """
 
-        self.carbon += co2_cost  # 生物体内固定的碳增加
+        GAS_LEDGER.produce(type(self).__name__, OXYGEN, amount)  # 一份CO2产生一份氧气
+        self.carbon += amount  # 生物体内固定的碳增加
@@ -1,19 +1,29 @@
-import random
-
-from PyQt5.QtGui import QPainter
+import numpy as np
 
 from cyber_life.life.plant_node import LifePlantNode
 from cyber_life.life.tank import LIFE_TANK
+from cyber_life.service.rng import RNG
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_batch import PaintBatch
+
+_random = RNG.stream('plant')
 
 
 class LifePlant:
+    # 每帧长出一个新节点的概率，大约控制在一个小时长一个节点
+    # 长时间不关机会长的很茂盛，看上去有点臃肿
+    GROW_PROBABILITY = 1 / (3600 * 60)
+    # 每个节点两侧各 5 根叶子，第 i 根叶子相对于指向下一个节点的方向偏转 i 倍张角
+    LEAF_ANGLES = np.array([-5, -4, -3, -2, -1, 1, 2, 3, 4, 5], dtype=np.float64)
+    LEAF_LENGTH = 20
+
     def __init__(self):
         """
         表示一束水草
         目前整个鱼缸里只有一个水草，至于后续是否会有多个，还需要考虑
         """
 
-        self.x = random.randint(0, LIFE_TANK.width)
+        self.x = _random.randint(0, LIFE_TANK.width)
         # 存放水草节点的列表
         self.nodes: list[LifePlantNode] = []
         # 默认产生
@@ -32,11 +42,11 @@ class LifePlant:
             # 获取最后一个节点，并在上面随机位置产生一个子节点
             last_node = self.nodes[-1]
             last_node_location = last_node.location
-            node_y = random.randint(
+            node_y = _random.randint(
                 round(last_node_location.y - 10),
                 round(last_node_location.y + 10),
             )
-            node_x = random.randint(
+            node_x = _random.randint(
                 round(last_node_location.x - 10),
                 round(last_node_location.x + 10),
             )
@@ -54,11 +64,57 @@ class LifePlant:
         for node in self.nodes:
             node.tick()
 
-        # 生长，大约控制在一个小时长一个节点
-        # 长时间不关机会长的很茂盛，看上去有点臃肿
-        if random.random() < 1 / (3600 * 60):
+        # 生长
+        if _random.random() < self.GROW_PROBABILITY:
             self.grow_node()
 
-    def paint(self, painter: QPainter):
+    def report_bounds(self, dirty: DirtyRegion):
+        """
+        报告整束水草的外接矩形，叶子最长伸出节点 LEAF_LENGTH，茎的线宽 3 像素
+        """
+
+        if not self.nodes:
+            return
+        xs = [node.location.x for node in self.nodes]
+        ys = [node.location.y for node in self.nodes]
+        left, top = min(xs), min(ys)
+        dirty.add_rect(left, top, max(xs) - left, max(ys) - top, margin=self.LEAF_LENGTH + LifePlantNode.RADIUS)
+
+    def batch_paint(self, batch: PaintBatch):
+        """
+        绘制所有节点、节点之间的连线和叶子，一次算出全部节点的叶子
+        """
+
+        if not self.nodes:
+            return
+        location = np.array([(node.location.x, node.location.y) for node in self.nodes])
+        speed = np.array([abs(node.velocity) for node in self.nodes])
+        radius = LifePlantNode.RADIUS
+        rects = np.empty((len(location), 4))
+        rects[:, :2] = location - radius
+        rects[:, 2:] = radius * 2
+        batch.add_ellipses('plant_node', LifePlantNode.PEN, LifePlantNode.COLOR, rects)
+
+        # 节点是一条链，除了最后一个节点，每个节点都连着下一个节点
+        start = location[:-1]
+        end = location[1:]
+        batch.add_lines('plant_stem', LifePlantNode.STEM_PEN, np.hstack((start, end)))
+
+        # 叶子：指向下一个节点的单位向量旋转一定角度，张角和速度有关，和 Vector.rotate 一样把三角函数值保留 15 位小数
+        direction = end - start
+        length = np.hypot(direction[:, 0], direction[:, 1])
+        direction[length > 0] /= length[length > 0, np.newaxis]
+        theta = np.radians((10 * speed[:-1] + 5)[:, np.newaxis] * self.LEAF_ANGLES)
+        cos_theta = np.round(np.cos(theta), 15)
+        sin_theta = np.round(np.sin(theta), 15)
+        dx = direction[:, 0:1]
+        dy = direction[:, 1:2]
+        leaves = np.empty(theta.shape + (4,))
+        leaves[..., 0] = start[:, 0:1]
+        leaves[..., 1] = start[:, 1:2]
+        leaves[..., 2] = leaves[..., 0] + (dx * cos_theta - dy * sin_theta) * self.LEAF_LENGTH
+        leaves[..., 3] = leaves[..., 1] + (dx * sin_theta + dy * cos_theta) * self.LEAF_LENGTH
+        batch.add_lines('plant_leaf', LifePlantNode.LEAF_PEN, leaves.reshape(-1, 4))
+
         for node in self.nodes:
-            node.paint(painter)
+            node.batch_paint_debug(batch)
@@ -1,13 +1,15 @@
-from random import random
-
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPainter, QPen, QColor
+from PyQt5.QtGui import QPen, QColor
 
+from cyber_life.service.rng import RNG
+from cyber_life.tools.paint_batch import PaintBatch
 from cyber_life.tools.vector import Vector
 from .life_mixin.breathable_mixin import BreathableMixin
 from .life_mixin.organism_mixin import OrganismMixin
 from .tank import LIFE_TANK
 
+_random = RNG.stream('plant')
+
 
 class LifePlantNode(BreathableMixin, OrganismMixin):
     """
@@ -16,10 +18,21 @@ class LifePlantNode(BreathableMixin, OrganismMixin):
     当前水草生长过高，会超越水面，飘到天空上，后续可能考虑优化
     """
 
+    RADIUS = 2
+    # 绘制用的画笔、画刷，所有节点共用
+    COLOR = QColor(69, 79, 56, 220)
+    PEN = QPen(COLOR)
+    # 与下一个节点之间的连线
+    STEM_PEN = QPen(COLOR, 3)
+    # 针状线，模拟叶子
+    LEAF_PEN = QPen(QColor(29, 156, 10, 200), 1)
+    DEBUG_VELOCITY_PEN = QPen(QColor(Qt.blue), 4)
+    DEBUG_RANGE_PEN = QPen(QColor(Qt.red))
+
     def __init__(self, x, y, can_move):
         super().__init__()
         self.location = Vector(x, y)
-        self.velocity = Vector.random(0.1)
+        self.velocity = Vector.random(0.1, _random)
         self.acceleration = Vector(0, 0)
         # 根节点不能自由移动，其他节点会移动，模拟悬浮效果
         self.next_node = None
@@ -33,8 +46,6 @@ class LifePlantNode(BreathableMixin, OrganismMixin):
         self.status_out_range = False
         self.status_in_range = False
 
-        self.radius = 2
-
         self.o2_pre_request = 0.1
         self.co2_pre_request = 0.1
         self.fixed_carbon = 100  # todo：考虑该固定碳的量能反应在叶子数量和颜色上。
@@ -51,7 +62,7 @@ class LifePlantNode(BreathableMixin, OrganismMixin):
         @staticmethod：静态方法，同样不需要实例化即可调用，但不适合写与类成员变量或成员函数有关的功能
         """
 
-        return cls(random() * LIFE_TANK.width, LIFE_TANK.division[1], False)
+        return cls(_random.random() * LIFE_TANK.width, LIFE_TANK.division[1], False)
 
     def add_child(self, child: 'LifePlantNode'):
         if not self.next_node and isinstance(child, LifePlantNode):
@@ -100,15 +111,15 @@ class LifePlantNode(BreathableMixin, OrganismMixin):
 
         # 过远，直接将下一个节点拉过来
         if distance >= self.pull_radius:
-            v = (self.location - self.next_node.location).normalize() * 0.1
-            self.next_node.velocity = v * 5
+            self.next_node.velocity = (self.location - self.next_node.location).normalize()
+            self.next_node.velocity *= 0.5
             self.next_node.acceleration = Vector(0, 0)
 
         # 过近，排斥，但是只模拟相邻节点的排斥，不计算与周围其它节点的排斥，是粗糙的模拟
         if distance <= self.repel_radius:
-            v = (self.next_node.location - self.location).normalize() * 0.1
             self.next_node.acceleration = Vector(0, 0)
-            self.next_node.velocity = v * 5
+            self.next_node.velocity = (self.next_node.location - self.location).normalize()
+            self.next_node.velocity *= 0.5
 
         # 恰好在拉力和排斥力范围内，开始让自己的下一个节点随机漂移
         if self.repel_radius < distance < self.pull_radius:
@@ -119,81 +130,33 @@ class LifePlantNode(BreathableMixin, OrganismMixin):
                 # 如果距离拉力半径更近，获取拉力方向 单位向量
                 self.next_node.acceleration = (self.location - self.next_node.location).normalize()
             # 将获取到的单位向量 随机偏转，并赋予到加速度上。
-            self.next_node.acceleration = self.next_node.acceleration.rotate(random() * 90) * 0.01
+            self.next_node.acceleration = self.next_node.acceleration.rotate(_random.random() * 90)
+            self.next_node.acceleration *= 0.01
 
         # 取消掉斥力，通过acceleration增加水草浮力
-        self.next_node.acceleration += Vector(0, -0.01)
+        self.next_node.acceleration.y -= 0.01
 
-    def paint(self, painter: QPainter):
+    def batch_paint_debug(self, batch: PaintBatch):
         """
-        绘制节点
+        绘制调试信息，节点本身由 LifePlant.batch_paint 一起绘制
         """
 
         # 绘制速度矢量
         if self._show_velocity:
-            painter.setBrush(Qt.NoBrush)
-            velocity_pen = QPen(Qt.blue)
-            velocity_pen.setWidth(4)
-            painter.setPen(velocity_pen)
-
-            painter.drawLine(
-                round(self.location.x),
-                round(self.location.y),
-                round(self.location.x + self.velocity.x * 50),
-                round(self.location.y + self.velocity.y * 50)
+            batch.add_line(
+                'plant_debug_velocity', self.DEBUG_VELOCITY_PEN,
+                self.location.x,
+                self.location.y,
+                self.location.x + self.velocity.x * 50,
+                self.location.y + self.velocity.y * 50
             )
         # 绘制引力、斥力范围
         if self._show_range:
-            painter.setBrush(Qt.NoBrush)
-            painter.setPen(Qt.red)
-            painter.drawEllipse(
-                round(self.location.x - self.pull_radius),
-                round(self.location.y - self.pull_radius),
-                round(self.pull_radius * 2),
-                round(self.pull_radius * 2)
-            )
-            painter.drawEllipse(
-                round(self.location.x - self.repel_radius),
-                round(self.location.y - self.repel_radius),
-                round(self.repel_radius * 2),
-                round(self.repel_radius * 2)
-            )
-        # 绘制节点
-        painter.setBrush(QColor(69, 79, 56, 220))
-        painter.setPen(QColor(69, 79, 56, 220))
-        painter.drawEllipse(
-            round(self.location.x - self.radius),
-            round(self.location.y - self.radius),
-            round(self.radius * 2),
-            round(self.radius * 2)
-        )
-
-        # 绘制与下一个节点之间的连线
-        line_pen = QPen(QColor(69, 79, 56, 220))
-        line_pen.setWidth(3)
-        painter.setPen(line_pen)
-        if self.next_node:
-            painter.drawLine(
-                round(self.location.x),
-                round(self.location.y),
-                round(self.next_node.location.x),
-                round(self.next_node.location.y)
-            )
-        # 绘制针状线，模拟叶子
-        if self.next_node:
-            line_pen = QPen(QColor(29, 156, 10, 200))
-            line_pen.setWidth(1)
-            painter.setPen(line_pen)
-            # 张角 和速度有关
-            edge = 10 * abs(self.velocity) + 5
-            length = 20
-            for i in range(-5, 5 + 1):
-                if i == 0:
-                    continue
-                line_vector = (self.next_node.location - self.location).normalize().rotate(i * edge) * length
-                painter.drawLine(
-                    round(self.location.x),
-                    round(self.location.y),
-                    round(self.location.x + line_vector.x),
-                    round(self.location.y + line_vector.y)
+            for radius in (self.pull_radius, self.repel_radius):
+                batch.add_ellipse(
+                    'plant_debug_range', self.DEBUG_RANGE_PEN, Qt.NoBrush,
+                    self.location.x - radius,
+                    self.location.y - radius,
+                    radius * 2,
+                    radius * 2
                 )
@@ -1,41 +1,90 @@
+from collections import deque
+
+import numpy as np
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPainter, QColor, QPen
+from PyQt5.QtGui import QPainter
 
 from cyber_life.static import TANK_SCREEN_WIDTH
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_cache import PAINT_CACHE
 
 
-class SandWave:
+class SandWaveGroup:
     """
-    一个地震环形 波
+    一个震荡波流产生的所有地震环形 波
+    同一个流里的波圆心相同，半径每帧变化 radius_variation，所以波的半径只取决于它是第几帧产生的。
+    这里只按顺序存每个波产生的帧数，画的时候再算半径和透明度，不需要每帧更新每个波。
     """
 
     MAX_RADIUS = TANK_SCREEN_WIDTH / 2
 
-    def __init__(self, x, radius, radius_variation):
+    def __init__(self, x, radius_variation: float, capacity: int):
         self.x = x
-        self.radius = radius
-        self.radius_variation: float = radius_variation
+        self.radius_variation = radius_variation
+        # 向外扩散的波从圆心开始，向内扩散的波从最大半径开始
+        self.init_radius = 0 if radius_variation > 0 else self.MAX_RADIUS
+        # 一个波从产生到过期经过的帧数
+        self.lifetime = self.MAX_RADIUS / abs(radius_variation)
+        # 每个波产生的帧数，越早产生的越靠前，满了之后挤掉最早的
+        self.birth_ticks: deque[int] = deque(maxlen=capacity)
 
-    def tick(self):
-        self.radius += self.radius_variation
+    def __len__(self) -> int:
+        return len(self.birth_ticks)
 
-    def is_expired(self):
-        return self.radius >= self.MAX_RADIUS or self.radius <= 0
+    def spawn(self, tick: int):
+        self.birth_ticks.append(tick)
 
-    def paint(self, painter: QPainter):
-        alpha_rate = (self.MAX_RADIUS - self.radius) / self.MAX_RADIUS
-        line_pen = QPen(QColor(224, 159, 0, round((255 - 50) * alpha_rate)))
-        line_pen.setWidth(8)
-        painter.setPen(line_pen)
-        painter.setBrush(Qt.NoBrush)
+    def clear(self):
+        self.birth_ticks.clear()
+
+    def expire(self, tick: int):
+        """
+        移除到第 tick 帧时已经过期的波，也就是半径到达最大半径或者 0 的波
+        """
+
+        while self.birth_ticks and tick - self.birth_ticks[0] >= self.lifetime:
+            self.birth_ticks.popleft()
+
+    def radii(self, tick: float) -> np.ndarray:
+        """
+        第 tick 帧时所有波的半径，按产生的顺序排列，tick 可以是小数
+        """
+
+        ages = tick - np.array(self.birth_ticks, dtype=np.float64)
+        return self.init_radius + self.radius_variation * ages
+
+    def report_bounds(self, dirty: DirtyRegion, tick: float):
+        """
+        报告最大的一个波的外接矩形，其余的波都在它里面
+        """
+
+        from .tank import LIFE_TANK  # 避免循环依赖，底层导入顶层模块
+
+        if not self.birth_ticks:
+            return
+        # 向外扩散的波最早产生的最大，向内扩散的波最晚产生的最大
+        birth_tick = self.birth_ticks[0] if self.radius_variation > 0 else self.birth_ticks[-1]
+        radius = min(self.MAX_RADIUS, max(0, self.init_radius + self.radius_variation * (tick - birth_tick)))
+        bottom = LIFE_TANK.division[1] + 4
+        # 下半圆，线宽 8 像素，向外画出 4 像素
+        dirty.add_rect(self.x - radius, bottom, 2 * radius, radius, margin=4)
+
+    def paint(self, painter: QPainter, tick: float):
         # 应该画一个下半圆
         from .tank import LIFE_TANK  # 避免循环依赖，底层导入顶层模块
 
-        painter.drawArc(
-            round(self.x - self.radius),
-            round(LIFE_TANK.division[1] - self.radius + 4),  # 下移动4像素，防止弧线边角看起来突出地面
-            round(2 * self.radius),
-            round(2 * self.radius),
-            180 * 16,
-            180 * 16,
-        )
+        painter.setBrush(Qt.NoBrush)
+        bottom = LIFE_TANK.division[1] + 4  # 下移动4像素，防止弧线边角看起来突出地面
+        for radius in self.radii(tick).tolist():
+            if not 0 <= radius <= self.MAX_RADIUS:
+                continue
+            alpha_rate = (self.MAX_RADIUS - radius) / self.MAX_RADIUS
+            painter.setPen(PAINT_CACHE.pen(224, 159, 0, (255 - 50) * alpha_rate, 8))
+            painter.drawArc(
+                round(self.x - radius),
+                round(bottom - radius),
+                round(2 * radius),
+                round(2 * radius),
+                180 * 16,
+                180 * 16,
+            )
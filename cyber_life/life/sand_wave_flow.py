@@ -1,10 +1,11 @@
 from math import inf
-from typing import List
 
 from PyQt5.QtGui import QPainter
 
-from cyber_life.life.sand_wave import SandWave
+from cyber_life.life.sand_wave import SandWaveGroup
+from cyber_life.static import MAX_SAND_WAVES
 from cyber_life.tools.compute import RangeDivider
+from cyber_life.tools.dirty_region import DirtyRegion
 
 
 class SandWaveFlow:
@@ -16,12 +17,13 @@ class SandWaveFlow:
 
     DISKIO_FREQ_RD = RangeDivider(
         (1, 4, 8, 12, 16, 20, 24, 28, 32),
-        (inf, 100, 50, 40, 20, 15, 10, 6, 4, 2)
+        (inf, 100, 50, 40, 20, 15, 10, 6, 4, 2),
+        lut_range=(-2, 62)  # 查的是 bit_length() - 2，字节数为 0 时是 -2
     )
 
-    def __init__(self, x, wave_radius_speed):
+    def __init__(self, x, wave_radius_speed, capacity: int = MAX_SAND_WAVES):
         self.x = x
-        self.sand_waves: List[SandWave] = []
+        self.sand_waves = SandWaveGroup(x, wave_radius_speed, capacity)
         self.wave_radius_speed = wave_radius_speed
 
         # 波的周期（单位是帧），代表的是每多少帧产生一个波，最小值=2，表示最密集
@@ -30,26 +32,30 @@ class SandWaveFlow:
 
     def tick(self):
         self.time += 1
-        # 让每一个波都更新
-        for sand_wave in self.sand_waves:
-            sand_wave.tick()
-        # 移除过期的波
-        self.sand_waves = [sand_wave for sand_wave in self.sand_waves if not sand_wave.is_expired()]
+        # 波的半径由产生的帧数算出，不需要逐个更新，只移除过期的波
+        self.sand_waves.expire(self.time)
         # 产生新的波
         if self.time % self.period == 0:
-            if self.wave_radius_speed > 0:
-                init_radius = 0
-            else:
-                init_radius = SandWave.MAX_RADIUS
-            self.sand_waves.append(SandWave(self.x, init_radius, self.wave_radius_speed))
+            self.sand_waves.spawn(self.time)
 
     def set_frequency_by_disk_io(self, io_bytes: int):
         """
         根据磁盘IO的频率设置波的周期
+        io_bytes 是 KB/s。分级是按原来每 0.5 秒读写的 KB 数定的，KB/s 是它的两倍，bit_length() 多 1，所以减 2
         """
 
-        self.period = self.DISKIO_FREQ_RD[io_bytes.bit_length() - 1]  # bit_length() 相当于取对数
+        self.period = self.DISKIO_FREQ_RD[io_bytes.bit_length() - 2]  # bit_length() 相当于取对数
 
-    def paint(self, painter: QPainter):
-        for sand_wave in self.sand_waves:
-            sand_wave.paint(painter)
+    def report_bounds(self, dirty: DirtyRegion, time: float | None = None):
+        """
+        :param time: 和 paint 一样，报告第几帧的样子
+        """
+
+        self.sand_waves.report_bounds(dirty, self.time if time is None else time)
+
+    def paint(self, painter: QPainter, time: float | None = None):
+        """
+        :param time: 画第几帧的样子，可以是小数，默认是当前帧
+        """
+
+        self.sand_waves.paint(painter, self.time if time is None else time)
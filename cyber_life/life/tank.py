@@ -3,18 +3,22 @@
 """
 
 from datetime import datetime, timedelta
-from math import sin
+from math import ceil
 
-from PIL import ImageGrab
+import numpy as np
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPainter, QColor, QLinearGradient
+from PyQt5.QtGui import QPainter, QColor, QPolygonF
 
 from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
 from cyber_life.life.sand_wave_flow import SandWaveFlow
 from cyber_life.service.settings import SETTINGS
 from cyber_life.static import COLOR_DEBUG
-from cyber_life.static import TANK_SCREEN_WIDTH
+from cyber_life.static import TANK_SCREEN_WIDTH, TANK_SCREEN_HEIGHT
+from cyber_life.tools.color import ColorRamp
 from cyber_life.tools.compute import lerp, RangeDivider
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.layer_cache import CachedLayer
+from cyber_life.tools.paint_cache import PAINT_CACHE, PaintCache
 from cyber_life.tools.singleton import SingletonMeta
 
 
@@ -44,6 +48,9 @@ class _LifeTank(metaclass=SingletonMeta):
         )
     )
 
+    # 水面波浪线相邻两个点的水平距离，px
+    WATER_SURFACE_STEP = 2
+
     # 由时间决定颜色
     STROKE_COLOR_RD = RangeDivider(
         # 早晨5点到6点以及傍晚6点到7点，返回深紫到石灰色
@@ -53,25 +60,28 @@ class _LifeTank(metaclass=SingletonMeta):
         # 上午10点到下午4点，明亮的日光色
         # 下午4点到下午6点，夕阳色
         (5, 7, 10, 16, 18, 19, 22),
-        ('gray', 'purple', 'skyblue', 'yellow', 'orange', 'purple', 'darkblue', 'gray')
+        ('gray', 'purple', 'skyblue', 'yellow', 'orange', 'purple', 'darkblue', 'gray'),
+        lut_range=(0, 23)
     )
 
-    def __init__(self, width: int):
+    def __init__(self, width: int, height: int | None = None):
         """
         初始化小鱼缸数据
         :param width: 界面大小宽度，px
+        :param height: 界面大小高度，px，为 None 时先按 16:9 计算，
+                       创建 QApplication 之后再通过 resize 改成和主屏幕同比例
         """
 
         self.width = int(width)
-        # 获取屏幕的宽度和高度
-        w, h = ImageGrab.grab().size
-        self.height = int(self.width * (h / w))
+        self.height = int(height) if height is not None else round(self.width * 9 / 16)
 
         # 分界线
         # 三个数字分别是水面的、表层沙顶部、深层沙顶部的 y 值
         # 这三个值都是渐变的，每帧的位移（也就是速率）与 abs(x - x_target) 成正比，比例系数设为 ALPHA
         # 当某一个元素 x_target 突变后保持不变时，x 的变化类似指数衰减，收敛于 x_target
         self.division: list[float] = [0., self.height, self.height]  # 水面的、表层沙顶部、深层沙顶部的 y 值
+        # 上一帧的分界线，绘制水面时在上一帧和这一帧之间插值
+        self.previous_division: list[float] = self.division
         # 目标值，突变的
         # 由内存占用率计算得到
         self.division_target: list[float] = [0., 0., 0.]
@@ -83,6 +93,8 @@ class _LifeTank(metaclass=SingletonMeta):
         # 将棕色作为最差颜色，不太好，容易和沙子颜色混淆
         # self.water_color_worst = QColor(200, 150, 50, 40)
         self.water_color_worst = QColor(22, 135, 67, 80)
+        # 随磁盘占用率从最好颜色渐变到最差颜色，预先分好级
+        self.water_color_ramp = ColorRamp((self.water_color_best, self.water_color_worst))
 
         # 顶部灯光亮度 0 表示黑 1表示最亮
         self.light_brightness_target = 1
@@ -95,9 +107,29 @@ class _LifeTank(metaclass=SingletonMeta):
         self.sand_wave_outer = SandWaveFlow(self.width / 2, 1)
         self.sand_wave_inner = SandWaveFlow(self.width / 2, -1)
 
+        # 静态图层缓存，见 paint
+        self._light_layer = CachedLayer(self._paint_light)
+        self._sand_layer = CachedLayer(self._paint_sand)
+        self._frame_layer = CachedLayer(self._paint_frame)
+        # 上一次报告脏区域时静态部分（图层的 key 和水的颜色）的样子，变了就整个窗口重绘，见 report_bounds
+        self._static_key = None
+        # 水体多边形和它的坐标数组，见 _water_polygon
+        self._water_polygon: QPolygonF | None = None
+        self._water_points: np.ndarray | None = None
+
         self.time = 0
         self.tick()  # 初始化的时候就将高度信息更新好
 
+    def resize_by_screen(self, screen_width: int, screen_height: int):
+        """
+        保持宽度不变，让小鱼缸和屏幕同比例
+        屏幕大小从 QScreen 获取，不需要截屏
+        """
+
+        self.height = int(self.width * (screen_height / screen_width))
+        self.division = [0., self.height, self.height]
+        self.previous_division = self.division
+
     def get_sand_surface_height_target(self):
         """
         沙子表面层高度，y值，坐标原点为左上角
@@ -110,15 +142,19 @@ class _LifeTank(metaclass=SingletonMeta):
         # 否则根据系统内存占用率计算
         else:
             memory_info = SYSTEM_INFO_MANAGER.INSPECTOR_MEMORY.get_current_result()
-            return self.height * memory_info.physical_memory_total / (  # 这个算的是物理内存占总内存的比例
-                    memory_info.physical_memory_total + memory_info.swap_memory_total
-            )
+            memory_total = memory_info.physical_memory_total + memory_info.swap_memory_total
+            # 还没有第一次检测结果，先不显示沙子
+            if memory_total == 0:
+                return self.height
+            return self.height * memory_info.physical_memory_total / memory_total  # 这个算的是物理内存占总内存的比例
 
     def tick(self):
         """
         小鱼缸更新一次
         """
 
+        self.save_previous_state()
+
         # 更新内存信息
         memory_info = SYSTEM_INFO_MANAGER.INSPECTOR_MEMORY.get_current_result()
 
@@ -152,93 +188,193 @@ class _LifeTank(metaclass=SingletonMeta):
         self.sand_wave_outer.tick()
         self.sand_wave_inner.tick()
 
-    def get_wave_height(self, x, wave_info: tuple[float, float, float]):
+    def save_previous_state(self):
+        """
+        记下这一帧的分界线，作为下一帧绘制时插值的起点
+        分界线每帧都换成新的列表，不会原地修改，不需要复制
+        """
+
+        self.previous_division = self.division
+
+    def render_water_top(self, blend: float = 1.0) -> float:
+        """
+        绘制时水面的 y 值，在上一帧和这一帧之间插值
+        """
+
+        if blend >= 1:
+            return self.division[0]
+        return lerp(self.previous_division[0], self.division[0], blend)
+
+    def get_wave_height(self, x, wave_info: tuple[float, float, float], time: float | None = None):
         """
         获取波浪线高度，用于绘制sin型波浪水面
+        x 可以是 NumPy 数组，一次算出一排点的高度
+        time 是第几帧的样子，可以是小数，默认是当前帧
         """
 
+        if time is None:
+            time = self.time
+
         # x 前面的参数才能改变频率
         # 机械波波函数：y(x, t) = Asin(ω(t+x/v)) = Asin((t/2π + 2πx/v) × f)
         # 系数全重置了
 
-        return wave_info[0] * sin((x + self.time * wave_info[2]) * wave_info[1] * 0.2)
+        return wave_info[0] * np.sin((x + time * wave_info[2]) * wave_info[1] * 0.2)
 
-    def paint(self, painter: QPainter):
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(Qt.NoBrush)
-        # ---------------------------------------- 绘制顶部灯光 ----------------------------------------
-        gradient = QLinearGradient(0, 0, 0, self.division[0])
-        gradient.setColorAt(
-            0.0,
-            QColor(255, 255, 255, round(255 * self.light_brightness_current))  # 开始颜色
-        )
-        gradient.setColorAt(
-            1.0,
-            QColor(255, 255, 255, 0)  # 结束颜色
-        )
-        # 绘制矩形，使用渐变填充
-        painter.fillRect(0, 0, self.width, self.height, gradient)
+    def _water_polygon_points(self) -> np.ndarray:
+        """
+        水体多边形的坐标数组，shape = (点数, 2)，是多边形内部数据的视图，改写数组就是改写多边形
+        前面是从左到右的波浪线上的点，最后两个点是右下角、左下角
+        多边形只在第一次使用时创建，之后每帧原地更新坐标，不再逐点创建 QPointF
+        """
+
+        if self._water_polygon is None:
+            count = ceil(self.width / self.WATER_SURFACE_STEP) + 1
+            polygon = QPolygonF(count + 2)
+            pointer = polygon.data()
+            pointer.setsize((count + 2) * 2 * np.dtype(np.float64).itemsize)
+            points = np.frombuffer(pointer, dtype=np.float64).reshape(count + 2, 2)
+            points[:count, 0] = np.linspace(0, self.width, count)
+            points[count:, 0] = (self.width, 0)
+            self._water_polygon, self._water_points = polygon, points
+        return self._water_points
+
+    def _light_key(self) -> tuple[int, int]:
+        # 亮度每帧都向目标靠近一点，按渐变实际用的透明度取整，透明度不变时不重画、不整个窗口重绘
+        return round(self.division[0]), PaintCache.quantize_alpha(255 * self.light_brightness_current)
+
+    def _sand_key(self) -> tuple[int, int]:
+        return round(self.division[1]), round(self.division[2])
+
+    def _water_color_index(self) -> int:
+        """
+        水的颜色在 water_color_ramp 中的级数，由磁盘占用率决定
+        """
 
-        # ---------------------------------------- 填充波浪形水（定积分画法） ----------------------------------------
         water_color_ratio = SYSTEM_INFO_MANAGER.INSPECTOR_DISK_USAGE.get_current_result()
         if COLOR_DEBUG:
             water_color_ratio = (0.005 * self.time) % 1
+        return self.water_color_ramp.index(water_color_ratio)
 
-        painter.setBrush(lerp(
-            self.water_color_best,
-            self.water_color_worst,
-            water_color_ratio
-        ))
+    def _wave_info(self) -> tuple[float, float, float]:
+        """
+        水面波动的振幅、频率、速度，由下载网速决定
+        """
+
+        return self.WAVE_INFO_RD[SYSTEM_INFO_MANAGER.INSPECTOR_NETWORK.get_current_result().recv_speed]
+
+    def report_bounds(self, dirty: DirtyRegion, blend: float = 1.0):
+        """
+        报告这一帧会变化的地方：水面的波浪线、震荡波、贪吃蛇边框
+        灯光、沙子、水的颜色变化时整个窗口重绘
+        """
+
+        static_key = (self._light_key(), self._sand_key(), self._water_color_index())
+        if static_key != self._static_key:
+            self._static_key = static_key
+            dirty.invalidate()
+
+        # 水面上下振幅范围内的一条
+        amplitude = self._wave_info()[0]
+        dirty.add_rect(0, self.render_water_top(blend) - amplitude, self.width, 2 * amplitude)
+
+        for flow in (self.sand_wave_outer, self.sand_wave_inner):
+            flow.report_bounds(dirty, flow.time - 1 + blend)
+
+        # 报告和绘制之间时间还会走一点，多留 1 像素
+        for x1, y1, x2, y2 in self._snake_segments(self.width, self.height):
+            dirty.add_rect(min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1), margin=1)
+
+    def paint(self, painter: QPainter, blend: float = 1.0):
+        """
+        :param blend: 水面、震荡波在上一帧和这一帧之间插值，1 是这一帧的样子
+        """
+
+        # 灯光、沙子、边框只有在分界线移动或亮度变化时才会变，画在缓存图层上，每帧只贴图
+        # 缓存的 key 用的是量化后的输入：分界线取整到像素，亮度取整到渐变实际用的透明度（PaintCache.ALPHA_STEP 的倍数）
+        # ---------------------------------------- 绘制顶部灯光 ----------------------------------------
+        self._light_layer.draw(painter, self.width, self.height + 1, self._light_key())
+
+        # ---------------------------------------- 填充波浪形水 ----------------------------------------
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.water_color_ramp[self._water_color_index()])
 
         # 绘制水面
-        wave_info = self.WAVE_INFO_RD[
-            SYSTEM_INFO_MANAGER.INSPECTOR_NETWORK.get_current_result().recv_speed
-        ]
-        dx = 10  # 一个小微元，即每次绘制细矩形的宽度
-        for x in range(0, self.width, dx):
-            y = round(self.division[0] + self.get_wave_height(x, wave_info))
-            painter.drawRect(
-                x, y,
-                dx, self.height - y
-            )
+        wave_info = self._wave_info()
+        # 波浪线和小鱼缸底部围成一个多边形，一次画完
+        points = self._water_polygon_points()
+        surface = points[:-2]
+        np.add(
+            self.get_wave_height(surface[:, 0], wave_info, self.time - 1 + blend),
+            self.render_water_top(blend),
+            out=surface[:, 1]
+        )
+        points[-2:, 1] = self.height
+        painter.drawPolygon(self._water_polygon)
 
         # ---------------------------------------- 填充沙子 ----------------------------------------
-        # 表层颜色应该更深，深层颜色应该更浅，因为表层是污染层，深层有石英石
+        self._sand_layer.draw(painter, self.width, self.height + 1, self._sand_key())
+
+        # ---------------------------------------- 绘制波浪圆圈 ----------------------------------------
+        for flow in (self.sand_wave_outer, self.sand_wave_inner):
+            flow.paint(painter, flow.time - 1 + blend)
+
+        # ---------------------------------------- 绘制小鱼缸边框 ----------------------------------------
+        self._frame_layer.draw(painter, self.width, self.height + 1, ())
+
+        # ---------------------------------------- 绘制贪吃蛇风格的边框 ----------------------------------------
+        self.draw_snake_style_border(painter, self.width, self.height)
+
+    def _paint_light(self, painter: QPainter, water_top: int, alpha: int):
+        """
+        绘制顶部灯光图层
+        """
+
+        gradient = PAINT_CACHE.linear_gradient(0, 0, 0, water_top, (
+            (0.0, (255, 255, 255, alpha)),  # 开始颜色
+            (1.0, (255, 255, 255, 0)),  # 结束颜色
+        ))
+        # 绘制矩形，使用渐变填充
+        painter.fillRect(0, 0, self.width, self.height, gradient)
+
+    def _paint_sand(self, painter: QPainter, surface_top: int, deep_top: int):
+        """
+        绘制沙子图层
+        表层颜色应该更深，深层颜色应该更浅，因为表层是污染层，深层有石英石
+        """
+
+        painter.setPen(Qt.NoPen)
         # 绘制表面层
-        painter.setBrush(QColor(62, 53, 28))
+        painter.setBrush(PAINT_CACHE.color(62, 53, 28))
         painter.drawRect(
             0,
-            round(self.division[1]),
+            surface_top,
             round(self.width),
-            round(self.height - self.division[1]),
+            self.height - surface_top,
         )
         # 绘制深层
-        painter.setBrush(QColor(92, 73, 36))
+        painter.setBrush(PAINT_CACHE.color(92, 73, 36))
         painter.drawRect(
             0,
-            round(self.division[2]) + 1,  # 加1是为了防止两层完全重合，表层看不到
+            deep_top + 1,  # 加1是为了防止两层完全重合，表层看不到
             round(self.width),
-            round(self.height - self.division[2]),
+            self.height - deep_top,
         )
 
-        # ---------------------------------------- 绘制波浪圆圈 ----------------------------------------
-        self.sand_wave_outer.paint(painter)
-        self.sand_wave_inner.paint(painter)
+    def _paint_frame(self, painter: QPainter):
+        """
+        绘制小鱼缸边框图层
+        """
 
-        # ---------------------------------------- 绘制小鱼缸边框 ----------------------------------------
         painter.setPen(Qt.black)
         painter.setBrush(Qt.NoBrush)
         painter.drawRect(0, 0, self.width - 1, self.height)
 
-        # ---------------------------------------- 绘制贪吃蛇风格的边框 ----------------------------------------
-        self.draw_snake_style_border(painter, self.width, self.height)
-
-    def draw_snake_style_border(self, painter: QPainter, width: int, height: int):
+    def _snake_segments(self, width: int, height: int) -> list[tuple[int, int, int, int]]:
         """
-        绘制贪吃蛇风格的边框
+        贪吃蛇风格的边框这一时刻的五段线段，每段是 x1, y1, x2, y2
         """
 
-        # 绘制贪吃蛇风格的边框
         snake_length = min(width, height)
         perimeter = (width + height) * 2  # 周长
         # 这里时从 left top 开始计算的，为了让起点从 top center 开始，需要将时间向后推移一点
@@ -271,37 +407,22 @@ class _LifeTank(metaclass=SingletonMeta):
         stage_5_tail_y = lerp(snake_length, -perimeter + snake_length, progression)
         stage_5_head_y = stage_5_tail_y - snake_length
 
+        return [
+            (round(stage_1_tail_x), 0, round(stage_1_head_x), 0),
+            (round(width - 1), round(stage_2_tail_y), round(width - 1), round(stage_2_head_y)),
+            (round(stage_3_tail_x), round(height), round(stage_3_head_x), round(height)),
+            (0, round(stage_4_tail_y), 0, round(stage_4_head_y)),
+            (0, round(stage_5_tail_y), 0, round(stage_5_head_y)),
+        ]
+
+    def draw_snake_style_border(self, painter: QPainter, width: int, height: int):
+        """
+        绘制贪吃蛇风格的边框
+        """
+
         painter.setPen(self.get_stroke_color())
-        painter.drawLine(
-            round(stage_1_tail_x),
-            0,
-            round(stage_1_head_x),
-            0
-        )
-        painter.drawLine(
-            round(width - 1),
-            round(stage_2_tail_y),
-            round(width - 1),
-            round(stage_2_head_y)
-        )
-        painter.drawLine(
-            round(stage_3_tail_x),
-            round(height),
-            round(stage_3_head_x),
-            round(height)
-        )
-        painter.drawLine(
-            0,
-            round(stage_4_tail_y),
-            0,
-            round(stage_4_head_y)
-        )
-        painter.drawLine(
-            0,
-            round(stage_5_tail_y),
-            0,
-            round(stage_5_head_y)
-        )
+        for x1, y1, x2, y2 in self._snake_segments(width, height):
+            painter.drawLine(x1, y1, x2, y2)
 
     def get_stroke_color(self) -> QColor:
         """
@@ -312,7 +433,7 @@ class _LifeTank(metaclass=SingletonMeta):
         if COLOR_DEBUG:
             current_hour = (self.time // 10 % 24)
 
-        return QColor(self.STROKE_COLOR_RD[current_hour])
+        return PAINT_CACHE.named_color(self.STROKE_COLOR_RD[current_hour])
 
 
-LIFE_TANK = _LifeTank(TANK_SCREEN_WIDTH)
+LIFE_TANK = _LifeTank(TANK_SCREEN_WIDTH, TANK_SCREEN_HEIGHT)
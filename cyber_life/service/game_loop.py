@@ -0,0 +1,151 @@
+"""
+固定步长的主循环
+原来定时器每触发一次就模拟一帧、绘制一次：绘制或者垃圾回收耽误了定时器，这段时间的帧就丢了，
+小鱼缸动得多快取决于机器画得多快。
+
+现在模拟和绘制分开：
+模拟按固定的步长（每秒 SIM_TICK_RATE 帧）推进。每次绘制之前把距离上一次过去的真实时间放进累加器，
+攒够几个步长就模拟几帧，不足一个步长的部分留到下一次。
+绘制按显示器的刷新率（或者 RENDER_RATE）进行，画的是最近两帧之间按累加器余量插值的样子，
+绘制和模拟的频率不一样时画面也是连续的，代价是画面比模拟晚不到一帧。
+
+一次绘制之前最多模拟 MAX_TICKS_PER_FRAME 帧，补不完的留在累加器里下次再补，
+所以绘制、垃圾回收卡住不超过 MAX_BACKLOG 秒时，这段时间会在之后几次绘制中逐帧补上。
+两次刷新之间超过 MAX_BACKLOG 秒的中断（电脑睡眠、界面卡住）由省电模式检测，交给快进（cyber_life.life.fast_forward），
+几次卡顿叠在一起让累加器超过 MAX_BACKLOG 秒时，多出来的部分也交给快进（见 missed_ticks），错过的时间都不会丢。
+只有连续 OVERLOAD_SECONDS 秒每次都补不完，说明机器的速度跟不上模拟，这时才丢掉多出来的部分，
+小鱼缸变慢，而不是越补越卡。
+看不到小鱼缸时不绘制，由省电模式（cyber_life.service.power_mode）低频率地补帧。
+"""
+import logging
+import time
+
+from cyber_life.static import SIM_TICK_RATE, RENDER_RATE
+from cyber_life.tools.singleton import SingletonMeta
+
+lg = logging.getLogger(__name__)
+
+
+class GameLoop(metaclass=SingletonMeta):
+    """
+    决定每次绘制之前模拟几帧，以及绘制时在最近两帧之间插值的比例
+    比如每秒模拟 100 帧，距离上一次绘制过了 25ms，这次模拟 2 帧，剩下 5ms 是半帧，画上一帧和这一帧中间的样子
+    """
+
+    MAX_TICKS_PER_FRAME = 10  # 一次绘制之前最多模拟多少帧
+    # 累加器最多积压多少秒，超过的部分交给快进，省电模式判断错过了帧（PowerMode.MISSED_GAP）也用这个值
+    MAX_BACKLOG = 1.0
+    OVERLOAD_SECONDS = 2.0  # 连续这么多秒每次都补不完，说明机器跟不上，积压超过 MAX_BACKLOG 的部分丢掉
+    DEFAULT_RENDER_RATE = 60  # 还不知道显示器刷新率时每秒绘制多少次
+
+    def __init__(self, sim_rate: float = SIM_TICK_RATE, render_rate: float | None = RENDER_RATE):
+        """
+        :param sim_rate: 每秒模拟多少帧
+        :param render_rate: 每秒绘制多少次，None 表示跟随显示器的刷新率，见 set_display_refresh_rate
+        """
+
+        self.sim_rate = sim_rate
+        # 模拟一帧的时长，秒
+        self.step = 1 / sim_rate
+        self.render_rate = self.DEFAULT_RENDER_RATE if render_rate is None else render_rate
+        self._is_following_display = render_rate is None
+        # 还没有模拟的时间，秒
+        self._accumulator = 0.0
+        # 上一次 advance 的时间，第一次之前为 None
+        self._last_time: float | None = None
+        # 从什么时候开始每次都补不完，没有补不完时为 None
+        self._clamped_since: float | None = None
+        # 积压太多、需要快进的帧数
+        self._missed_ticks = 0
+        # 统计：advance 的次数、模拟的帧数、达到 MAX_TICKS_PER_FRAME 的次数、机器跟不上丢掉的秒数
+        self.frame_count = 0
+        self.tick_count = 0
+        self.clamped_count = 0
+        self.dropped_seconds = 0.0
+
+    @property
+    def render_interval(self) -> int:
+        """
+        两次绘制之间的间隔，ms，定时器只能精确到毫秒
+        """
+
+        return max(1, round(1000 / self.render_rate))
+
+    def set_display_refresh_rate(self, refresh_rate: float):
+        """
+        RENDER_RATE 为 None 时跟随显示器的刷新率，拿不到刷新率（返回 0）时保持原来的值
+        """
+
+        if self._is_following_display and refresh_rate > 0 and refresh_rate != self.render_rate:
+            self.render_rate = refresh_rate
+            lg.info(f'每秒模拟 {self.sim_rate} 帧，跟随显示器每秒绘制 {refresh_rate:.0f} 次')
+
+    @property
+    def blend(self) -> float:
+        """
+        绘制时在上一帧和这一帧之间插值的比例，0 是上一帧的样子，1 是这一帧的样子
+        """
+
+        return min(self._accumulator * self.sim_rate, 1.0)
+
+    def reset(self, now: float | None = None):
+        """
+        从现在开始重新计时，之前的时间不再模拟
+        用于这段时间已经快进过、或者已经由省电模式补过的情况
+        """
+
+        self._last_time = time.monotonic() if now is None else now
+        self._accumulator = 0.0
+        self._clamped_since = None
+
+    def advance(self, now: float | None = None) -> int:
+        """
+        每次绘制之前调用，返回这次应该模拟的帧数
+
+        :param now: 当前时间（time.monotonic），秒，测试时指定
+        """
+
+        if now is None:
+            now = time.monotonic()
+        last, self._last_time = self._last_time, now
+        if last is None:
+            return 0
+        self._accumulator += max(0.0, now - last)
+
+        # 加一点余量，避免浮点误差让刚好攒够的一帧变成下一次
+        ticks = int(self._accumulator * self.sim_rate + 1e-9)
+        if ticks > self.MAX_TICKS_PER_FRAME:
+            ticks = self.MAX_TICKS_PER_FRAME
+            self.clamped_count += 1
+            if self._clamped_since is None:
+                self._clamped_since = now
+        else:
+            self._clamped_since = None
+        self._accumulator = max(0.0, self._accumulator - ticks * self.step)
+
+        excess = self._accumulator - self.MAX_BACKLOG
+        if excess > 0:
+            if self._clamped_since is not None and now - self._clamped_since >= self.OVERLOAD_SECONDS:
+                # 机器一直跟不上，再补只会越补越卡
+                self.dropped_seconds += excess
+                self._accumulator = self.MAX_BACKLOG
+            else:
+                # 最早积压的部分交给快进，不足一帧的部分留在累加器里
+                missed = int(excess * self.sim_rate + 1e-9)
+                self._missed_ticks += missed
+                self._accumulator -= missed * self.step
+
+        self.frame_count += 1
+        self.tick_count += ticks
+        return ticks
+
+    def missed_ticks(self) -> int:
+        """
+        每次 advance 之后调用，返回积压太多、需要快进的帧数
+        """
+
+        ticks, self._missed_ticks = self._missed_ticks, 0
+        return ticks
+
+
+GAME_LOOP = GameLoop()
@@ -0,0 +1,141 @@
+"""
+省电模式
+小鱼缸被隐藏或者被完全挡住时，看不到画面，没有必要按显示器的刷新率模拟、绘制，也没有必要频繁检测系统信息。
+此时停止绘制，模拟改为低频率地一次补上这段时间应该走的帧，检测间隔整体放大；重新显示时全部恢复。
+
+电脑睡眠、休眠，或者一次补不过来时，错过的帧不再丢弃，而是交给快进（cyber_life.life.fast_forward）一次推进。
+"""
+import logging
+import time
+
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+from cyber_life.service.game_loop import GAME_LOOP, GameLoop
+from cyber_life.tools.singleton import SingletonMeta
+
+lg = logging.getLogger(__name__)
+
+
+class PowerMode(metaclass=SingletonMeta):
+    """
+    根据小鱼缸是否可见切换省电模式，并统计省下的 CPU 时间
+
+    省下的 CPU 时间 = 可见时平均每秒消耗的 CPU 时间 * 不可见的时长 - 不可见时实际消耗的 CPU 时间
+    CPU 时间取整个进程的（包括监测线程、钩子线程），所以是估算值
+    """
+
+    HIDDEN_INTERVAL = 250  # 不可见时的刷新间隔，ms
+    HIDDEN_INSPECTION_SCALE = 10  # 不可见时检测间隔放大的倍数
+    MAX_CATCH_UP_TICKS = 50  # 不可见时一次最多补多少帧，超过的部分交给快进
+    # 两次刷新之间墙上时间超过这么多秒，就认为错过了中间的帧（比如电脑睡眠了）
+    # 和主循环最多积压的时间一样，更短的卡顿由主循环逐帧补上，两者之间没有既不补也不快进的空档
+    MISSED_GAP = GameLoop.MAX_BACKLOG
+
+    def __init__(self):
+        self.is_visible = True
+        now = time.monotonic()
+        cpu_now = time.process_time()
+        # 当前模式开始的时间和 CPU 时间
+        self._mode_start = now
+        self._mode_start_cpu = cpu_now
+        # 可见状态下累计的时长和 CPU 时间，用来计算平均每秒消耗的 CPU 时间
+        self._visible_seconds = 0.0
+        self._visible_cpu_seconds = 0.0
+        # 已经结束的不可见时段省下的 CPU 时间
+        self._saved_cpu_seconds = 0.0
+        # 上一次模拟到的时间，用于不可见时补帧
+        self._last_tick_time = now
+        # 上一次刷新时的墙上时间，睡眠时 monotonic 不一定会走，墙上时间一定会走，第一次刷新之前为 None
+        self._last_wall_time: float | None = None
+        # 补不过来、需要快进的帧数
+        self._missed_ticks = 0
+
+    @property
+    def interval(self) -> int:
+        """
+        当前模式下的刷新间隔，ms，可见时按绘制的频率刷新
+        """
+
+        return GAME_LOOP.render_interval if self.is_visible else self.HIDDEN_INTERVAL
+
+    def set_visible(self, is_visible: bool):
+        """
+        小鱼缸显示或者隐藏时调用，切换模式
+        """
+
+        if is_visible == self.is_visible:
+            return
+
+        now = time.monotonic()
+        cpu_now = time.process_time()
+        seconds = now - self._mode_start
+        cpu_seconds = cpu_now - self._mode_start_cpu
+        if self.is_visible:
+            self._visible_seconds += seconds
+            self._visible_cpu_seconds += cpu_seconds
+        else:
+            self._saved_cpu_seconds += self._estimate_saved(seconds, cpu_seconds)
+
+        self.is_visible = is_visible
+        self._mode_start = now
+        self._mode_start_cpu = cpu_now
+        self._last_tick_time = now
+
+        if is_visible:
+            SYSTEM_INFO_MANAGER.set_interval_scale(1)
+            lg.info(f'小鱼缸显示，恢复正常刷新，累计省下 CPU 时间 {self.cpu_time_saved:.2f} 秒')
+        else:
+            SYSTEM_INFO_MANAGER.set_interval_scale(self.HIDDEN_INSPECTION_SCALE)
+            lg.info('小鱼缸不可见，进入省电模式')
+
+    def catch_up_ticks(self) -> int:
+        """
+        不可见时每次刷新调用，返回从上一次调用到现在应该模拟的帧数
+        """
+
+        now = time.monotonic()
+        ticks = int((now - self._last_tick_time) * GAME_LOOP.sim_rate)
+        self._last_tick_time += ticks * GAME_LOOP.step
+        if ticks > self.MAX_CATCH_UP_TICKS:
+            # 补不过来，剩下的交给快进
+            self._last_tick_time = now
+            self._missed_ticks += ticks - self.MAX_CATCH_UP_TICKS
+            ticks = self.MAX_CATCH_UP_TICKS
+        return ticks
+
+    def missed_ticks(self) -> int:
+        """
+        每次刷新时先调用，返回错过的、需要快进的帧数
+        包括距离上一次刷新墙上时间过去了太久（电脑睡眠、休眠、界面卡住），以及不可见时补不过来的帧
+        """
+
+        now = time.time()
+        last, self._last_wall_time = self._last_wall_time, now
+        if last is not None and now - last > self.MISSED_GAP:
+            self._missed_ticks += int((now - last) * GAME_LOOP.sim_rate)
+            # 这段时间已经快进了，不可见时不用再补
+            self._last_tick_time = time.monotonic()
+        ticks, self._missed_ticks = self._missed_ticks, 0
+        return ticks
+
+    def _estimate_saved(self, hidden_seconds: float, hidden_cpu_seconds: float) -> float:
+        if self._visible_seconds <= 0:
+            return 0.0
+        visible_rate = self._visible_cpu_seconds / self._visible_seconds
+        return visible_rate * hidden_seconds - hidden_cpu_seconds
+
+    @property
+    def cpu_time_saved(self) -> float:
+        """
+        累计省下的 CPU 时间，秒，包括正在进行的不可见时段
+        """
+
+        saved = self._saved_cpu_seconds
+        if not self.is_visible:
+            saved += self._estimate_saved(
+                time.monotonic() - self._mode_start,
+                time.process_time() - self._mode_start_cpu
+            )
+        return saved
+
+
+POWER_MODE = PowerMode()
@@ -0,0 +1,181 @@
+"""
+记录和回放模拟的外部输入
+模拟中的随机数都来自 RNG，只要总种子相同、每一帧的外部输入相同，两次运行的结果就逐位相同。
+外部输入有三种：监测者的检测结果、鼠标投喂的食物位置、快进（电脑睡眠之后、界面卡住之后按真实时间决定快进多少帧）。
+
+记录时每一帧开始把所有监测者的结果固定下来（一帧之内即使后台线程更新了结果，这一帧也只用同一份），
+和投喂的食物一起写入文件，没有变化的结果不重复写。回放时从文件中读出来代替真正的监测者和鼠标。
+
+快进发生在两帧之间，记录为下一帧开始之前的事件，回放时在那一帧取出输入之前快进。
+
+文件格式：连续的 pickle 对象
+1. 文件头 {'version': 2, 'seed': 总种子, 'width': 鱼缸宽, 'height': 鱼缸高}
+2. 每一条记录 (帧序号, {监测者属性名: 结果}, [食物位置])，只记录有变化的帧
+   或者 (帧序号, 'fast_forward', 快进的帧数)，在这一帧之前快进
+版本 1 的文件没有快进的记录，其余格式相同，也可以回放
+"""
+import copy
+import logging
+import pickle
+from typing import BinaryIO
+
+from cyber_life.computer_info.inspector_abc import Inspector
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+
+lg = logging.getLogger(__name__)
+
+FILE_VERSION = 2
+# 可以回放的版本
+_READABLE_VERSIONS = (1, 2)
+# 快进记录的标记
+FAST_FORWARD_EVENT = 'fast_forward'
+
+
+class LatchedInspector:
+    """
+    代替真正的监测者挂在 SYSTEM_INFO_MANAGER 上，一帧之内总是给出同一个结果
+    其它属性的读写都转给真正的监测者，比如 INSPECTOR_SCREEN.region
+    """
+
+    __slots__ = ('inspector', 'result')
+
+    def __init__(self, inspector: Inspector):
+        object.__setattr__(self, 'inspector', inspector)
+        object.__setattr__(self, 'result', inspector.get_current_result())
+
+    def get_current_result(self):
+        return self.result
+
+    def __getattr__(self, name):
+        return getattr(self.inspector, name)
+
+    def __setattr__(self, name, value):
+        if name in LatchedInspector.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.inspector, name, value)
+
+
+def _latch_inspectors() -> dict[str, LatchedInspector]:
+    """
+    用 LatchedInspector 代替 SYSTEM_INFO_MANAGER 上的所有监测者
+    """
+
+    latched = {}
+    for name, inspector in SYSTEM_INFO_MANAGER.inspectors.items():
+        latched[name] = LatchedInspector(inspector)
+        setattr(SYSTEM_INFO_MANAGER, name, latched[name])
+    return latched
+
+
+def _release_inspectors():
+    for name in SYSTEM_INFO_MANAGER.inspectors:
+        if name in SYSTEM_INFO_MANAGER.__dict__:
+            delattr(SYSTEM_INFO_MANAGER, name)
+
+
+class InputRecorder:
+    """
+    记录每一帧的外部输入，设置为 LifeManager.input_hook 后生效
+    """
+
+    def __init__(self, file_path: str, seed: int, width: int, height: int):
+        self._file: BinaryIO = open(file_path, 'wb')
+        pickle.dump({'version': FILE_VERSION, 'seed': seed, 'width': width, 'height': height}, self._file)
+        self._latched = _latch_inspectors()
+        # 上一次写入的结果，序列化之后比较，监测者原地修改结果也能发现
+        self._last_dumps: dict[str, bytes] = {}
+        self.tick_count = 0
+
+    def before_tick(self, life_manager, food_positions: list[float]) -> list[float]:
+        changes = {}
+        for name, latched in self._latched.items():
+            result = latched.inspector.get_current_result()
+            dumps = pickle.dumps(result)
+            if dumps != self._last_dumps.get(name):
+                self._last_dumps[name] = dumps
+                # 复制一份，后台线程之后原地修改结果也不会影响这一帧
+                latched.result = copy.deepcopy(result)
+                changes[name] = latched.result
+        if changes or food_positions:
+            pickle.dump((self.tick_count, changes, food_positions), self._file)
+        self.tick_count += 1
+        return food_positions
+
+    def on_fast_forward(self, ticks: int):
+        """
+        快进时由 FAST_FORWARD 调用，记录为下一帧之前的事件
+        记录结束之后的快进（比如 cyber_life.sim 的 --fast-forward）不再记录
+        """
+
+        if self._file.closed:
+            return
+        pickle.dump((self.tick_count, FAST_FORWARD_EVENT, ticks), self._file)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        _release_inspectors()
+        lg.info(f'已记录 {self.tick_count} 帧的输入')
+
+
+class InputReplayer:
+    """
+    按帧回放记录的外部输入，设置为 LifeManager.input_hook 后生效，真正的监测者和鼠标投喂都被忽略
+    """
+
+    def __init__(self, file_path: str):
+        self._file: BinaryIO = open(file_path, 'rb')
+        header = pickle.load(self._file)
+        if header.get('version') not in _READABLE_VERSIONS:
+            raise ValueError(f'不支持的输入记录版本: {header.get("version")}')
+        self.seed: int = header['seed']
+        self.width: int = header['width']
+        self.height: int = header['height']
+        self._latched = _latch_inspectors()
+        self._next_record = self._read_record()
+        self.tick_count = 0
+
+    def _read_record(self) -> tuple[int, dict | str, list[float] | int] | None:
+        try:
+            return pickle.load(self._file)
+        except EOFError:
+            return None
+
+    @property
+    def is_finished(self) -> bool:
+        """
+        记录中的输入已经全部回放完了
+        """
+
+        return self._next_record is None
+
+    def before_tick(self, life_manager, food_positions: list[float]) -> list[float]:
+        # 延迟导入，回放开始之前小鱼缸的大小还没有确定
+        from cyber_life.life.fast_forward import FAST_FORWARD
+
+        replayed_food = []
+        # 快进记录在这一帧的输入之前，快进时用的还是上一帧的检测结果
+        while self._next_record is not None and self._next_record[0] == self.tick_count:
+            _, changes, payload = self._next_record
+            self._next_record = self._read_record()
+            if changes == FAST_FORWARD_EVENT:
+                FAST_FORWARD.advance(life_manager, payload)
+                continue
+            for name, result in changes.items():
+                self._latched[name].result = result
+            replayed_food = payload
+        self.tick_count += 1
+        return replayed_food
+
+    def on_fast_forward(self, ticks: int):
+        """
+        回放时只按记录快进，忽略其它原因的快进（包括回放自己调用的）
+        """
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        _release_inspectors()
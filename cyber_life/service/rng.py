@@ -0,0 +1,69 @@
+"""
+随机数服务
+整个模拟只用一个总种子，每个子系统（生物球、水草、气泡、鱼……）各自有一个随机数流，种子由总种子和子系统名称决定。
+这样同一个总种子下两次运行的随机数完全一样，而且一个子系统多用或少用了随机数，也不会影响其它子系统。
+
+用法：在模块顶层取出自己的流，之后一直用它
+_random = RNG.stream('bubble')
+_random.random()
+"""
+import logging
+import secrets
+from random import Random
+
+from cyber_life.tools.singleton import SingletonMeta
+
+lg = logging.getLogger(__name__)
+
+
+class RandomService(metaclass=SingletonMeta):
+    """
+    随机数服务，默认使用一个随机的总种子，需要复现时用 seed() 指定
+    """
+
+    def __init__(self):
+        self.master_seed = secrets.randbits(32)
+        self._streams: dict[str, Random] = {}
+
+    def seed(self, master_seed: int):
+        """
+        重新指定总种子，已经取出的流会被原地重新播种，模块里保存的引用依然有效
+        需要在创建生物之前调用
+        """
+
+        self.master_seed = master_seed
+        for name, stream in self._streams.items():
+            stream.seed(self._stream_seed(name))
+        lg.debug(f'随机数种子 {master_seed}')
+
+    def stream(self, name: str) -> Random:
+        """
+        获取一个子系统的随机数流，同一个名称总是返回同一个对象
+        """
+
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = Random(self._stream_seed(name))
+        return stream
+
+    def get_states(self) -> dict[str, tuple]:
+        """
+        所有流的状态，保存快照用
+        """
+
+        return {name: stream.getstate() for name, stream in self._streams.items()}
+
+    def set_states(self, states: dict[str, tuple]):
+        """
+        恢复 get_states 保存的状态，之后的随机数和保存时接着往下取的一样
+        """
+
+        for name, state in states.items():
+            self.stream(name).setstate(state)
+
+    def _stream_seed(self, name: str) -> str:
+        # 字符串种子用 sha512 转成整数，不受 PYTHONHASHSEED 影响
+        return f'{self.master_seed}/{name}'
+
+
+RNG = RandomService()
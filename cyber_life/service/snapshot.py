@@ -0,0 +1,472 @@
+"""
+小鱼缸快照
+把整个鱼缸的状态（气体含量、生物球、水草的每一个节点、鱼、食物、还没放进鱼缸的食物、气泡）存到一个文件里，
+下次启动时恢复，重启之后鱼的能量、长了几个小时的水草都还在。
+
+随机数流的状态也一起保存，恢复之后接着运行，和一直没有停过的结果逐位相同。
+
+不用 pickle 保存对象，而是每种生物一张紧凑的表：NumPy 结构化数组，一行一个生物，一列一个字段。
+恢复时用 mmap 映射文件，表直接在映射的内存上解释，不需要逐个对象反序列化。
+
+文件格式（小端）：
+1. 文件头 MAGIC、版本号、表的数量、保存时小鱼缸的宽和高
+2. 每张表的目录：表名、每行字节数、行数、数据在文件中的偏移
+3. 每张表的数据，按 8 字节对齐
+
+修改了任何一张表的字段之后需要把 VERSION 加一，旧版本的快照不会被恢复，鱼缸从头开始。
+写入时先写临时文件再替换，写到一半退出也不会损坏原来的快照。
+恢复之前先检查表里的值（行数、枚举、行号、有限的浮点数），有问题时整个快照都不用，
+文件改名为 *.broken 留着排查，下次启动不会再读到它。
+"""
+import logging
+import mmap
+import os
+import struct
+import time
+from random import Random
+
+import numpy as np
+
+from cyber_life.service.rng import RNG
+from cyber_life.tools.progress_bar import ProgressFloat
+from cyber_life.tools.singleton import SingletonMeta
+from cyber_life.tools.vector import Vector
+
+lg = logging.getLogger(__name__)
+
+MAGIC = b'CYBLTANK'
+VERSION = 4
+
+_HEADER = struct.Struct('<8sHHII')
+_TABLE_ENTRY = struct.Struct('<16sIIQ')
+_ALIGN = 8
+# random.Random 的内部状态：624 个 32 位整数加上当前位置
+_RANDOM_STATE_SIZE = 625
+# 恢复失败的快照改名时加的后缀
+BROKEN_SUFFIX = '.broken'
+
+# 每张表的字段，坐标类的字段（x、y 开头）在小鱼缸大小改变时按比例缩放
+SECTIONS: dict[str, np.dtype] = {
+    'gas': np.dtype([('oxygen', '<f8'), ('carbon_dioxide', '<f8')]),
+    'tank': np.dtype([
+        ('y_water', '<f8'), ('y_sand_surface', '<f8'), ('y_sand_deep', '<f8'),
+        ('light_brightness', '<f8'), ('time', '<i8'),
+    ]),
+    'ball': np.dtype([
+        ('x', '<f8'), ('y', '<f8'), ('vx', '<f8'), ('vy', '<f8'), ('carbon', '<f8'), ('energy', '<f8'),
+    ]),
+    'plant': np.dtype([('x', '<f8')]),
+    'plant_node': np.dtype([
+        ('x', '<f8'), ('y', '<f8'), ('vx', '<f8'), ('vy', '<f8'), ('ax', '<f8'), ('ay', '<f8'),
+        ('carbon', '<f8'), ('energy', '<f8'), ('can_move', 'u1'),
+    ]),
+    # 鱼的目标食物存的是它在 food 表中的行号，-1 表示没有；没有目标位置时 x_goal、y_goal 为 NaN
+    'fish': np.dtype([
+        ('x', '<f8'), ('y', '<f8'), ('vx', '<f8'), ('vy', '<f8'), ('x_goal', '<f8'), ('y_goal', '<f8'),
+        ('energy', '<f8'), ('carbon', '<f8'), ('oxygen', '<f8'), ('o2_pre_request', '<f8'), ('energy_pre_cost', '<f8'),
+        ('time', '<i8'), ('target_food', '<i4'), ('state', 'u1'), ('img_index_swim', 'u1'), ('animation_interval', 'u1'),
+    ]),
+    # 被鱼吃掉的食物要到下一帧才从食物列表中清理，这一帧保存时还在列表里，is_deleted 为 1；
+    # 几条鱼追同一个食物时，别的鱼吃掉、已经清理的食物还是这条鱼的目标，也要保存，is_listed 为 0
+    'food': np.dtype([
+        ('x', '<f8'), ('y', '<f8'), ('float_remaining', '<f8'), ('carbon', '<f8'),
+        ('is_deleted', 'u1'), ('is_listed', 'u1'),
+    ]),
+    'pending_food': np.dtype([('x', '<f8')]),
+    'bubble_flow': np.dtype([('time', '<i8')]),
+    'bubble': np.dtype([('x', '<f8'), ('y', '<f8'), ('vy', '<f8')]),
+    # 第 0 行是向外扩散的震荡波，第 1 行是向内的
+    'sand_wave_flow': np.dtype([('time', '<i8'), ('period', '<f8')]),
+    'sand_wave': np.dtype([('flow', 'u1'), ('birth_tick', '<i8')]),
+    'rng': np.dtype([('name', 'S16'), ('state', '<u4', (_RANDOM_STATE_SIZE,))]),
+}
+# 只能有一行的表，sand_wave_flow 固定两行
+_SINGLE_ROW_SECTIONS = ('gas', 'tank', 'plant', 'bubble_flow')
+# 可以不是有限值的浮点数字段：没有目标位置时是 NaN，磁盘没有读写时震荡波的周期是 inf，在 _check_tables 中单独检查
+_NON_FINITE_FIELDS = {('fish', 'x_goal'), ('fish', 'y_goal'), ('sand_wave_flow', 'period')}
+
+
+class SnapshotError(Exception):
+    """
+    快照文件不完整或者格式不对
+    """
+
+
+class TankSnapshot(metaclass=SingletonMeta):
+    """
+    保存、恢复整个小鱼缸
+    GUI 中由 MainWindow 定时保存、关闭时保存，启动时恢复
+    """
+
+    def __init__(self):
+        # 最近一次保存、恢复的耗时，秒
+        self.last_save_seconds = 0.0
+        self.last_restore_seconds = 0.0
+        # 最近一次保存的文件大小，字节
+        self.last_size = 0
+
+    def save(self, life_manager, file_path: str):
+        """
+        保存快照，在 tick 之间调用
+        """
+
+        start = time.perf_counter()
+        from cyber_life.life.tank import LIFE_TANK
+
+        tables = self._collect(life_manager)
+        header = _HEADER.pack(MAGIC, VERSION, len(tables), LIFE_TANK.width, LIFE_TANK.height)
+        offset = _align(_HEADER.size + _TABLE_ENTRY.size * len(tables))
+        entries = []
+        for name, table in tables.items():
+            entries.append(_TABLE_ENTRY.pack(name.encode(), table.dtype.itemsize, len(table), offset))
+            offset = _align(offset + table.nbytes)
+
+        temp_path = f'{file_path}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(header)
+            for entry in entries:
+                file.write(entry)
+            for table in tables.values():
+                file.write(b'\0' * (_align(file.tell()) - file.tell()))
+                file.write(table.tobytes())
+            self.last_size = file.tell()
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+
+        self.last_save_seconds = time.perf_counter() - start
+        lg.debug(f'保存快照 {self.last_size} 字节，耗时 {self.last_save_seconds * 1000:.2f} ms')
+
+    def restore(self, life_manager, file_path: str) -> bool:
+        """
+        从快照恢复，需要在第一次 tick 之前调用
+
+        :return: 是否恢复成功，文件不存在、版本不一致、已损坏时返回 False，鱼缸保持原样
+                 版本不一致、已损坏的文件改名为 *.broken
+        """
+
+        if not os.path.isfile(file_path):
+            return False
+
+        start = time.perf_counter()
+        try:
+            if os.path.getsize(file_path) < _HEADER.size:
+                raise SnapshotError('文件头不完整')
+            with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                # 表是映射内存上的视图，关闭映射之前要全部释放
+                tables = {}
+                try:
+                    size, tables = self._map_tables(buffer)
+                    # 全部检查完再修改鱼缸，_apply 不会因为快照里的值出错，不会只恢复了一半
+                    self._check_tables(tables)
+                    self._apply(life_manager, tables, size)
+                finally:
+                    tables.clear()
+        except SnapshotError as e:
+            lg.warning(f'快照无法恢复，鱼缸从头开始: {e}')
+            self._discard(file_path)
+            return False
+
+        self.last_restore_seconds = time.perf_counter() - start
+        lg.info(f'从快照恢复鱼缸，耗时 {self.last_restore_seconds * 1000:.2f} ms')
+        return True
+
+    @staticmethod
+    def _collect(life_manager) -> dict[str, np.ndarray]:
+        """
+        把鱼缸的状态整理成一张张表
+        """
+
+        from cyber_life.life.gas_manager import GAS_MANAGER
+        from cyber_life.life.tank import LIFE_TANK
+
+        def table(name: str, rows: list[tuple]) -> np.ndarray:
+            return np.array(rows, dtype=SECTIONS[name])
+
+        balls = life_manager.balls
+        ball_table = np.empty(balls.count, dtype=SECTIONS['ball'])
+        ball_table['x'], ball_table['y'] = balls.location[:, 0], balls.location[:, 1]
+        ball_table['vx'], ball_table['vy'] = balls.velocity[:, 0], balls.velocity[:, 1]
+        ball_table['carbon'] = balls.carbon
+        ball_table['energy'] = balls.energy.current_values
+
+        # 食物列表中的食物在前，之后是已经清理出列表、还是某条鱼目标的食物
+        food_list = list(life_manager.food_list)
+        food_index = {id(food): i for i, food in enumerate(food_list)}
+        for fish in life_manager.fish_list:
+            if fish.target_food is not None and id(fish.target_food) not in food_index:
+                food_index[id(fish.target_food)] = len(food_index)
+                food_list.append(fish.target_food)
+        food_rows = [
+            (food.location.x, food.location.y, food.float_remaining, food.carbon, food.is_deleted,
+             i < len(life_manager.food_list))
+            for i, food in enumerate(food_list)
+        ]
+
+        fish_rows = []
+        for fish in life_manager.fish_list:
+            goal = fish.location_goal
+            fish_rows.append((
+                fish.location.x, fish.location.y, fish.velocity.x, fish.velocity.y,
+                goal.x if goal is not None else np.nan, goal.y if goal is not None else np.nan,
+                fish.energy.current_value, fish.carbon, fish.oxygen.current_value,
+                fish.o2_pre_request, fish.energy_pre_cost,
+                fish.time, -1 if fish.target_food is None else food_index[id(fish.target_food)],
+                fish.state.value, fish.img_index_swim,
+                fish.animation_interval,
+            ))
+
+        sand_wave_flows = (LIFE_TANK.sand_wave_outer, LIFE_TANK.sand_wave_inner)
+
+        plant = life_manager.plant
+        bubble_flow = life_manager.bubble_flow
+        bubble_pool = bubble_flow.bubbles.pool
+        bubble_slots = bubble_pool.slots()
+        return {
+            'gas': table('gas', [(GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide)]),
+            'tank': table('tank', [(*LIFE_TANK.division, LIFE_TANK.light_brightness_current, LIFE_TANK.time)]),
+            'ball': ball_table,
+            'plant': table('plant', [(plant.x,)]),
+            'plant_node': table('plant_node', [
+                (node.location.x, node.location.y, node.velocity.x, node.velocity.y,
+                 node.acceleration.x, node.acceleration.y, node.carbon, node.energy.current_value, node.can_move)
+                for node in plant.nodes
+            ]),
+            'fish': table('fish', fish_rows),
+            'food': table('food', food_rows),
+            'pending_food': table('pending_food', [(x,) for x in list(life_manager._pending_food)]),
+            'bubble_flow': table('bubble_flow', [(bubble_flow.time,)]),
+            'bubble': table('bubble', list(zip(
+                *(bubble_pool[field][bubble_slots].tolist() for field in ('x', 'y', 'vy'))
+            ))),
+            'sand_wave_flow': table('sand_wave_flow', [(flow.time, flow.period) for flow in sand_wave_flows]),
+            'sand_wave': table('sand_wave', [
+                (i, birth_tick)
+                for i, flow in enumerate(sand_wave_flows) for birth_tick in flow.sand_waves.birth_ticks
+            ]),
+            'rng': table('rng', [(name.encode(), state[1]) for name, state in RNG.get_states().items()]),
+        }
+
+    @staticmethod
+    def _map_tables(buffer: mmap.mmap) -> tuple[tuple[int, int], dict[str, np.ndarray]]:
+        """
+        检查文件头和目录，把每张表解释为映射内存上的结构化数组
+
+        :return: 保存时小鱼缸的 (宽, 高)，{表名: 表}
+        """
+
+        magic, version, count, width, height = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise SnapshotError('不是小鱼缸的快照文件')
+        if version != VERSION:
+            raise SnapshotError(f'快照版本 {version} 和当前版本 {VERSION} 不一致')
+        if len(buffer) < _HEADER.size + _TABLE_ENTRY.size * count:
+            raise SnapshotError('目录不完整')
+        if width == 0 or height == 0:
+            raise SnapshotError('保存时小鱼缸的大小为 0')
+
+        # 先检查完全部目录再创建视图，出错时不会留下映射内存的引用
+        entries = {}
+        for i in range(count):
+            name, itemsize, rows, offset = _TABLE_ENTRY.unpack_from(buffer, _HEADER.size + _TABLE_ENTRY.size * i)
+            name = name.rstrip(b'\0').decode()
+            dtype = SECTIONS.get(name)
+            if dtype is None or dtype.itemsize != itemsize:
+                raise SnapshotError(f'表 {name} 的格式不对')
+            if offset + itemsize * rows > len(buffer):
+                raise SnapshotError(f'表 {name} 不完整')
+            entries[name] = (dtype, rows, offset)
+        if entries.keys() != SECTIONS.keys():
+            raise SnapshotError(f'缺少表 {set(SECTIONS) - set(entries)}')
+
+        tables = {
+            name: np.frombuffer(buffer, dtype=dtype, count=rows, offset=offset)
+            for name, (dtype, rows, offset) in entries.items()
+        }
+        return (width, height), tables
+
+    @staticmethod
+    def _check_tables(tables: dict[str, np.ndarray]):
+        """
+        检查表里的值能不能恢复，不能时抛出 SnapshotError
+        和 _apply 一样，表的视图不要赋值给局部变量
+        """
+
+        from cyber_life.life.fish.state_enum import State
+
+        for name in _SINGLE_ROW_SECTIONS:
+            if len(tables[name]) != 1:
+                raise SnapshotError(f'表 {name} 应该只有一行，实际有 {len(tables[name])} 行')
+        if len(tables['sand_wave_flow']) != 2:
+            raise SnapshotError('表 sand_wave_flow 应该有两行')
+
+        for name in SECTIONS:
+            for field, (dtype, *_) in tables[name].dtype.fields.items():
+                if dtype.kind != 'f':
+                    continue
+                if (name, field) not in _NON_FINITE_FIELDS and not np.all(np.isfinite(tables[name][field])):
+                    raise SnapshotError(f'表 {name} 的 {field} 有 NaN 或者无穷大')
+        if np.any(np.isinf(tables['fish']['x_goal'])) or np.any(np.isinf(tables['fish']['y_goal'])):
+            raise SnapshotError('鱼的目标位置是无穷大')
+        # 大于 0 也就排除了 NaN
+        if not np.all(tables['sand_wave_flow']['period'] > 0):
+            raise SnapshotError('震荡波的周期必须大于 0')
+
+        if not np.all(np.isin(tables['fish']['state'], [state.value for state in State])):
+            raise SnapshotError('鱼的状态不存在')
+        if not np.all((-1 <= tables['fish']['target_food']) & (tables['fish']['target_food'] < len(tables['food']))):
+            raise SnapshotError('鱼的目标食物不在食物表中')
+        if not np.all(tables['fish']['animation_interval'] > 0):
+            raise SnapshotError('鱼的动画间隔必须大于 0')
+        if not np.all(tables['fish']['img_index_swim'] < 10):
+            raise SnapshotError('鱼的动画帧不存在')
+        if not np.all(tables['food']['is_deleted'] | tables['food']['is_listed']):
+            raise SnapshotError('不在食物列表中的食物只能是已经被吃掉的')
+        if not np.all(tables['sand_wave']['flow'] < 2):
+            raise SnapshotError('震荡波所属的震荡波流不存在')
+
+        # random.Random.setstate 要求当前位置不超过 624
+        if not np.all(tables['rng']['state'][:, -1] < _RANDOM_STATE_SIZE):
+            raise SnapshotError('随机数流的状态无效')
+        try:
+            for name in tables['rng']['name'].tolist():
+                name.decode()
+        except UnicodeDecodeError:
+            raise SnapshotError('随机数流的名称无效') from None
+
+    @staticmethod
+    def _discard(file_path: str):
+        """
+        恢复失败的快照改名留着排查，之后保存的快照写到原来的文件名
+        """
+
+        try:
+            os.replace(file_path, file_path + BROKEN_SUFFIX)
+        except OSError as e:
+            lg.warning(f'无法移走恢复失败的快照: {e}')
+        else:
+            lg.warning(f'恢复失败的快照已改名为 {file_path + BROKEN_SUFFIX}')
+
+    @staticmethod
+    def _apply(life_manager, tables: dict[str, np.ndarray], size: tuple[int, int]):
+        """
+        用快照中的表替换鱼缸的状态
+        小鱼缸大小变了（换了屏幕比例）时，所有坐标按比例缩放
+        表是映射内存上的视图，不要赋值给局部变量，否则出错时异常引用着这一帧，映射无法关闭
+        """
+
+        from cyber_life.life.fish.guppy_fish import GuppyFish
+        from cyber_life.life.fish.state_enum import State
+        from cyber_life.life.food import Food
+        from cyber_life.life.gas_manager import GAS_MANAGER
+        from cyber_life.life.plant_node import LifePlantNode
+        from cyber_life.life.tank import LIFE_TANK
+
+        kx = LIFE_TANK.width / size[0]
+        ky = LIFE_TANK.height / size[1]
+
+        (gas,) = tables['gas'].tolist()
+        GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide = gas
+
+        (tank,) = tables['tank'].tolist()
+        LIFE_TANK.division = [y * ky for y in tank[:3]]
+        LIFE_TANK.light_brightness_current, LIFE_TANK.time = tank[3:]
+
+        # 换了 CPU 核数不同的机器时，多出来的球保持刚创建时的样子
+        balls = life_manager.balls
+        n = min(balls.count, len(tables['ball']))
+        balls.location[:n, 0] = tables['ball']['x'][:n] * kx
+        balls.location[:n, 1] = tables['ball']['y'][:n] * ky
+        balls.velocity[:n, 0] = tables['ball']['vx'][:n]
+        balls.velocity[:n, 1] = tables['ball']['vy'][:n]
+        balls.carbon[:n] = tables['ball']['carbon'][:n]
+        balls.energy.current_values[:n] = tables['ball']['energy'][:n]
+
+        plant = life_manager.plant
+        (plant.x,) = tables['plant'].tolist()[0]
+        plant.x *= kx
+        nodes = []
+        for x, y, vx, vy, ax, ay, carbon, energy, can_move in tables['plant_node'].tolist():
+            node = LifePlantNode(x * kx, y * ky, bool(can_move))
+            node.velocity = Vector(vx, vy)
+            node.acceleration = Vector(ax, ay)
+            node.carbon = carbon
+            node.energy = ProgressFloat(energy, node.energy.max_value)
+            if nodes:
+                nodes[-1].add_child(node)
+            nodes.append(node)
+        if nodes:
+            plant.nodes = nodes
+
+        for food in life_manager.food_list:
+            life_manager.food_grid.remove(food)
+        life_manager.food_list = []
+        # 按行号排列，包括不在食物列表中、只是鱼的目标的食物
+        foods = []
+        for x, y, float_remaining, carbon, is_deleted, is_listed in tables['food'].tolist():
+            food = Food(x * kx)
+            food.location.y = y * ky
+            food.float_remaining = float_remaining
+            food.carbon = carbon
+            food.is_deleted = bool(is_deleted)
+            foods.append(food)
+            # 被吃掉、还没清理的食物也在网格里，下一帧和一直运行时一样清理
+            if is_listed:
+                life_manager.food_list.append(food)
+                life_manager.food_grid.insert(food, food.location.x, food.location.y)
+
+        life_manager.fish_list = []
+        for (x, y, vx, vy, x_goal, y_goal, energy, carbon, oxygen, o2_pre_request, energy_pre_cost,
+             fish_time, target_food, state, img_index_swim, animation_interval) in tables['fish'].tolist():
+            fish = GuppyFish()
+            fish.location = Vector(x * kx, y * ky)
+            fish.velocity = Vector(vx, vy)
+            fish.energy = ProgressFloat(energy, fish.energy.max_value)
+            fish.carbon = carbon
+            fish.oxygen = ProgressFloat(oxygen, fish.oxygen.max_value)
+            # 这几个值由上一帧的状态决定，这一帧呼吸、动画时就要用
+            fish.o2_pre_request = o2_pre_request
+            fish.energy_pre_cost = energy_pre_cost
+            fish.animation_interval = animation_interval
+            fish.time = fish_time
+            fish.state = State(state)
+            fish.img_index_swim = img_index_swim
+            # 追食物时目标位置就是食物的位置，两者是同一个对象
+            if target_food >= 0:
+                fish.target_food = foods[target_food]
+                fish.location_goal = fish.target_food.location
+            else:
+                fish.location_goal = None if np.isnan(x_goal) else Vector(x_goal * kx, y_goal * ky)
+            life_manager.fish_list.append(fish)
+
+        for (x,) in tables['pending_food'].tolist():
+            life_manager.add_food(x * kx)
+
+        bubble_flow = life_manager.bubble_flow
+        (bubble_flow.time,) = tables['bubble_flow'].tolist()[0]
+        bubble_flow.bubbles.clear()
+        for x, y, vy in tables['bubble'].tolist():
+            bubble_flow.bubbles.spawn(x * kx, y * ky, vy)
+
+        sand_wave_flows = (LIFE_TANK.sand_wave_outer, LIFE_TANK.sand_wave_inner)
+        for flow, (flow_time, period) in zip(sand_wave_flows, tables['sand_wave_flow'].tolist()):
+            flow.time, flow.period = flow_time, period
+            flow.sand_waves.clear()
+        for i, birth_tick in tables['sand_wave'].tolist():
+            sand_wave_flows[i].sand_waves.spawn(birth_tick)
+
+        # 恢复的状态没有上一帧，插值绘制时直接画恢复的样子
+        life_manager.save_previous_state()
+
+        # 上面创建生物时也用了随机数，所以最后恢复
+        RNG.set_states({
+            name.decode(): (Random.VERSION, tuple(state), None)
+            for name, state in zip(tables['rng']['name'].tolist(), tables['rng']['state'].tolist())
+        })
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+TANK_SNAPSHOT = TankSnapshot()
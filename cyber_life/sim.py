@@ -0,0 +1,177 @@
+"""
+无界面运行小鱼缸的模拟
+
+不创建 QApplication，不绘制，不截屏，只是在循环里不停地调用 LifeManager.tick()，并统计每秒能跑多少帧。
+可以在没有显示器的机器上做性能测试、长时间运行测试，也可以让小鱼缸以远高于界面的速度（SIM_TICK_RATE 帧/秒）快进。
+
+指定 --seed 之后每次运行的结果逐位相同；--record 记录每一帧的外部输入，--replay 按记录回放，
+可以用同一份输入反复比较不同版本的代码的速度和结果。结束时输出整个鱼缸状态的摘要，摘要相同说明结果相同。
+
+用法：
+python -m cyber_life.sim --ticks 1000000
+python -m cyber_life.sim --ticks 10000 --seed 1 --live --record run.rec
+python -m cyber_life.sim --ticks 10000 --replay run.rec
+python -m cyber_life.sim --ticks 100000 --snapshot tank.snapshot
+python -m cyber_life.sim --ticks 10000 --seed 7 --feed-every 37 --snapshot tank.snapshot
+python -m cyber_life.sim --ticks 100000 --restore tank.snapshot
+python -m cyber_life.sim --ticks 1000 --fast-forward 2880000
+"""
+import argparse
+import hashlib
+import logging
+import pickle
+import time
+
+from cyber_life import static
+from cyber_life.static import LOG_FORMAT
+
+lg = logging.getLogger(__name__)
+
+
+def run(ticks: int, report_every: int = 0, input_hook=None, restore_file: str | None = None,
+        feed_every: int = 0) -> float:
+    """
+    在当前线程中连续模拟若干帧
+
+    :param ticks: 模拟的帧数
+    :param report_every: 每隔多少帧输出一次速度，0 表示不输出
+    :param input_hook: 记录或回放外部输入，见 cyber_life.service.replay
+    :param restore_file: 模拟之前先从这个快照恢复鱼缸
+    :param feed_every: 每隔多少帧在随机的位置投喂一次食物，0 表示不投喂
+    :return: 平均每秒模拟的帧数
+    """
+
+    # 延迟导入，保证调用者已经设置好了小鱼缸的大小
+    from cyber_life.life.life_manager import LifeManager
+    from cyber_life.life.tank import LIFE_TANK
+    from cyber_life.service.rng import RNG
+
+    life_manager = LifeManager()
+    life_manager.input_hook = input_hook
+    if restore_file is not None:
+        from cyber_life.service.snapshot import TANK_SNAPSHOT
+
+        if not TANK_SNAPSHOT.restore(life_manager, restore_file):
+            lg.warning(f'没有从 {restore_file} 恢复，鱼缸从头开始')
+
+    # 投喂按小鱼缸的时间而不是这次运行的帧数，从快照恢复后接着按原来的节奏投喂
+    feed_random = RNG.stream('sim_feed') if feed_every else None
+    start = time.perf_counter()
+    last_report = start
+    for i in range(1, ticks + 1):
+        if feed_every and LIFE_TANK.time % feed_every == 0:
+            life_manager.add_food(feed_random.uniform(0, LIFE_TANK.width))
+        life_manager.tick()
+
+        if report_every and i % report_every == 0:
+            now = time.perf_counter()
+            lg.info(f'第 {i} 帧，{report_every / (now - last_report):.0f} 帧/秒')
+            last_report = now
+    elapsed = time.perf_counter() - start
+
+    return ticks / elapsed if elapsed > 0 else float('inf')
+
+
+def state_digest() -> str:
+    """
+    整个鱼缸状态的摘要，两次运行的摘要相同说明模拟结果逐位相同
+    """
+
+    from cyber_life.life.gas_manager import GAS_MANAGER
+    from cyber_life.life.life_manager import LifeManager
+    from cyber_life.life.tank import LIFE_TANK
+
+    life_manager = LifeManager()
+    balls = life_manager.balls
+    # 只比较数值，不比较类型：比如水草根节点的 x 是 randint 得到的整数，从快照恢复后是浮点数
+    state = (
+        GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide,
+        tuple(LIFE_TANK.division), LIFE_TANK.light_brightness_current,
+        balls.location.tobytes(), balls.velocity.tobytes(), balls.carbon.tobytes(),
+        balls.energy.current_values.tobytes(),
+        [(node.location.x, node.location.y, node.carbon) for node in life_manager.plant.nodes],
+        list(zip(*(column.tolist() for column in life_manager.bubble_flow.bubbles.locations()))),
+        [(food.location.x, food.location.y, food.carbon) for food in life_manager.food_list],
+        [(fish.location.x, fish.location.y, fish.carbon, fish.energy.current_value, fish.oxygen.current_value,
+          fish.state.name) for fish in life_manager.fish_list],
+    )
+    return hashlib.sha256(pickle.dumps(_as_float(state))).hexdigest()[:16]
+
+
+def _as_float(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_as_float(item) for item in value)
+    if isinstance(value, int):
+        return float(value)
+    return value
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='python -m cyber_life.sim', description='无界面运行小鱼缸的模拟')
+    parser.add_argument('--ticks', type=int, default=10_0000, help='模拟的帧数')
+    parser.add_argument('--width', type=int, default=static.TANK_SCREEN_WIDTH, help='小鱼缸宽度，px')
+    parser.add_argument('--height', type=int, default=None, help='小鱼缸高度，px，默认按 16:9 计算')
+    parser.add_argument('--report-every', type=int, default=0, help='每隔多少帧输出一次速度，默认不输出')
+    parser.add_argument('--seed', type=int, default=None, help='随机数总种子，默认随机')
+    parser.add_argument('--live', action='store_true', help='启动监测者，使用真实的系统信息，默认不检测')
+    parser.add_argument('--record', metavar='FILE', help='把每一帧的外部输入记录到文件')
+    parser.add_argument('--replay', metavar='FILE', help='回放记录的外部输入，种子和小鱼缸大小也使用记录中的')
+    parser.add_argument('--fast-forward', type=int, default=0, metavar='TICKS',
+                        help='模拟结束后再快进若干帧，相当于电脑睡眠了这么久')
+    parser.add_argument('--feed-every', type=int, default=0, metavar='TICKS',
+                        help='每隔多少帧投喂一次食物，默认不投喂')
+    parser.add_argument('--restore', metavar='FILE', help='模拟之前先从快照恢复鱼缸')
+    parser.add_argument('--snapshot', metavar='FILE', help='模拟结束后把鱼缸保存为快照')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+    from cyber_life.service.replay import InputRecorder, InputReplayer
+    from cyber_life.service.rng import RNG
+
+    input_hook = None
+    if args.replay:
+        input_hook = InputReplayer(args.replay)
+        args.seed, args.width, args.height = input_hook.seed, input_hook.width, input_hook.height
+
+    # 必须在导入 life 模块之前指定小鱼缸的大小，LIFE_TANK 就不会通过截屏来获取屏幕比例了
+    static.TANK_SCREEN_WIDTH = args.width
+    static.TANK_SCREEN_HEIGHT = args.height if args.height is not None else round(args.width * 9 / 16)
+    # 必须在创建生物之前指定种子
+    if args.seed is not None:
+        RNG.seed(args.seed)
+
+    if args.record:
+        input_hook = InputRecorder(args.record, RNG.master_seed, static.TANK_SCREEN_WIDTH, static.TANK_SCREEN_HEIGHT)
+
+    from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+    if args.live:
+        SYSTEM_INFO_MANAGER.start()
+
+    lg.info(f'开始模拟 {args.ticks} 帧，小鱼缸大小 {static.TANK_SCREEN_WIDTH}x{static.TANK_SCREEN_HEIGHT}，'
+            f'随机数种子 {RNG.master_seed}')
+    try:
+        ticks_per_second = run(args.ticks, args.report_every, input_hook, args.restore, args.feed_every)
+    finally:
+        if args.live:
+            SYSTEM_INFO_MANAGER.stop()
+        if input_hook is not None:
+            input_hook.close()
+    lg.info(f'模拟结束，平均 {ticks_per_second:.0f} 帧/秒，'
+            f'相当于 {ticks_per_second / static.SIM_TICK_RATE:.1f} 倍速（界面每秒 {static.SIM_TICK_RATE} 帧）')
+    if args.fast_forward:
+        from cyber_life.life.fast_forward import FAST_FORWARD
+        from cyber_life.life.life_manager import LifeManager
+
+        FAST_FORWARD.advance(LifeManager(), args.fast_forward)
+    if args.snapshot:
+        from cyber_life.life.life_manager import LifeManager
+        from cyber_life.service.snapshot import TANK_SNAPSHOT
+
+        TANK_SNAPSHOT.save(LifeManager(), args.snapshot)
+        lg.info(f'保存快照 {TANK_SNAPSHOT.last_size} 字节，耗时 {TANK_SNAPSHOT.last_save_seconds * 1000:.2f} ms')
+    lg.info(f'鱼缸状态摘要 {state_digest()}')
+
+
+if __name__ == '__main__':
+    main()
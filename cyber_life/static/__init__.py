@@ -5,6 +5,36 @@ from os import path
 
 PROJECT_DIR = path.abspath(path.dirname(sys.argv[0]))
 TANK_SCREEN_WIDTH = 300
+# 小鱼缸高度，为 None 时按主屏幕宽高比计算（创建 QApplication 之后从 QScreen 获取）
+# 无界面运行（cyber_life.sim）时会在导入 life 模块之前指定
+TANK_SCREEN_HEIGHT = None
+
+# 变换好的鱼动画帧缓存文件，下次启动时直接读取，None 表示不缓存
+# 目前贴图很小，读取缓存（解码 42 张图）反而比重新变换（解码 11 张图）慢，所以默认不缓存
+# 以后贴图变大、变多时可以设为 path.join(PROJECT_DIR, 'fish_atlas.cache')
+FISH_ATLAS_CACHE_FILE = None
+
+# 随机数总种子，None 表示每次随机，启动时会输出到日志，需要复现某一次运行时填上
+RANDOM_SEED = None
+# 把每一帧的外部输入（检测结果、投喂的食物）记录到这个文件，None 表示不记录
+# 记录的文件可以用 python -m cyber_life.sim --replay 文件 --ticks 帧数 回放
+INPUT_RECORD_FILE = None
+
+# 小鱼缸快照文件，启动时从这里恢复鱼缸，运行时定时保存、关闭时保存，None 表示不保存
+TANK_SNAPSHOT_FILE = path.join(PROJECT_DIR, 'tank.snapshot')
+# 定时保存快照的间隔，毫秒
+TANK_SNAPSHOT_INTERVAL = 5 * 60 * 1000
+
+# 每秒模拟多少帧，鱼、生物球、气泡的速度都是按帧算的，改了之后一切都会变快或变慢
+SIM_TICK_RATE = 100
+# 每秒绘制多少次，None 表示跟随显示器的刷新率（创建 QApplication 之后从 QScreen 获取）
+# 和模拟的帧率互不影响，绘制时画的是最近两帧之间插值的样子，见 cyber_life.service.game_loop
+RENDER_RATE = None
+
+# 气泡、每个震荡波流最多同时存在多少个，满了之后挤掉最老的
+# 上传网速很大时每帧生成一个气泡，鱼缸越高气泡存活越久，一般一两百个；震荡波最多七十多个
+MAX_BUBBLES = 1024
+MAX_SAND_WAVES = 256
 
 # 调试效果：
 # 1. 水体颜色迅速变化
@@ -0,0 +1,93 @@
+"""
+整个窗口重绘和只重绘脏区域的耗时对比
+用一个和主窗口一样透明背景的窗口，每帧 repaint，耗时包括报告脏区域、绘制、写入后备存储
+两种情况：空闲（没有网速、磁盘读写）和繁忙（网速打满、磁盘读写很快，64 个生物球都很活跃）
+
+无界面的 offscreen 平台没有窗口管理器，测不到系统合成透明置顶窗口的开销，
+这部分开销和每帧提交给系统的面积成正比，所以同时输出平均重绘面积
+"""
+import os
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QWidget
+from PyQt5.QtGui import QPainter
+
+from cyber_life.computer_info.inspector_disk_io import DiskIoResult
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+from cyber_life.life.ball import LifeBallGroup
+from cyber_life.life.life_manager import LifeManager
+from cyber_life.life.tank import LIFE_TANK
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_cache import PAINT_CACHE
+
+
+class _Window(QWidget):
+    """
+    和 MainWindow 一样的透明背景窗口，paintEvent 也一样
+    """
+
+    def __init__(self, life_manager: LifeManager):
+        super().__init__()
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        self.resize(LIFE_TANK.width, LIFE_TANK.height + 1)
+        self.life_manager = life_manager
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), PAINT_CACHE.color(20, 20, 20, 255))
+        self.life_manager.paint(painter)
+
+
+def _run(window: _Window, life_manager: LifeManager, is_dirty: bool, frames: int) -> tuple[float, float]:
+    """
+    :return: 每帧耗时 ms，平均重绘面积比例
+    """
+
+    dirty = DirtyRegion(window.width(), window.height())
+    elapsed = 0.0
+    for _ in range(frames):
+        life_manager.tick()
+        start = time.perf_counter()
+        if is_dirty:
+            life_manager.report_bounds(dirty)
+            region = dirty.take()
+            if region is None:
+                window.repaint()
+            else:
+                window.repaint(region)
+        else:
+            window.repaint()
+        elapsed += time.perf_counter() - start
+    area_rate = dirty.area_rate_total / dirty.frame_count if is_dirty else 1.0
+    return elapsed / frames * 1000, area_rate
+
+
+def main(frames: int = 500):
+    app = QApplication([])
+    life_manager = LifeManager()
+    window = _Window(life_manager)
+    window.show()
+    app.processEvents()
+
+    for name, busy in (('空闲', False), ('繁忙', True)):
+        if busy:
+            life_manager.balls = LifeBallGroup(64)
+            life_manager.balls.set_activity(np.full(64, 0.5))
+            SYSTEM_INFO_MANAGER.INSPECTOR_DISK_IO.current_result = DiskIoResult(1 << 20, 1 << 20)
+            network = SYSTEM_INFO_MANAGER.INSPECTOR_NETWORK.get_current_result()
+            network.recv_speed = network.sent_speed = 1_000_000
+        # 先让分界线、灯光、震荡波稳定下来
+        for _ in range(600):
+            life_manager.tick()
+        for mode, is_dirty in (('整个窗口', False), ('脏区域  ', True)):
+            ms, area_rate = _run(window, life_manager, is_dirty, frames)
+            print(f'{name} {mode} {ms:6.3f} ms/帧  平均重绘面积 {area_rate:6.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+鱼查找食物的性能对比，1000 个食物，100 条鱼
+原来的做法：每条鱼都把水中的食物按距离排序，取第一个
+现在的做法：均匀网格空间索引，从鱼所在格子一圈圈向外找
+"""
+import timeit
+from random import Random
+
+from cyber_life.tools.spatial_grid import SpatialGrid
+from cyber_life.tools.vector import Vector
+
+
+class _Food:
+    __slots__ = ('location', 'is_deleted')
+
+    def __init__(self, x: float, y: float):
+        self.location = Vector(x, y)
+        self.is_deleted = False
+
+
+def main(food_count: int = 1000, fish_count: int = 100, width: int = 300, height: int = 169, number: int = 20):
+    rng = Random(0)
+    water_top = height * 0.3
+    foods = [_Food(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(food_count)]
+    fishes = [Vector(rng.uniform(0, width), rng.uniform(water_top, height)) for _ in range(fish_count)]
+
+    grid = SpatialGrid(20)
+    for food in foods:
+        grid.insert(food, food.location.x, food.location.y)
+
+    def old_one_tick():
+        for fish in fishes:
+            any(food.location.y >= water_top for food in foods)
+            sorted((food for food in foods if food.location.y >= water_top),
+                   key=lambda fd: fd.location.distance(fish))[0]
+
+    def new_one_tick():
+        for fish in fishes:
+            grid.exists(water_top)
+            grid.nearest(fish.x, fish.y, water_top)
+
+    def update_grid():
+        for food in foods:
+            grid.move(food, food.location.x, food.location.y)
+
+    # 两种做法的结果应当一致
+    for fish in fishes:
+        expected = sorted((food for food in foods if food.location.y >= water_top),
+                          key=lambda fd: fd.location.distance(fish))[0]
+        assert grid.nearest(fish.x, fish.y, water_top) is expected
+
+    print(f'{food_count} 个食物，{fish_count} 条鱼，每种做法运行 {number} 帧')
+    old = timeit.timeit(old_one_tick, number=number) / number
+    new = timeit.timeit(new_one_tick, number=number) / number
+    update = timeit.timeit(update_grid, number=number) / number
+    print(f'排序          {old * 1000:8.2f} ms/帧')
+    print(f'空间索引查找  {new * 1000:8.2f} ms/帧')
+    print(f'空间索引更新  {update * 1000:8.2f} ms/帧（每帧所有食物移动一次）')
+    print(f'加速 {old / (new + update):.1f} 倍')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+模拟速度和绘制耗时的关系
+原来：定时器每 10ms 触发一次，每次模拟一帧、绘制一次，绘制慢了定时器就被耽误，错过的触发直接丢掉
+现在：定时器按显示器刷新率（这里按 60 次/秒）触发，每次按固定步长补上经过的时间，再插值绘制
+
+绘制用 sleep 代替，耗时从很快到比一帧还慢，最后一种是每秒一次 0.2 秒的卡顿（比如垃圾回收）
+输出每秒模拟的帧数相当于几倍速，1.00 表示和真实时间一样快
+"""
+import time
+
+from cyber_life.life.life_manager import LifeManager
+from cyber_life.service.game_loop import GameLoop
+
+SIM_RATE = 100
+RENDER_RATE = 60
+
+
+def _paint_seconds(paint_ms: float | None, elapsed: float, stall_at: list[float]) -> float:
+    # paint_ms 为 None 时平时 2ms，每秒卡 0.2 秒
+    if paint_ms is not None:
+        return paint_ms / 1000
+    if elapsed >= stall_at[0]:
+        stall_at[0] += 1
+        return 0.2
+    return 0.002
+
+
+def _run_timer(life_manager: LifeManager, paint_ms: float | None, seconds: float) -> float:
+    """
+    原来的做法：每次触发模拟一帧，下一次触发最早在这一次开始之后 10ms
+    """
+
+    interval = 1 / SIM_RATE
+    start = time.perf_counter()
+    stall_at = [0.5]
+    ticks = 0
+    while (now := time.perf_counter()) - start < seconds:
+        life_manager.tick()
+        ticks += 1
+        time.sleep(_paint_seconds(paint_ms, now - start, stall_at))
+        remaining = now + interval - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+    return ticks / (time.perf_counter() - start) / SIM_RATE
+
+
+def _run_game_loop(life_manager: LifeManager, paint_ms: float | None, seconds: float) -> float:
+    """
+    现在的做法：按绘制频率触发，每次按经过的时间模拟若干帧
+    """
+
+    game_loop = object.__new__(GameLoop)
+    game_loop.__init__(SIM_RATE, RENDER_RATE)
+    interval = game_loop.render_interval / 1000
+    start = time.perf_counter()
+    stall_at = [0.5]
+    while (now := time.perf_counter()) - start < seconds:
+        for _ in range(game_loop.advance(now)):
+            life_manager.tick()
+        time.sleep(_paint_seconds(paint_ms, now - start, stall_at))
+        remaining = now + interval - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+    return game_loop.tick_count / (time.perf_counter() - start) / SIM_RATE
+
+
+def main(seconds: float = 2.0):
+    life_manager = LifeManager()
+    for name, paint_ms in (('绘制 2ms ', 2), ('绘制 8ms ', 8), ('绘制 15ms', 15), ('绘制 30ms', 30), ('偶尔卡顿 ', None)):
+        old = _run_timer(life_manager, paint_ms, seconds)
+        new = _run_game_loop(life_manager, paint_ms, seconds)
+        print(f'{name}  原来 {old:4.2f} 倍速  固定步长 {new:4.2f} 倍速')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+生物球的性能对比，模拟 256 核的机器
+原来的做法：每个核一个 LifeBall 对象，逐个旋转速度、移动、碰撞检测、光合和呼吸
+现在的做法：LifeBallGroup 把所有球存在 NumPy 数组里，一次算完
+"""
+import os
+import timeit
+from random import Random, random
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from cyber_life.life.ball import LifeBallGroup
+from cyber_life.life.gas_ledger import GAS_LEDGER
+from cyber_life.life.gas_manager import GAS_MANAGER
+from cyber_life.life.life_mixin.breathable_mixin import BreathableMixin
+from cyber_life.life.life_mixin.organism_mixin import OrganismMixin
+from cyber_life.life.tank import LIFE_TANK
+from cyber_life.tools.vector import Vector
+
+
+class _OldLifeBall(BreathableMixin, OrganismMixin):
+    """
+    原来的 LifeBall 的更新逻辑
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.location = Vector(random() * LIFE_TANK.width, LIFE_TANK.division[0] + 10)
+        self.radius = 4
+        self.velocity = Vector(random() * 2 - 1, random() * 2 - 1).normalize() * 0.1
+        self.acceleration = Vector(0, 0)
+        self.activity = 0.0
+        self.o2_pre_request = 0.01
+        self.co2_pre_request = 0.04
+
+    def set_activity(self, activity):
+        self.activity = activity
+        self.velocity = self.velocity.rotate(activity * 15)
+        self.o2_pre_request = 0.01 + self.activity
+
+    def tick(self):
+        self.velocity += self.acceleration
+        self.location += self.velocity * (1 + self.activity * 50)
+        if self.location.x - self.radius < 0:
+            self.velocity.x = abs(self.velocity.x)
+        elif self.location.x + self.radius > LIFE_TANK.width:
+            self.velocity.x = -abs(self.velocity.x)
+        if self.location.y < LIFE_TANK.division[0]:
+            self.velocity.y = abs(self.velocity.y)
+            self.location.y = LIFE_TANK.division[0]
+        if self.location.y > LIFE_TANK.division[1] - self.radius:
+            self.velocity.y = -abs(self.velocity.y)
+            self.location.y = LIFE_TANK.division[1] - self.radius
+        self.photosynthesis()
+        self.breath()
+
+
+def main(cores: int = 256, number: int = 200):
+    rng = Random(0)
+    activity = np.array([rng.random() * 0.3 for _ in range(cores)])
+    activity_list = activity.tolist()
+    old_balls = [_OldLifeBall() for _ in range(cores)]
+    group = LifeBallGroup(cores)
+
+    def old_one_tick():
+        for ball, a in zip(old_balls, activity_list):
+            ball.set_activity(a)
+            ball.tick()
+        GAS_LEDGER.commit()
+
+    def new_one_tick():
+        group.set_activity(activity)
+        group.tick()
+        GAS_LEDGER.commit()
+
+    gas = (GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide)
+    GAS_MANAGER.oxygen = GAS_MANAGER.carbon_dioxide = 1e9
+    print(f'{cores} 个生物球，每种做法运行 {number} 帧')
+    old = timeit.timeit(old_one_tick, number=number) / number
+    new = timeit.timeit(new_one_tick, number=number) / number
+    GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide = gas
+    print(f'逐个对象      {old * 1000:8.3f} ms/帧')
+    print(f'NumPy 数组    {new * 1000:8.3f} ms/帧')
+    print(f'加速 {old / new:.1f} 倍')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+水草、气泡、食物的绘制耗时对比，模拟长了几百个节点的水草、网速打满时的气泡和一把食物
+原来的做法：每个实体自己 setPen、setBrush，每个水草节点画 10 次叶子，每次都新建 QPen
+现在的做法：实体把图元按材质交给 PaintBatch，每种材质切换一次画笔，线段一次 drawLines
+同时比较两种做法画出来的图有多少像素不同（材质之间的遮挡顺序变了，重叠的地方会有一点不同）
+"""
+import os
+import timeit
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QGuiApplication, QImage, QPainter, QPen, QColor
+
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+from cyber_life.life.gas_ledger import GAS_LEDGER
+from cyber_life.life.life_manager import LifeManager
+from cyber_life.life.tank import LIFE_TANK
+from cyber_life.tools.paint_batch import PaintBatch
+
+
+def _old_paint_node(node, painter: QPainter):
+    """
+    原来的 LifePlantNode.paint，去掉了调试部分
+    """
+
+    painter.setBrush(QColor(69, 79, 56, 220))
+    painter.setPen(QColor(69, 79, 56, 220))
+    painter.drawEllipse(
+        round(node.location.x - node.RADIUS), round(node.location.y - node.RADIUS),
+        round(node.RADIUS * 2), round(node.RADIUS * 2)
+    )
+    line_pen = QPen(QColor(69, 79, 56, 220))
+    line_pen.setWidth(3)
+    painter.setPen(line_pen)
+    if node.next_node:
+        painter.drawLine(
+            round(node.location.x), round(node.location.y),
+            round(node.next_node.location.x), round(node.next_node.location.y)
+        )
+    if node.next_node:
+        line_pen = QPen(QColor(29, 156, 10, 200))
+        line_pen.setWidth(1)
+        painter.setPen(line_pen)
+        edge = 10 * abs(node.velocity) + 5
+        for i in range(-5, 5 + 1):
+            if i == 0:
+                continue
+            line_vector = (node.next_node.location - node.location).normalize().rotate(i * edge) * 20
+            painter.drawLine(
+                round(node.location.x), round(node.location.y),
+                round(node.location.x + line_vector.x), round(node.location.y + line_vector.y)
+            )
+
+
+def _old_paint(life_manager, painter: QPainter):
+    bubbles = life_manager.bubble_flow.bubbles
+    x, y = bubbles.locations()
+    for bx, by, radius in zip(x.tolist(), y.tolist(), bubbles.radius(y).tolist()):
+        painter.setPen(Qt.cyan)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawEllipse(round(bx - radius), round(by - radius), round(2 * radius), round(2 * radius))
+    for node in life_manager.plant.nodes:
+        _old_paint_node(node, painter)
+    for food in life_manager.food_list:
+        painter.setPen(Qt.darkYellow)
+        painter.setBrush(Qt.yellow)
+        painter.drawEllipse(
+            round(food.location.x - food.radius), round(food.location.y - food.radius),
+            round(2 * food.radius), round(2 * food.radius)
+        )
+
+
+def _new_paint(life_manager, painter: QPainter, batch: PaintBatch):
+    life_manager.bubble_flow.batch_paint(batch)
+    batch.flush(painter)
+    life_manager.plant.batch_paint(batch)
+    for food in life_manager.food_list:
+        food.batch_paint(batch)
+    batch.flush(painter)
+
+
+def main(nodes: int = 300, foods: int = 100, number: int = 200):
+    _app = QGuiApplication([])
+    SYSTEM_INFO_MANAGER.INSPECTOR_NETWORK.network_speeds.sent_speed = 1_000_000
+    life_manager = LifeManager()
+    for _ in range(nodes):
+        life_manager.plant.grow_node()
+    for i in range(foods):
+        life_manager.add_food(i * LIFE_TANK.width / foods)
+    for _ in range(500):
+        life_manager.tick()
+    GAS_LEDGER.commit()
+
+    batch = PaintBatch()
+    images = []
+    times = []
+    for paint in (lambda p: _old_paint(life_manager, p), lambda p: _new_paint(life_manager, p, batch)):
+        image = QImage(LIFE_TANK.width, LIFE_TANK.height, QImage.Format_ARGB32_Premultiplied)
+        image.fill(0)
+        painter = QPainter(image)
+        paint(painter)
+        painter.end()
+        images.append(image)
+
+        painter = QPainter(image)
+        times.append(min(timeit.repeat(lambda: paint(painter), number=number, repeat=3)) / number)
+        painter.end()
+
+    old, new = times
+    different = sum(
+        images[0].pixel(x, y) != images[1].pixel(x, y)
+        for x in range(LIFE_TANK.width) for y in range(LIFE_TANK.height)
+    )
+    print(f'{len(life_manager.plant.nodes)} 个水草节点，{len(life_manager.bubble_flow.bubbles)} 个气泡，'
+          f'{len(life_manager.food_list)} 个食物')
+    print(f'逐个实体    {old * 1000:7.3f} ms/帧')
+    print(f'批量绘制    {new * 1000:7.3f} ms/帧  切换材质 {batch.state_changes} 次，绘制调用 {batch.draw_calls} 次')
+    print(f'加速 {old / new:.1f} 倍，{different} / {LIFE_TANK.width * LIFE_TANK.height} 个像素不同')
+
+
+if __name__ == '__main__':
+    main()
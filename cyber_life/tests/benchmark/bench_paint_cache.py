@@ -0,0 +1,52 @@
+"""
+绘制资源缓存的效果，画完整的一帧（生物球、鱼和鱼的信息、震荡波、水面、边框）
+对照：把缓存上限设为 0，每次都新建对象，相当于原来每帧创建画笔、颜色、字体的做法
+"""
+import os
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+from cyber_life.computer_info.inspector_disk_io import DiskIoResult
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+from cyber_life.life.life_manager import LifeManager
+from cyber_life.life.tank import LIFE_TANK
+from cyber_life.service.settings import SETTINGS
+from cyber_life.tools.paint_cache import PAINT_CACHE
+
+
+def main(frames: int = 1000):
+    _app = QApplication([])
+    SETTINGS.is_fish_info_visible = True
+    life_manager = LifeManager()
+    life_manager.balls.set_activity(np.full(life_manager.balls.count, 0.3))
+    # 磁盘读写都很快，两个方向的震荡波都很密，每个波的透明度都不同
+    SYSTEM_INFO_MANAGER.INSPECTOR_DISK_IO.current_result = DiskIoResult(1 << 20, 1 << 20)
+    image = QImage(LIFE_TANK.width, LIFE_TANK.height, QImage.Format_ARGB32_Premultiplied)
+
+    # 先让震荡波铺满
+    for _ in range(300):
+        life_manager.tick()
+
+    for name, max_size in (('不缓存', 0), ('缓存  ', PAINT_CACHE.MAX_SIZE)):
+        PAINT_CACHE.MAX_SIZE = max_size
+        PAINT_CACHE.clear()
+        PAINT_CACHE.hit_count = PAINT_CACHE.miss_count = 0
+        elapsed = 0.0
+        for _ in range(frames):
+            life_manager.tick()
+            start = time.perf_counter()
+            painter = QPainter(image)
+            life_manager.paint(painter)
+            painter.end()
+            elapsed += time.perf_counter() - start
+        print(f'{name}  {elapsed / frames * 1000:6.3f} ms/帧  命中 {PAINT_CACHE.hit_count:6d}  '
+              f'新建 {PAINT_CACHE.miss_count:6d}  缓存了 {len(PAINT_CACHE)} 个对象')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+气泡、震荡波的性能和内存对比，模拟上传网速打满（每帧生成一个气泡）、磁盘读写很快（每 2 帧一个波）
+原来的做法：每个气泡、每个波一个对象，每帧用列表推导式重建列表
+现在的做法：气泡存在定长的粒子池里，死亡气泡的槽位留给之后的气泡；震荡波只存产生的帧数，半径画的时候再算
+内存用 tracemalloc 统计，稳定之后新做法的内存不再变化
+"""
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+from cyber_life.life.bubble_flow import LifeBubbleFlow
+from cyber_life.life.gas_ledger import GAS_LEDGER, OXYGEN, CARBON_DIOXIDE
+from cyber_life.life.sand_wave_flow import SandWaveFlow
+from cyber_life.life.tank import LIFE_TANK
+from cyber_life.service.rng import RNG
+from cyber_life.tools.vector import Vector
+
+_random = RNG.stream('bubble')
+
+
+class _OldBubble:
+    """
+    原来的 LifeBubble 的更新逻辑
+    """
+
+    def __init__(self, x):
+        self.location = Vector(x, LIFE_TANK.division[1])
+        self.velocity = Vector(0, 0)
+        self.acceleration = Vector(0, -0.01)
+        self.is_alive = True
+
+    def tick(self):
+        if self.location.y < LIFE_TANK.division[0]:
+            self.is_alive = False
+        self.velocity += self.acceleration
+        self.location += self.velocity
+        self.location.x += (_random.random() - 0.5) * 0.5
+        GAS_LEDGER.produce('LifeBubble', OXYGEN, 0.01)
+        GAS_LEDGER.produce('LifeBubble', CARBON_DIOXIDE, 0.01)
+
+
+class _OldSandWave:
+    def __init__(self, radius, radius_variation):
+        self.radius = radius
+        self.radius_variation = radius_variation
+
+    def tick(self):
+        self.radius += self.radius_variation
+
+    def is_expired(self):
+        return self.radius >= LIFE_TANK.width / 2 or self.radius <= 0
+
+
+class _OldFlows:
+    """
+    原来的 LifeBubbleFlow、SandWaveFlow 的更新逻辑
+    """
+
+    def __init__(self):
+        self.bubbles = []
+        self.sand_waves = []
+        self.time = 0
+
+    def tick(self):
+        self.bubbles.append(_OldBubble(LIFE_TANK.width / 2))
+        for bubble in self.bubbles:
+            bubble.tick()
+        self.bubbles = [bubble for bubble in self.bubbles if bubble.is_alive]
+        for sand_wave in self.sand_waves:
+            sand_wave.tick()
+        self.sand_waves = [sand_wave for sand_wave in self.sand_waves if not sand_wave.is_expired()]
+        if self.time % 2 == 0:
+            self.sand_waves.append(_OldSandWave(0, 1))
+        self.time += 1
+
+    def count(self):
+        return len(self.bubbles), len(self.sand_waves)
+
+
+class _NewFlows:
+    def __init__(self):
+        self.bubble_flow = LifeBubbleFlow(LIFE_TANK.width / 2)
+        self.sand_wave_flow = SandWaveFlow(LIFE_TANK.width / 2, 1)
+        self.sand_wave_flow.period = 2
+
+    def tick(self):
+        self.bubble_flow.tick()
+        self.sand_wave_flow.tick()
+
+    def count(self):
+        return len(self.bubble_flow.bubbles), len(self.sand_wave_flow.sand_waves)
+
+
+def _measure(flows, ticks: int, samples: int = 5):
+    """
+    预热到粒子数量稳定之后，运行 ticks 帧，均匀取几次内存
+    """
+
+    for _ in range(1000):
+        flows.tick()
+        GAS_LEDGER.commit()
+    tracemalloc.start()
+    memory = []
+    elapsed = 0.0
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(ticks // samples):
+            flows.tick()
+            GAS_LEDGER.commit()
+        elapsed += time.perf_counter() - start
+        memory.append(tracemalloc.get_traced_memory()[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / ticks, memory, peak
+
+
+def main(ticks: int = 5000):
+    SYSTEM_INFO_MANAGER.INSPECTOR_NETWORK.network_speeds.sent_speed = 1_000_000
+    for name, flows in (('逐个对象', _OldFlows()), ('现在    ', _NewFlows())):
+        per_tick, memory, peak = _measure(flows, ticks)
+        bubbles, sand_waves = flows.count()
+        print(f'{name}  {per_tick * 1000:7.3f} ms/帧  {bubbles} 个气泡 {sand_waves} 个波  '
+              f'内存 {" ".join(f"{m / 1024:6.1f}" for m in memory)} KiB  峰值 {peak / 1024:6.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+RangeDivider 各种查找方式的耗时对比，用的是小鱼缸里每帧都在查的三个分割器
+原来的默认做法是遍历查找，原来的 binary 是手写的二分查找，这里保留一份原来的 get_tag 作对照
+默认的 divider[v] 在有查找表时查表，否则用 bisect；没有查找表的分割器不测 lut
+"""
+import timeit
+from numbers import Real
+
+import numpy as np
+
+from cyber_life.life.sand_wave_flow import SandWaveFlow
+from cyber_life.life.tank import LIFE_TANK
+
+
+def _old_get_tag(divider, value, mode='iter'):
+    """
+    原来的 get_tag，支持遍历查找和手写的二分查找
+    """
+
+    assert isinstance(value, Real)
+    divisions = divider._divisions
+    tags = divider._tags
+
+    if mode == 'iter':
+        for i, division in enumerate(divisions):
+            if value < division:
+                return tags[i]
+        return tags[-1]
+
+    elif mode == 'binary':
+        if value < divisions[0]:
+            return tags[0]
+        elif value >= divisions[-1]:
+            return tags[-1]
+        left, right = 0, len(divisions) - 1
+        while right - left > 1:
+            mid = (left + right) >> 1
+            if value < divisions[mid]:
+                right = mid
+            else:
+                left = mid
+        return tags[right]
+
+
+def main(number: int = 1000):
+    rng = np.random.default_rng(0)
+    cases = (
+        ('网速 WAVE_INFO_RD      ', LIFE_TANK.WAVE_INFO_RD, rng.integers(0, 3_000_000, 1000).tolist()),
+        ('小时 STROKE_COLOR_RD   ', LIFE_TANK.STROKE_COLOR_RD, rng.integers(0, 24, 1000).tolist()),
+        ('磁盘 DISKIO_FREQ_RD    ', SandWaveFlow.DISKIO_FREQ_RD, rng.integers(-1, 40, 1000).tolist()),
+    )
+    for name, divider, values in cases:
+        print(name)
+        array = np.array(values)
+        modes = [
+            ('原来的默认 遍历  ', lambda: [_old_get_tag(divider, v) for v in values]),
+            ('原来的手写二分   ', lambda: [_old_get_tag(divider, v, 'binary') for v in values]),
+            ('get_tag bisect   ', lambda: [divider.get_tag(v, mode='bisect') for v in values]),
+            ('get_tag lut      ', lambda: [divider.get_tag(v, mode='lut') for v in values]),
+            ('默认 divider[v]  ', lambda: [divider[v] for v in values]),
+            ('get_tags(数组)   ', lambda: divider.get_tags(array)),
+        ]
+        for mode_name, func in modes:
+            if 'lut' in mode_name and divider._lut is None:
+                continue
+            seconds = timeit.timeit(func, number=number) / number
+            print(f'  {mode_name} {seconds / len(values) * 1e9:7.1f} ns/次')
+
+
+if __name__ == '__main__':
+    main(200)
@@ -0,0 +1,50 @@
+"""
+屏幕亮度计算的性能对比
+原来的做法：随机取 100 个像素，逐个 getpixel
+现在的做法：每隔几个像素取一个，在 C 里统计各通道的直方图，再对各通道的平均值加权
+
+不需要真的截屏，用随机噪声图代替 4K 屏幕截图
+"""
+import timeit
+from random import randint
+
+import numpy as np
+from PIL import Image
+
+from cyber_life.computer_info.inspector_screen import get_brightness, InspectorScreen
+
+
+def getpixel_brightness(im: Image.Image) -> float:
+    """
+    原来 InspectorScreen.inspect 中的算法
+    """
+
+    width, height = im.size
+    screen_brightness = 0.0
+    for i in range(100):
+        x = randint(0, width - 1)
+        y = randint(0, height - 1)
+        r, g, b = im.getpixel((x, y))
+        screen_brightness += (r + g + b) / 3.0 / 255.0
+    return screen_brightness / 100.0
+
+
+def main(width: int = 3840, height: int = 2160, number: int = 20):
+    rng = np.random.default_rng(0)
+    im = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), 'RGB')
+
+    print(f'图片大小 {width}x{height}，每种算法运行 {number} 次')
+    cases = {
+        'getpixel 100 次': lambda: getpixel_brightness(im),
+        f'直方图 步长 {InspectorScreen.SAMPLE_STRIDE}': lambda: get_brightness(im, InspectorScreen.SAMPLE_STRIDE),
+        '直方图 全部像素': lambda: get_brightness(im),
+    }
+    for name, func in cases.items():
+        cost = timeit.timeit(func, number=number) / number
+        # 多算几次，看看结果的波动
+        results = [func() for _ in range(5)]
+        print(f'{name:<20} {cost * 1000:8.2f} ms/次  结果 {min(results):.4f} ~ {max(results):.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+小鱼缸快照的保存、恢复耗时，模拟一个长了几千个水草节点、几千个食物和气泡的鱼缸
+对照：用 pickle 直接保存 LifeManager 的全部对象
+"""
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from cyber_life.life.bubble_flow import LifeBubbleFlow
+from cyber_life.life.fish.guppy_fish import GuppyFish
+from cyber_life.life.food import Food
+from cyber_life.life.life_manager import LifeManager
+from cyber_life.life.tank import LIFE_TANK
+from cyber_life.service.snapshot import TANK_SNAPSHOT
+
+
+def _best_of(function, number: int) -> float:
+    best = float('inf')
+    for _ in range(number):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(entities: int = 2000, number: int = 5):
+    life_manager = LifeManager()
+    life_manager.bubble_flow = LifeBubbleFlow(LIFE_TANK.width / 2, capacity=entities)
+    for _ in range(entities):
+        life_manager.plant.grow_node()
+    for i in range(entities):
+        food = Food(i % LIFE_TANK.width)
+        life_manager.food_list.append(food)
+        life_manager.food_grid.insert(food, food.location.x, food.location.y)
+        life_manager.bubble_flow.bubbles.spawn(i % LIFE_TANK.width)
+    life_manager.fish_list.extend(GuppyFish() for _ in range(entities // 20))
+    print(f'{len(life_manager.plant.nodes)} 个水草节点，{len(life_manager.food_list)} 个食物，'
+          f'{len(life_manager.bubble_flow.bubbles)} 个气泡，{len(life_manager.fish_list)} 条鱼，'
+          f'{life_manager.balls.count} 个生物球')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = os.path.join(tmp, 'tank.snapshot')
+        pickle_file = os.path.join(tmp, 'tank.pickle')
+
+        # 水草节点是一条链表，pickle 按链递归，几千个节点就超过默认的递归深度
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), entities * 10))
+
+        def save_pickle():
+            with open(pickle_file, 'wb') as file:
+                pickle.dump(life_manager, file)
+
+        def load_pickle():
+            with open(pickle_file, 'rb') as file:
+                pickle.load(file)
+
+        save = _best_of(lambda: TANK_SNAPSHOT.save(life_manager, snapshot_file), number)
+        restore = _best_of(lambda: TANK_SNAPSHOT.restore(life_manager, snapshot_file), number)
+        save_pickle_time = _best_of(save_pickle, number)
+        load_pickle_time = _best_of(load_pickle, number)
+
+        print(f'快照    保存 {save * 1000:7.2f} ms  恢复 {restore * 1000:7.2f} ms  '
+              f'{os.path.getsize(snapshot_file) / 1024:7.1f} KiB')
+        print(f'pickle  保存 {save_pickle_time * 1000:7.2f} ms  读取 {load_pickle_time * 1000:7.2f} ms  '
+              f'{os.path.getsize(pickle_file) / 1024:7.1f} KiB')
+        print('快照恢复包括重新创建对象、放回鱼缸，pickle 读取只是反序列化')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Vector 原地运算的性能对比，模拟一帧内 100 条鱼向目标游动、200 个水草节点和气泡的位置迭代
+原来的做法：location += (goal - location).normalize() * speed 等，每次运算都创建新的 Vector
+现在的做法：move_towards、+=、*= 等原地修改
+
+用 python -O -m cyber_life.tests.benchmark.bench_vector 运行可以看到去掉 assert 之后的速度
+"""
+import timeit
+from random import Random
+
+from cyber_life.tools.vector import Vector
+
+
+class _Counter:
+    count = 0
+
+
+_vector_init = Vector.__init__
+
+
+def _counting_init(self, *args, **kwargs):
+    _Counter.count += 1
+    _vector_init(self, *args, **kwargs)
+
+
+def main(fish_count: int = 100, node_count: int = 200, number: int = 200):
+    rng = Random(0)
+    fishes = [(Vector(rng.uniform(0, 300), rng.uniform(0, 160)), Vector(rng.uniform(0, 300), rng.uniform(0, 160)))
+              for _ in range(fish_count)]
+    nodes = [(Vector(rng.uniform(0, 300), rng.uniform(0, 160)), Vector.random(0.1), Vector(0, 0))
+             for _ in range(node_count)]
+
+    def old_one_tick():
+        for i, (location, goal) in enumerate(fishes):
+            fishes[i] = (location + (goal - location).normalize() * 0.1, goal)
+        for i, (location, velocity, acceleration) in enumerate(nodes):
+            velocity = velocity + acceleration
+            location = location + velocity
+            acceleration = acceleration + Vector(0, -0.01)
+            nodes[i] = (location, velocity, acceleration)
+
+    def new_one_tick():
+        for location, goal in fishes:
+            location.move_towards(goal, 0.1)
+        for location, velocity, acceleration in nodes:
+            velocity += acceleration
+            location += velocity
+            acceleration.y -= 0.01
+
+    def count_allocations(one_tick) -> int:
+        _Counter.count = 0
+        Vector.__init__ = _counting_init
+        try:
+            one_tick()
+        finally:
+            Vector.__init__ = _vector_init
+        return _Counter.count
+
+    print(f'{fish_count} 条鱼，{node_count} 个水草节点，每种做法运行 {number} 帧，assert {"开启" if __debug__ else "关闭"}')
+    old_allocations = count_allocations(old_one_tick)
+    new_allocations = count_allocations(new_one_tick)
+    old = timeit.timeit(old_one_tick, number=number) / number
+    new = timeit.timeit(new_one_tick, number=number) / number
+    print(f'创建新对象    {old * 1000:8.3f} ms/帧  {old_allocations:5d} 个 Vector/帧')
+    print(f'原地修改      {new * 1000:8.3f} ms/帧  {new_allocations:5d} 个 Vector/帧')
+    print(f'加速 {old / new:.1f} 倍')
+
+
+if __name__ == '__main__':
+    main()
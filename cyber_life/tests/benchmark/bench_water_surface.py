@@ -0,0 +1,64 @@
+"""
+水面绘制的耗时对比，网速最大时波动最大
+原来的做法：每 10 像素一个细矩形，每个矩形调用一次 math.sin，一帧画 30 个矩形
+现在的做法：NumPy 一次算出每 2 像素一个点的高度，直接写进 QPolygonF，一帧画一个多边形
+"""
+import os
+import timeit
+from math import sin
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QGuiApplication, QImage, QPainter
+
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+from cyber_life.life.tank import LIFE_TANK
+
+
+def _old_water(painter: QPainter, wave_info):
+    dx = 10
+    for x in range(0, LIFE_TANK.width, dx):
+        height = wave_info[0] * sin((x + LIFE_TANK.time * wave_info[2]) * wave_info[1] * 0.2)
+        y = round(LIFE_TANK.division[0] + height)
+        painter.drawRect(x, y, dx, LIFE_TANK.height - y)
+
+
+def _new_water(painter: QPainter, wave_info):
+    points = LIFE_TANK._water_polygon_points()
+    surface = points[:-2]
+    surface[:, 1] = LIFE_TANK.get_wave_height(surface[:, 0], wave_info) + LIFE_TANK.division[0]
+    points[-2:, 1] = LIFE_TANK.height
+    painter.drawPolygon(LIFE_TANK._water_polygon)
+
+
+def main(number: int = 2000):
+    _app = QGuiApplication([])
+    SYSTEM_INFO_MANAGER.INSPECTOR_NETWORK.network_speeds.recv_speed = 2_000_000
+    wave_info = LIFE_TANK.WAVE_INFO_RD[2_000_000]
+    LIFE_TANK.division = [LIFE_TANK.height * 0.2, LIFE_TANK.height * 0.9, LIFE_TANK.height]
+    image = QImage(LIFE_TANK.width, LIFE_TANK.height + 1, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(LIFE_TANK.water_color_best)
+
+    def timed(function) -> float:
+        def one_frame():
+            LIFE_TANK.time += 1
+            function(painter, wave_info)
+
+        return min(timeit.repeat(one_frame, number=number, repeat=3)) / number
+
+    old = timed(_old_water)
+    new = timed(_new_water)
+    whole = timed(lambda p, _: LIFE_TANK.paint(p))
+    painter.end()
+
+    print(f'{LIFE_TANK.width}x{LIFE_TANK.height} 的小鱼缸，运行 {number} 帧')
+    print(f'30 个矩形        {old * 1e6:7.1f} µs/帧')
+    print(f'一个多边形       {new * 1e6:7.1f} µs/帧  {len(LIFE_TANK._water_points) - 2} 个点')
+    print(f'整个 LIFE_TANK.paint {whole * 1e6:7.1f} µs/帧')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+from unittest import TestCase, main
+
+import numpy as np
+from PyQt5.QtGui import QColor
+
+from cyber_life.tools.color import ColorRamp, get_color_by_hsv_ratio
+from cyber_life.tools.compute import lerp
+
+
+class TestColorRamp(TestCase):
+    def test_same_as_lerp(self):
+        start, end = QColor(40, 80, 255, 80), QColor(22, 135, 67, 80)
+        ramp = ColorRamp((start, end), steps=101)
+        for i in range(101):
+            self.assertEqual(ramp.at(i / 100).getRgb(), lerp(start, end, i / 100).getRgb())
+
+    def test_multiple_colors(self):
+        ramp = ColorRamp((QColor(0, 0, 0), QColor(200, 0, 0), QColor(200, 200, 0)), steps=5)
+        self.assertEqual([ramp[i].getRgb() for i in range(len(ramp))], [
+            (0, 0, 0, 255), (100, 0, 0, 255), (200, 0, 0, 255), (200, 100, 0, 255), (200, 200, 0, 255)
+        ])
+
+    def test_indices(self):
+        ramp = ColorRamp((QColor(0, 0, 0), QColor(255, 255, 255)))
+        ratios = np.array([-0.5, 0, 0.3, 0.5, 0.77, 1, 3])
+        self.assertEqual(ramp.indices(ratios).tolist(), [ramp.index(ratio) for ratio in ratios.tolist()])
+        # 同一级返回同一个对象
+        self.assertIs(ramp.at(0.5), ramp[ramp.index(0.5)])
+
+    def test_hsv(self):
+        start, end = QColor(255, 0, 0), QColor(0, 0, 255)
+        ramp = ColorRamp((start, end), steps=11, mode='hsv')
+        for i in range(11):
+            self.assertEqual(ramp[i].getRgb(), get_color_by_hsv_ratio(start, end, i / 10).getRgb())
+        with self.assertRaises(ValueError):
+            ColorRamp((start, end), mode='lab')
+
+
+if __name__ == '__main__':
+    main()
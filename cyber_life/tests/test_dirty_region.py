@@ -0,0 +1,119 @@
+import os
+from datetime import datetime, timedelta
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import numpy as np
+
+# 测试不需要显示窗口
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtWidgets import QApplication
+
+from cyber_life.life.life_manager import LifeManager
+from cyber_life.life.tank import LIFE_TANK
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_cache import PaintCache
+
+
+class TestDirtyRegion(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_previous_and_current(self):
+        dirty = DirtyRegion(100, 100)
+        dirty.add_rect(10, 10, 5, 5)
+        # 第一帧整个重绘
+        self.assertIsNone(dirty.take())
+
+        dirty.add_rect(30, 10, 5, 5)
+        dirty.add_rects(np.array([(60, 60, 4, 4), (-50, -50, 10, 10)]))
+        region = dirty.take()
+        # 上一帧的位置要擦掉，这一帧的位置要画上
+        self.assertTrue(region.contains(QRect(10, 10, 5, 5)))
+        self.assertTrue(region.contains(QRect(30, 10, 5, 5)))
+        self.assertTrue(region.contains(QRect(60, 60, 4, 4)))
+        self.assertFalse(region.contains(QRect(80, 80, 1, 1)))
+        self.assertFalse(region.contains(QRect(0, 0, 1, 1)))
+
+        # 这一帧没有报告的，上一帧的位置也要擦掉
+        dirty.add_rect(30, 10, 5, 5)
+        region = dirty.take()
+        self.assertTrue(region.contains(QRect(60, 60, 4, 4)))
+        self.assertFalse(region.contains(QRect(10, 10, 5, 5)))
+        # 什么都没有报告，不需要重绘
+        dirty.take()
+        self.assertTrue(dirty.take().isEmpty())
+        self.assertEqual((dirty.frame_count, dirty.full_count), (5, 1))
+
+    def test_full_repaint(self):
+        dirty = DirtyRegion(100, 100)
+        dirty.take()
+        dirty.add_rect(0, 0, 80, 80)
+        self.assertIsNone(dirty.take())
+        dirty.add_rect(0, 0, 1, 1)
+        dirty.invalidate()
+        self.assertIsNone(dirty.take())
+        self.assertIsNotNone(dirty.take())
+
+    def test_region_covers_changes(self):
+        # 只重绘报告的区域，和整个重绘的结果一样
+        # 绘制和模拟的频率不一样：有时绘制之前不模拟，每次绘制时插值的比例都不同
+        life_manager = object.__new__(LifeManager)
+        life_manager.__init__()
+        dirty = DirtyRegion(LIFE_TANK.width, LIFE_TANK.height + 1)
+        full = QImage(LIFE_TANK.width, LIFE_TANK.height + 1, QImage.Format_ARGB32_Premultiplied)
+        partial = QImage(full)
+
+        def render(image: QImage, blend: float, region=None):
+            painter = QPainter(image)
+            if region is not None:
+                painter.setClipRegion(region)
+            painter.fillRect(image.rect(), QColor(20, 20, 20))
+            life_manager.paint(painter, blend)
+            painter.end()
+
+        # 贪吃蛇边框随真实时间移动，两次绘制之间时间要一样
+        now = datetime(2024, 1, 1, 12)
+        partial_frames = 0
+        for frame in range(200):
+            now += timedelta(milliseconds=10)
+            if frame % 3 != 2:
+                life_manager.tick()
+            if frame % 20 == 0:
+                life_manager.add_food(LIFE_TANK.width / 3)
+            blend = frame * 0.37 % 1
+            with patch('cyber_life.life.tank.datetime') as fake_datetime:
+                fake_datetime.now.return_value = now
+                life_manager.report_bounds(dirty, blend)
+                region = dirty.take()
+                render(full, blend)
+                render(partial, blend, region)
+            if region is not None:
+                partial_frames += 1
+                self.assertEqual(partial, full, f'第 {frame} 帧')
+            else:
+                partial = QImage(full)
+        self.assertGreater(partial_frames, 0)
+
+    def test_light_change(self):
+        # 亮度慢慢变化时，只有灯光渐变的透明度变了才整个窗口重绘
+        brightness = LIFE_TANK.light_brightness_current
+        try:
+            dirty = DirtyRegion(LIFE_TANK.width, LIFE_TANK.height + 1)
+            full_count = dirty.full_count
+            for i in range(100):
+                LIFE_TANK.light_brightness_current = 0.5 + i * 0.001
+                LIFE_TANK.report_bounds(dirty)
+                dirty.take()
+            # 第一帧整个重绘；之后亮度变了 0.1，透明度变了 25.5，每 PaintCache.ALPHA_STEP 才变一次
+            self.assertLessEqual(dirty.full_count - full_count, 2 + 26 // PaintCache.ALPHA_STEP)
+        finally:
+            LIFE_TANK.light_brightness_current = brightness
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import TestCase, main
+
+from cyber_life.life.fast_forward import FastForward, ticks_until
+
+# 仓库根目录，子进程在这里运行才能导入 cyber_life
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 在新的进程里运行，每次都是全新的鱼缸；第一个参数是 real（逐帧运行）或 ff（快进）
+_RUN_SCRIPT = '''
+import json
+import sys
+from cyber_life import static
+static.TANK_SCREEN_WIDTH, static.TANK_SCREEN_HEIGHT = 300, 169
+from cyber_life.service.rng import RNG
+RNG.seed(1)
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+from cyber_life.life.fast_forward import FAST_FORWARD
+from cyber_life.life.gas_manager import GAS_MANAGER
+from cyber_life.life.life_manager import LifeManager
+from cyber_life.life.tank import LIFE_TANK
+
+SYSTEM_INFO_MANAGER.INSPECTOR_SCREEN.screen_brightness = 1.0
+life_manager = LifeManager()
+for x in (50, 150, 250):
+    life_manager.add_food(x)
+for _ in range(500):
+    life_manager.tick()
+ticks = int(sys.argv[2])
+if sys.argv[1] == 'real':
+    for _ in range(ticks):
+        life_manager.tick()
+else:
+    FAST_FORWARD.advance(life_manager, ticks)
+fish = life_manager.fish_list[0]
+print(json.dumps({
+    'oxygen': GAS_MANAGER.oxygen,
+    'carbon_dioxide': GAS_MANAGER.carbon_dioxide,
+    'balls_carbon': float(life_manager.balls.carbon.sum()),
+    'fish_carbon': fish.carbon,
+    'fish_energy': fish.energy.current_value,
+    'food': len(life_manager.food_list),
+    'brightness': LIFE_TANK.light_brightness_current,
+    'time': LIFE_TANK.time,
+    'steps': FAST_FORWARD.last_steps,
+}))
+'''
+
+
+def run_tank(mode: str, ticks: int) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    result = subprocess.run([sys.executable, '-c', _RUN_SCRIPT, mode, str(ticks)], cwd=_ROOT_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class _Plant:
+    GROW_PROBABILITY = 1 / (3600 * 60)
+
+    def __init__(self):
+        self.grown = 0
+
+    def grow_node(self):
+        self.grown += 1
+
+
+class TestFastForward(TestCase):
+    def test_ticks_until(self):
+        self.assertEqual(ticks_until(10, -2, 0), 5)
+        self.assertEqual(ticks_until(10, 2, 0), float('inf'))
+        self.assertEqual(ticks_until(10, 0, 0), float('inf'))
+        # 已经在阈值另一边，远离阈值
+        self.assertEqual(ticks_until(-1, -2, 0), float('inf'))
+
+    def test_plant_growth(self):
+        # 每帧一个很小的生长概率，几亿帧之后生长的次数接近期望值
+        plant = _Plant()
+        FastForward._grow_plant(plant, 3600 * 60 * 400)
+        self.assertTrue(320 < plant.grown < 480, plant.grown)
+
+    def test_close_to_real_ticks(self):
+        ticks = 10000
+        real = run_tank('real', ticks)
+        fast = run_tank('ff', ticks)
+        self.assertLess(fast['steps'], 20)
+        self.assertEqual(fast['time'], real['time'])
+        self.assertEqual(fast['food'], real['food'])
+        self.assertAlmostEqual(fast['brightness'], real['brightness'], places=6)
+        for key in ('oxygen', 'carbon_dioxide', 'balls_carbon', 'fish_carbon', 'fish_energy'):
+            with self.subTest(key):
+                self.assertAlmostEqual(fast[key], real[key], delta=max(5.0, abs(real[key]) * 0.02))
+
+
+if __name__ == '__main__':
+    main()
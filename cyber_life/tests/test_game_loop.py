@@ -0,0 +1,123 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from cyber_life.life.ball import LifeBallGroup
+from cyber_life.service.game_loop import GameLoop
+
+
+def new_game_loop(sim_rate: float = 100, render_rate: float | None = None) -> GameLoop:
+    # 绕过单例，每个测试用一个新的对象
+    game_loop = object.__new__(GameLoop)
+    game_loop.__init__(sim_rate, render_rate)
+    return game_loop
+
+
+class TestGameLoop(TestCase):
+    def test_fixed_step(self):
+        game_loop = new_game_loop()
+        # 第一次只开始计时
+        self.assertEqual(game_loop.advance(10.0), 0)
+        self.assertEqual(game_loop.advance(10.025), 2)
+        # 不足一帧的部分留到下一次，也是绘制时插值的比例
+        self.assertAlmostEqual(game_loop.blend, 0.5)
+        self.assertEqual(game_loop.advance(10.03), 1)
+        self.assertAlmostEqual(game_loop.blend, 0.0)
+        # 绘制比模拟快时，有的绘制不模拟，只是插值的比例变了
+        self.assertEqual(game_loop.advance(10.034), 0)
+        self.assertAlmostEqual(game_loop.blend, 0.4)
+        # 模拟的帧数只和经过的时间有关，和绘制的频率无关
+        for i in range(1, 1001):
+            game_loop.advance(10.03 + i * 0.007)
+        self.assertEqual(game_loop.tick_count, 703)
+
+    def test_clamp(self):
+        game_loop = new_game_loop()
+        game_loop.advance(0.0)
+        # 卡了 0.15 秒，一次最多补 MAX_TICKS_PER_FRAME 帧，剩下的之后再补
+        self.assertEqual(game_loop.advance(0.15), GameLoop.MAX_TICKS_PER_FRAME)
+        self.assertEqual(game_loop.blend, 1.0)
+        self.assertEqual(game_loop.advance(0.15), 5)
+        self.assertEqual(game_loop.clamped_count, 1)
+
+    def test_stall_is_not_lost(self):
+        # 卡顿不超过 MAX_BACKLOG 秒（省电模式判断错过了帧的间隔），之后逐帧补上
+        game_loop = new_game_loop()
+        game_loop.advance(0.0)
+        now = 0.9
+        ticks = game_loop.advance(now)
+        for _ in range(20):
+            now += 0.016
+            ticks += game_loop.advance(now)
+        self.assertEqual(ticks, int(now * 100 + 1e-9))
+        self.assertEqual(game_loop.missed_ticks(), 0)
+        self.assertEqual(game_loop.dropped_seconds, 0.0)
+
+        # 几次卡顿叠在一起超过 MAX_BACKLOG 秒，多出来的交给快进
+        start_ticks = game_loop.tick_count
+        for _ in range(3):
+            now += 0.8
+            game_loop.advance(now)
+        missed = game_loop.missed_ticks()
+        self.assertGreater(missed, 0)
+        for _ in range(30):
+            now += 0.016
+            game_loop.advance(now)
+        self.assertEqual(game_loop.tick_count - start_ticks + missed, round((0.8 * 3 + 0.016 * 30) * 100))
+        self.assertEqual(game_loop.dropped_seconds, 0.0)
+
+    def test_overload(self):
+        # 机器跟不上：每次绘制都要 0.2 秒，一次只能补 10 帧，相当于半速
+        game_loop = new_game_loop()
+        game_loop.advance(0.0)
+        now = 0.0
+        missed = 0
+        for _ in range(50):
+            now += 0.2
+            game_loop.advance(now)
+            missed += game_loop.missed_ticks()
+        # 刚开始跟不上时积压的交给快进，连续 OVERLOAD_SECONDS 秒都补不完之后丢掉，不会一直快进
+        self.assertLess(missed, GameLoop.OVERLOAD_SECONDS * 100)
+        self.assertGreater(game_loop.dropped_seconds, 0.0)
+        self.assertLessEqual(game_loop.blend, 1.0)
+        total = game_loop.tick_count + missed + game_loop.dropped_seconds * 100 + game_loop._accumulator * 100
+        self.assertAlmostEqual(total, now * 100, places=6)
+
+    def test_reset(self):
+        game_loop = new_game_loop()
+        game_loop.advance(0.0)
+        game_loop.advance(0.005)
+        # 这段时间已经快进过了，重新计时
+        game_loop.reset(3600.0)
+        self.assertEqual(game_loop.blend, 0.0)
+        self.assertEqual(game_loop.advance(3600.01), 1)
+
+    def test_render_rate(self):
+        # 跟随显示器
+        game_loop = new_game_loop()
+        self.assertEqual(game_loop.render_interval, round(1000 / GameLoop.DEFAULT_RENDER_RATE))
+        game_loop.set_display_refresh_rate(144)
+        self.assertEqual(game_loop.render_interval, 7)
+        # 拿不到刷新率
+        game_loop.set_display_refresh_rate(0)
+        self.assertEqual(game_loop.render_interval, 7)
+
+        # 指定了绘制频率，和模拟的帧率互不影响
+        game_loop = new_game_loop(sim_rate=50, render_rate=30)
+        game_loop.set_display_refresh_rate(144)
+        self.assertEqual(game_loop.render_interval, 33)
+        game_loop.advance(0.0)
+        self.assertEqual(game_loop.advance(0.1), 5)
+
+    def test_interpolate(self):
+        balls = LifeBallGroup(3)
+        balls.tick()
+        previous = balls.previous_location.copy()
+        current = balls.location.copy()
+        np.testing.assert_allclose(balls.render_location(0.0), previous)
+        np.testing.assert_allclose(balls.render_location(0.25), previous * 0.75 + current * 0.25)
+        self.assertIs(balls.render_location(1.0), balls.location)
+
+
+if __name__ == '__main__':
+    main()
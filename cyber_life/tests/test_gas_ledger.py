@@ -0,0 +1,67 @@
+from unittest import TestCase, main
+
+from cyber_life.life.gas_ledger import GasLedger, OXYGEN, CARBON_DIOXIDE
+from cyber_life.life.gas_manager import GasManager
+
+
+def new_ledger() -> tuple[GasLedger, GasManager]:
+    # 绕过单例，每个测试用新的水和账本
+    gas_manager = object.__new__(GasManager)
+    gas_manager.__init__()
+    ledger = object.__new__(GasLedger)
+    ledger.__init__(gas_manager)
+    return ledger, gas_manager
+
+
+class TestGasLedger(TestCase):
+    def test_commit_once(self):
+        ledger, gas = new_ledger()
+        ledger.produce('LifeBubble', OXYGEN, 0.01)
+        ledger.consume('GuppyFish', OXYGEN, 0.1)
+        # 结算之前水中的气体不变
+        self.assertEqual(gas.oxygen, 1000)
+        ledger.commit()
+        self.assertAlmostEqual(gas.oxygen, 1000 - 0.1 + 0.01)
+        self.assertEqual(ledger.grant_ratio[OXYGEN], 1)
+
+    def test_fair_share(self):
+        ledger, gas = new_ledger()
+        gas.oxygen = 3
+        granted = []
+        for amount in (1, 2, 3):
+            ledger.consume('GuppyFish', OXYGEN, amount, granted.append)
+        ledger.commit()
+        # 需求 6，只有 3，每个请求都分到一半，而不是前两个拿走全部
+        self.assertEqual(granted, [0.5, 1, 1.5])
+        self.assertEqual(gas.oxygen, 0)
+        self.assertEqual(ledger.grant_ratio[OXYGEN], 0.5)
+
+    def test_produce_in_callback(self):
+        ledger, gas = new_ledger()
+        gas.carbon_dioxide = 0.5
+        gas.oxygen = 0
+
+        def on_granted(amount):
+            ledger.produce('LifePlantNode', OXYGEN, amount)
+
+        ledger.consume('LifePlantNode', CARBON_DIOXIDE, 1, on_granted)
+        # 这一帧产生的氧气这一帧不能用
+        ledger.consume('GuppyFish', OXYGEN, 1)
+        ledger.commit()
+        self.assertEqual(gas.carbon_dioxide, 0)
+        self.assertEqual(gas.oxygen, 0.5)
+        self.assertEqual(ledger.grant_ratio[OXYGEN], 0)
+
+    def test_flux_totals(self):
+        ledger, gas = new_ledger()
+        for _ in range(10):
+            ledger.produce('LifeBubble', CARBON_DIOXIDE, 0.5)
+            ledger.consume('LifeBall', CARBON_DIOXIDE, 0.25)
+            ledger.commit()
+        self.assertEqual(ledger.flux_totals['LifeBubble'], {OXYGEN: 0, CARBON_DIOXIDE: 5})
+        self.assertEqual(ledger.flux_totals['LifeBall'], {OXYGEN: 0, CARBON_DIOXIDE: -2.5})
+        self.assertEqual(gas.carbon_dioxide, 1000 + 5 - 2.5)
+
+
+if __name__ == '__main__':
+    main()
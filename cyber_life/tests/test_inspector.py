@@ -1,6 +1,16 @@
 import unittest
+from collections import namedtuple
+from unittest.mock import patch
+
+from PIL import Image
 
 from cyber_life.computer_info.inspector_cpu import InspectorCpu
+from cyber_life.computer_info.inspector_disk_io import InspectorDiskIO
+from cyber_life.computer_info.inspector_network import InspectorNetwork
+from cyber_life.computer_info.inspector_screen import get_brightness
+
+NetIo = namedtuple('NetIo', ['bytes_sent', 'bytes_recv'])
+DiskIo = namedtuple('DiskIo', ['read_bytes', 'write_bytes'])
 
 
 class TestInspectorCpu(unittest.TestCase):
@@ -11,5 +21,68 @@ class TestInspectorCpu(unittest.TestCase):
         pass
 
 
+class TestInspectorNetwork(unittest.TestCase):
+    @patch('cyber_life.computer_info.inspector_network.time.monotonic')
+    @patch('cyber_life.computer_info.inspector_network.psutil.net_io_counters')
+    def test_speed_from_last_sample(self, net_io_counters, monotonic):
+        net_io_counters.return_value = NetIo(1000, 5000)
+        monotonic.return_value = 10.0
+        inspector = InspectorNetwork()
+        # 构造时不采样
+        net_io_counters.assert_not_called()
+        # 第一次采样只记录，不计算
+        inspector.inspect()
+        self.assertEqual(inspector.get_current_result().sent_speed, 0)
+
+        net_io_counters.return_value = NetIo(2000, 9000)
+        monotonic.return_value = 10.5
+        inspector.inspect()
+        self.assertAlmostEqual(inspector.get_current_result().sent_speed, 2000)
+        self.assertAlmostEqual(inspector.get_current_result().recv_speed, 8000)
+
+        # 计数器被重置
+        net_io_counters.return_value = NetIo(0, 0)
+        monotonic.return_value = 11.0
+        inspector.inspect()
+        self.assertEqual(inspector.get_current_result().sent_speed, 0)
+        self.assertEqual(inspector.get_current_result().recv_speed, 0)
+
+
+class TestInspectorDiskIO(unittest.TestCase):
+    @patch('cyber_life.computer_info.inspector_disk_io.time.monotonic')
+    @patch('cyber_life.computer_info.inspector_disk_io.psutil.disk_io_counters')
+    def test_speed_from_last_sample(self, disk_io_counters, monotonic):
+        inspector = InspectorDiskIO()
+
+        disk_io_counters.return_value = DiskIo(0, 0)
+        monotonic.return_value = 1.0
+        inspector.inspect()
+        disk_io_counters.return_value = DiskIo(1024 * 100, 1024 * 40)
+        monotonic.return_value = 3.0
+        inspector.inspect()
+        self.assertEqual(inspector.get_current_result().read_bytes, 50)
+        self.assertEqual(inspector.get_current_result().write_bytes, 20)
+
+    @patch('cyber_life.computer_info.inspector_disk_io.psutil.disk_io_counters', return_value=None)
+    def test_no_disk(self, _):
+        inspector = InspectorDiskIO()
+        inspector.inspect()
+        self.assertEqual(inspector.get_current_result().read_bytes, 0)
+
+
+class TestScreenBrightness(unittest.TestCase):
+    def test_get_brightness(self):
+        self.assertAlmostEqual(get_brightness(Image.new('RGB', (64, 36), (255, 255, 255)), 8), 1.0, places=5)
+        self.assertAlmostEqual(get_brightness(Image.new('RGB', (64, 36), (0, 0, 0)), 8), 0.0, places=5)
+        # 绿色比蓝色看起来亮得多
+        self.assertAlmostEqual(get_brightness(Image.new('RGB', (64, 36), (0, 255, 0))), 0.7152, places=4)
+        self.assertAlmostEqual(get_brightness(Image.new('RGBA', (64, 36), (0, 0, 255, 255)), 4), 0.0722, places=4)
+
+    def test_half_white(self):
+        im = Image.new('RGB', (64, 36), (0, 0, 0))
+        im.paste((255, 255, 255), (0, 0, 32, 36))
+        self.assertAlmostEqual(get_brightness(im, 4), 0.5, places=5)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+import os
+from unittest import TestCase, main
+
+# 测试不需要显示窗口
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtWidgets import QApplication
+
+from cyber_life.tools.layer_cache import CachedLayer
+
+
+class TestCachedLayer(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.render_args = []
+        self.image = QImage(20, 10, QImage.Format_ARGB32)
+        self.image.fill(QColor(0, 0, 0))
+        self.layer = CachedLayer(self.render)
+
+    def render(self, painter: QPainter, height: int, gray: int):
+        self.render_args.append((height, gray))
+        painter.fillRect(0, 0, 20, height, QColor(gray, gray, gray))
+
+    def draw(self, key: tuple):
+        painter = QPainter(self.image)
+        self.layer.draw(painter, 20, 10, key)
+        painter.end()
+
+    def test_render_only_when_key_changes(self):
+        self.draw((5, 255))
+        self.draw((5, 255))
+        self.draw((5, 255))
+        self.assertEqual(self.render_args, [(5, 255)])
+        self.assertEqual((self.layer.hit_count, self.layer.miss_count), (2, 1))
+
+        self.draw((8, 100))
+        self.assertEqual(self.render_args, [(5, 255), (8, 100)])
+        self.assertEqual(self.image.pixelColor(0, 7), QColor(100, 100, 100))
+
+        self.layer.clear()
+        self.draw((8, 100))
+        self.assertEqual(len(self.render_args), 3)
+
+    def test_transparent_background(self):
+        self.draw((5, 255))
+        self.assertEqual(self.image.pixelColor(3, 2), QColor(255, 255, 255))
+        # 没画到的地方是透明的，不会盖住下面的内容
+        self.assertEqual(self.image.pixelColor(3, 8), QColor(0, 0, 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import os
+from random import Random
+from unittest import TestCase, main
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from cyber_life.life.ball import LifeBallGroup
+from cyber_life.life.gas_ledger import GAS_LEDGER
+from cyber_life.life.gas_manager import GAS_MANAGER
+from cyber_life.life.life_mixin.breathable_mixin import BreathableMixin
+from cyber_life.life.life_mixin.organism_mixin import OrganismMixin
+from cyber_life.life.tank import LIFE_TANK
+
+
+class _OneBall(BreathableMixin, OrganismMixin):
+    """
+    逐个球计算的气体交换，作为对照
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.co2_pre_request = LifeBallGroup.CO2_PRE_REQUEST
+
+
+class TestLifeBallGroup(TestCase):
+    def setUp(self):
+        self.rng = Random(9)
+        self.gas_backup = (GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide)
+        self.brightness_backup = LIFE_TANK.light_brightness_current
+
+    def tearDown(self):
+        GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide = self.gas_backup
+        LIFE_TANK.light_brightness_current = self.brightness_backup
+
+    def run_both(self, count, ticks, oxygen, carbon_dioxide):
+        """
+        同样的活跃度序列分别交给 LifeBallGroup 和逐个球计算，返回两边的气体、碳、能量
+        """
+
+        activities = [[self.rng.random() for _ in range(count)] for _ in range(ticks)]
+        brightness = [self.rng.random() for _ in range(ticks)]
+        results = []
+        self.min_grant_ratio = 1.0
+
+        GAS_LEDGER.commit()
+        GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide = oxygen, carbon_dioxide
+        group = LifeBallGroup(count)
+        for activity, light in zip(activities, brightness):
+            LIFE_TANK.light_brightness_current = light
+            group.set_activity(np.array(activity))
+            group._exchange_gas()
+            GAS_LEDGER.commit()
+        results.append((GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide, group.carbon, group.energy.current_values))
+
+        GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide = oxygen, carbon_dioxide
+        balls = [_OneBall() for _ in range(count)]
+        for activity, light in zip(activities, brightness):
+            LIFE_TANK.light_brightness_current = light
+            for ball, a in zip(balls, activity):
+                ball.o2_pre_request = 0.01 + a
+                ball.photosynthesis()
+                ball.breath()
+            GAS_LEDGER.commit()
+            self.min_grant_ratio = min(self.min_grant_ratio, *GAS_LEDGER.grant_ratio.values())
+        results.append((GAS_MANAGER.oxygen, GAS_MANAGER.carbon_dioxide,
+                        np.array([ball.carbon for ball in balls]),
+                        np.array([ball.energy.current_value for ball in balls])))
+        return results
+
+    def assert_same(self, results):
+        (o2, co2, carbon, energy), (o2_ref, co2_ref, carbon_ref, energy_ref) = results
+        self.assertAlmostEqual(o2, o2_ref, places=9)
+        self.assertAlmostEqual(co2, co2_ref, places=9)
+        np.testing.assert_allclose(carbon, carbon_ref, atol=1e-9)
+        np.testing.assert_allclose(energy, energy_ref, atol=1e-7)
+
+    def test_gas_exchange_enough_gas(self):
+        self.assert_same(self.run_both(64, 50, 1000, 1000))
+        self.assertEqual(self.min_grant_ratio, 1)
+
+    def test_gas_exchange_short_of_gas(self):
+        # 气体不够所有球用，每个球按同样的比例分配
+        self.assert_same(self.run_both(64, 50, 3, 0.5))
+        self.assertLess(self.min_grant_ratio, 1)
+
+    def test_boundary(self):
+        group = LifeBallGroup(4)
+        group.location[:] = [(-10, 50), (LIFE_TANK.width + 10, 50), (50, -100), (50, LIFE_TANK.height + 100)]
+        group.velocity[:] = [(-0.1, 0), (0.1, 0), (0, -0.1), (0, 0.1)]
+        group.tick()
+        self.assertGreater(group.velocity[0, 0], 0)
+        self.assertLess(group.velocity[1, 0], 0)
+        self.assertGreater(group.velocity[2, 1], 0)
+        self.assertEqual(group.location[2, 1], LIFE_TANK.division[0])
+        self.assertLess(group.velocity[3, 1], 0)
+        self.assertEqual(group.location[3, 1], LIFE_TANK.division[1] - group.RADIUS)
+
+    def test_rotate_and_color(self):
+        group = LifeBallGroup(2)
+        group.velocity[:] = [(0.1, 0), (0.1, 0)]
+        group.set_activity(np.array([0.0, 1.0]))
+        np.testing.assert_allclose(group.velocity[0], (0.1, 0))
+        np.testing.assert_allclose(group.velocity[1], (0.1 * np.cos(np.radians(15)), 0.1 * np.sin(np.radians(15))))
+        self.assertEqual(group.colors.tolist(), [[10, 150, 10, 255], [255, 255, 0, 255]])
+
+    def test_fewer_results_than_balls(self):
+        group = LifeBallGroup(4)
+        group.set_activity(np.array([0.5, 0.5]))
+        self.assertEqual(group.activity.tolist(), [0.5, 0.5, 0.0, 0.0])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import os
+from unittest import TestCase, main
+
+import numpy as np
+
+# 测试不需要显示窗口
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter, QColor, QPen
+from PyQt5.QtWidgets import QApplication
+
+from cyber_life.tools.paint_batch import PaintBatch
+
+
+def render(paint) -> QImage:
+    image = QImage(60, 40, QImage.Format_ARGB32)
+    image.fill(QColor(0, 0, 0, 0))
+    painter = QPainter(image)
+    paint(painter)
+    painter.end()
+    return image
+
+
+class TestPaintBatch(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_same_as_direct(self):
+        red = QPen(QColor(255, 0, 0, 200), 2)
+        green = QPen(QColor(0, 255, 0))
+        lines = np.array([(1.4, 2.6, 50.5, 30.2), (10, 35, 40, 5)])
+        ellipses = np.array([(5.5, 5.5, 8, 8), (30, 10, 12.6, 6)])
+
+        def direct(painter: QPainter):
+            for x1, y1, x2, y2 in lines.tolist():
+                painter.setPen(red)
+                painter.drawLine(round(x1), round(y1), round(x2), round(y2))
+            painter.setPen(red)
+            painter.drawLine(0, 39, 59, 39)
+            for left, top, width, height in ellipses.tolist():
+                painter.setPen(green)
+                painter.setBrush(Qt.yellow)
+                painter.drawEllipse(round(left), round(top), round(width), round(height))
+
+        batch = PaintBatch()
+
+        def batched(painter: QPainter):
+            batch.add_lines('red', red, lines)
+            batch.add_ellipses('green', green, Qt.yellow, ellipses[:1])
+            batch.add_line('red', red, 0, 39, 59, 39)
+            batch.add_ellipses('green', green, Qt.yellow, ellipses[1:])
+            batch.flush(painter)
+
+        self.assertEqual(render(batched), render(direct))
+        # 两种材质，线段一次提交，椭圆逐个画
+        self.assertEqual((batch.state_changes, batch.draw_calls), (2, 3))
+
+        # flush 之后清空
+        self.assertEqual(render(batch.flush), render(lambda painter: None))
+        self.assertEqual((batch.state_changes, batch.draw_calls), (0, 0))
+
+    def test_material_order(self):
+        # 材质按第一次出现的顺序画，后画的盖住先画的
+        batch = PaintBatch()
+        batch.add_ellipse('blue', QPen(Qt.NoPen), QColor(0, 0, 255), 0, 0, 60, 40)
+        batch.add_ellipse('white', QPen(Qt.NoPen), QColor(255, 255, 255), 20, 10, 20, 20)
+        batch.add_ellipse('blue', QPen(Qt.NoPen), QColor(0, 0, 255), 0, 0, 60, 40)
+        image = render(batch.flush)
+        self.assertEqual(image.pixelColor(30, 20), QColor(255, 255, 255))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import os
+from unittest import TestCase, main
+
+# 测试不需要显示窗口
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+
+from cyber_life.tools.paint_cache import PaintCache
+
+
+class TestPaintCache(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.cache = object.__new__(PaintCache)
+        self.cache.__init__()
+
+    def test_same_style_same_object(self):
+        pen = self.cache.pen(224, 159, 0, 101.3, 8)
+        self.assertIs(self.cache.pen(224, 159, 0, 99, 8.1), pen)
+        self.assertEqual((pen.color().alpha(), pen.widthF()), (100, 8))
+        self.assertIsNot(self.cache.pen(224, 159, 0, 120, 8), pen)
+        # 不同种类的对象不会混在一起
+        self.assertIsNot(self.cache.color(224, 159, 0, 100), self.cache.brush(224, 159, 0, 100))
+        self.assertEqual(self.cache.color(1, 2, 3, 255).alpha(), 255)
+        self.assertIs(self.cache.font('Arial', 6), self.cache.font('Arial', 6))
+        self.assertEqual(self.cache.named_color('skyblue').name(), '#87ceeb')
+
+        gradient = self.cache.linear_gradient(0, 0, 0, 50, ((0.0, (255, 255, 255, 129)), (1.0, (255, 255, 255, 0))))
+        self.assertIs(self.cache.linear_gradient(0, 0, 0, 50, ((0.0, (255, 255, 255, 127)), (1.0, (255, 255, 255, 0)))),
+                      gradient)
+        self.assertEqual(gradient.stops()[0][1].alpha(), 128)
+
+        self.assertEqual((self.cache.hit_count, self.cache.miss_count), (3, 8))
+
+    def test_bounded(self):
+        self.cache.MAX_SIZE = 3
+        first = self.cache.color(0, 0, 0)
+        for i in range(1, 3):
+            self.cache.color(i, 0, 0)
+        # 用过一次之后变成最近用过的，淘汰的是第二个
+        self.assertIs(self.cache.color(0, 0, 0), first)
+        self.cache.color(3, 0, 0)
+        self.assertEqual(len(self.cache), 3)
+        self.assertIs(self.cache.color(0, 0, 0), first)
+        misses = self.cache.miss_count
+        self.cache.color(1, 0, 0)
+        self.assertEqual(self.cache.miss_count, misses + 1)
+
+
+if __name__ == '__main__':
+    main()
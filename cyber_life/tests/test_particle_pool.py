@@ -0,0 +1,94 @@
+import os
+from unittest import TestCase, main
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+from cyber_life.life.bubble_flow import LifeBubbleFlow
+from cyber_life.life.gas_ledger import GAS_LEDGER
+from cyber_life.life.sand_wave import SandWaveGroup
+from cyber_life.life.sand_wave_flow import SandWaveFlow
+from cyber_life.tools.particle_pool import ParticlePool
+
+
+class TestParticlePool(TestCase):
+    def test_wrap_around(self):
+        pool = ParticlePool(4, ('x',))
+        for i in range(3):
+            pool.spawn(x=i)
+        pool.kill(pool.slots()[:2])
+        for i in range(3, 6):
+            pool.spawn(x=i)
+        # 空出来的槽位重新使用，顺序仍然是生成的顺序
+        self.assertEqual(pool['x'][pool.slots()].tolist(), [2, 3, 4, 5])
+        self.assertEqual(sorted(pool.slots().tolist()), [0, 1, 2, 3])
+        self.assertEqual(pool.dropped, 0)
+
+    def test_kill_out_of_order(self):
+        pool = ParticlePool(4, ('x',))
+        for i in range(4):
+            pool.spawn(x=i)
+        pool.kill(pool.slots()[[1, 2]])
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool['x'][pool.slots()].tolist(), [0, 3])
+        # 中间的槽位要等最老的粒子死亡后才回收，池还是满的
+        pool.spawn(x=4)
+        self.assertEqual(pool.dropped, 1)
+        self.assertEqual(pool['x'][pool.slots()].tolist(), [3, 4])
+        pool.spawn(x=5)
+        pool.spawn(x=6)
+        self.assertEqual(pool.dropped, 1)
+        self.assertEqual(pool['x'][pool.slots()].tolist(), [3, 4, 5, 6])
+
+        # 已经死亡的粒子再杀一次不影响
+        pool.kill(np.array([0, 1, 2, 3]))
+        pool.kill(np.array([0, 1, 2, 3]))
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(len(pool.slots()), 0)
+        pool.spawn(x=7)
+        self.assertEqual(pool['x'][pool.slots()].tolist(), [7])
+
+
+class TestFlows(TestCase):
+    def setUp(self):
+        self.network_speeds = SYSTEM_INFO_MANAGER.INSPECTOR_NETWORK.network_speeds
+        self.sent_speed = self.network_speeds.sent_speed
+
+    def tearDown(self):
+        self.network_speeds.sent_speed = self.sent_speed
+
+    def test_bubbles_capped(self):
+        # 上传网速打满时每帧一个气泡，池满之后数量不再增长
+        self.network_speeds.sent_speed = 1_000_000
+        bubble_flow = LifeBubbleFlow(100, capacity=50)
+        for _ in range(1000):
+            bubble_flow.tick()
+            GAS_LEDGER.commit()
+        self.assertEqual(len(bubble_flow.bubbles), 50)
+        self.assertGreater(bubble_flow.bubbles.pool.dropped, 0)
+
+        # 不再生成之后，气泡全部离开水面
+        self.network_speeds.sent_speed = 0
+        for _ in range(1000):
+            bubble_flow.tick()
+            GAS_LEDGER.commit()
+        self.assertEqual(len(bubble_flow.bubbles), 0)
+
+    def test_sand_waves(self):
+        for speed in (1, -1):
+            with self.subTest(speed):
+                sand_wave_flow = SandWaveFlow(100, speed)
+                sand_wave_flow.period = 2
+                for _ in range(1000):
+                    sand_wave_flow.tick()
+                radii = sand_wave_flow.sand_waves.radii(sand_wave_flow.time)
+                # 稳定之后每 2 帧生成一个、过期一个，半径按生成顺序依次相差 2
+                self.assertEqual(len(radii), 75)
+                self.assertTrue(np.all(np.diff(radii) == -2 * speed))
+                self.assertTrue(np.all((radii >= 0) & (radii <= SandWaveGroup.MAX_RADIUS)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from cyber_life.service.game_loop import GAME_LOOP
+from cyber_life.service.power_mode import PowerMode
+
+
+def new_power_mode() -> PowerMode:
+    # 绕过单例，每个测试用一个新的对象
+    power_mode = object.__new__(PowerMode)
+    power_mode.__init__()
+    return power_mode
+
+
+@patch('cyber_life.service.power_mode.SYSTEM_INFO_MANAGER')
+@patch('cyber_life.service.power_mode.time')
+class TestPowerMode(TestCase):
+    def test_switch(self, mock_time, manager):
+        mock_time.monotonic.return_value = 0.0
+        mock_time.process_time.return_value = 0.0
+        power_mode = new_power_mode()
+        self.assertEqual(power_mode.interval, GAME_LOOP.render_interval)
+
+        power_mode.set_visible(False)
+        self.assertEqual(power_mode.interval, PowerMode.HIDDEN_INTERVAL)
+        manager.set_interval_scale.assert_called_with(PowerMode.HIDDEN_INSPECTION_SCALE)
+
+        power_mode.set_visible(True)
+        manager.set_interval_scale.assert_called_with(1)
+        # 重复设置同样的状态不做任何事
+        power_mode.set_visible(True)
+        self.assertEqual(manager.set_interval_scale.call_count, 2)
+
+    def test_catch_up_ticks(self, mock_time, manager):
+        mock_time.monotonic.return_value = 0.0
+        mock_time.process_time.return_value = 0.0
+        power_mode = new_power_mode()
+        power_mode.set_visible(False)
+
+        mock_time.monotonic.return_value = 0.255
+        self.assertEqual(power_mode.catch_up_ticks(), 25)
+        # 不足一帧的时间留到下一次
+        mock_time.monotonic.return_value = 0.5
+        self.assertEqual(power_mode.catch_up_ticks(), 25)
+        # 太久没有刷新，最多补 MAX_CATCH_UP_TICKS 帧
+        mock_time.monotonic.return_value = 100.0
+        self.assertEqual(power_mode.catch_up_ticks(), PowerMode.MAX_CATCH_UP_TICKS)
+        mock_time.monotonic.return_value = 100.01
+        self.assertEqual(power_mode.catch_up_ticks(), 1)
+
+    def test_missed_ticks(self, mock_time, manager):
+        mock_time.monotonic.return_value = 0.0
+        mock_time.process_time.return_value = 0.0
+        mock_time.time.return_value = 1000.0
+        power_mode = new_power_mode()
+        # 第一次刷新之前的时间（比如启动）不算
+        self.assertEqual(power_mode.missed_ticks(), 0)
+        mock_time.time.return_value = 1000.5
+        self.assertEqual(power_mode.missed_ticks(), 0)
+        # 睡眠了一个小时
+        mock_time.time.return_value = 4600.5
+        mock_time.monotonic.return_value = 3600.0
+        self.assertEqual(power_mode.missed_ticks(), 360000)
+        self.assertEqual(power_mode.missed_ticks(), 0)
+
+        # 不可见时补不过来的帧也交给快进，快进过的时间不重复补
+        power_mode.set_visible(False)
+        mock_time.monotonic.return_value = 3610.0
+        self.assertEqual(power_mode.catch_up_ticks(), PowerMode.MAX_CATCH_UP_TICKS)
+        self.assertEqual(power_mode.missed_ticks(), 1000 - PowerMode.MAX_CATCH_UP_TICKS)
+
+    def test_cpu_time_saved(self, mock_time, manager):
+        mock_time.monotonic.return_value = 0.0
+        mock_time.process_time.return_value = 0.0
+        power_mode = new_power_mode()
+
+        # 可见 10 秒用了 2 秒 CPU
+        mock_time.monotonic.return_value = 10.0
+        mock_time.process_time.return_value = 2.0
+        power_mode.set_visible(False)
+
+        # 不可见 10 秒只用了 0.5 秒 CPU
+        mock_time.monotonic.return_value = 20.0
+        mock_time.process_time.return_value = 2.5
+        self.assertAlmostEqual(power_mode.cpu_time_saved, 1.5)
+        power_mode.set_visible(True)
+        self.assertAlmostEqual(power_mode.cpu_time_saved, 1.5)
+
+        mock_time.monotonic.return_value = 30.0
+        mock_time.process_time.return_value = 4.5
+        self.assertAlmostEqual(power_mode.cpu_time_saved, 1.5)
+
+
+if __name__ == '__main__':
+    main()
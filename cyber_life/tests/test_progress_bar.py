@@ -0,0 +1,62 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from cyber_life.tools.progress_bar import ProgressFloat, ProgressFloatArray
+
+
+class TestProgressFloat(TestCase):
+    def test_in_place(self):
+        oxygen = ProgressFloat(1000, 1000)
+        same = oxygen
+        oxygen -= 0.1
+        oxygen += 0.05
+        self.assertIs(oxygen, same)
+        self.assertAlmostEqual(oxygen.current_value, 999.95)
+
+    def test_clamp(self):
+        energy = ProgressFloat(10, 100)
+        energy += 200
+        self.assertTrue(energy.is_max())
+        energy -= 300
+        self.assertTrue(energy.is_zero())
+        energy += -5
+        self.assertEqual(energy, 0)
+        energy -= -500
+        self.assertEqual(energy, 100)
+
+    def test_same_as_new_object(self):
+        # += 原地修改的结果要和原来返回新对象的结果一致
+        a = ProgressFloat(500, 1000)
+        b = ProgressFloat(500, 1000)
+        for amount in (0.1, -3, 700, -2000, 12.5):
+            a += amount
+            b = b + amount
+            self.assertEqual(a.current_value, b.current_value)
+        self.assertEqual(str(a), str(b))
+
+    def test_compare_and_str(self):
+        energy = ProgressFloat(12.34, 100)
+        self.assertTrue(energy < 13 and energy > 12 and energy <= 12.34 and energy >= 12.34 and energy != 1)
+        self.assertEqual(str(energy), '12.3/100')
+        self.assertEqual(round(energy, 1), 12.3)
+        with self.assertRaises(AttributeError):
+            energy.other = 1
+
+
+class TestProgressFloatArray(TestCase):
+    def test_in_place(self):
+        energy = ProgressFloatArray(np.array([0.0, 50.0, 120.0]), 100)
+        values = energy.current_values
+        self.assertEqual(values.tolist(), [0.0, 50.0, 100.0])
+
+        energy -= np.array([10.0, 10.0, 10.0])
+        energy += 5
+        self.assertIs(energy.current_values, values)
+        self.assertEqual(values.tolist(), [5.0, 45.0, 95.0])
+        self.assertEqual(energy.rate.tolist(), [0.05, 0.45, 0.95])
+        self.assertEqual(str(energy[1]), str(ProgressFloat(45.0, 100)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from cyber_life.tools.compute import RangeDivider
+
+
+class TestRangeDivider(TestCase):
+    def setUp(self):
+        self.divider = RangeDivider((5, 7, 10, 16, 18, 19, 22), tuple('abcdefgh'), lut_range=(0, 23))
+
+    def test_modes_agree(self):
+        values = list(range(-3, 30)) + [4.9, 5.0, 21.99, 22.0, float('inf')]
+        for value in values:
+            expected = self.divider.get_tag(value, mode='iter')
+            self.assertEqual(self.divider[value], expected, value)
+            self.assertEqual(self.divider.get_tag(value, mode='bisect'), expected, value)
+            self.assertEqual(self.divider.get_tag(value, mode='binary'), expected, value)
+        self.assertEqual(self.divider.get_tags(np.array(values)).tolist(), [self.divider[v] for v in values])
+
+    def test_disk_io_period(self):
+        # 磁盘读写速度从每 0.5 秒的 KB 数改成 KB/s 之后，同样的读写速度震荡波的密度不变
+        from cyber_life.life.sand_wave_flow import SandWaveFlow
+
+        flow = SandWaveFlow(0, 1)
+        for kb_per_window in [0, 1, 2, 3, 7, 8, 100, 4095, 4096, 1 << 20, 1 << 40]:
+            flow.set_frequency_by_disk_io(kb_per_window * 2)
+            self.assertEqual(flow.period, SandWaveFlow.DISKIO_FREQ_RD[kb_per_window.bit_length() - 1], kb_per_window)
+
+    def test_lut(self):
+        self.assertEqual([self.divider.get_tag(hour, mode='lut') for hour in range(24)],
+                         [self.divider.get_tag(hour, mode='bisect') for hour in range(24)])
+        with self.assertRaises(KeyError):
+            self.divider.get_tag(24, mode='lut')
+        with self.assertRaises(KeyError):
+            self.divider.get_tag(6.0, mode='lut')
+        with self.assertRaises(KeyError):
+            RangeDivider((1,), ('a', 'b')).get_tag(0, mode='lut')
+
+    def test_tuple_tags(self):
+        divider = RangeDivider((1, 100), ((0, 0.01), (2, 0.01), (4, 0.05)))
+        tags = divider.get_tags(np.array([[0, 50], [100, 1e9]]))
+        self.assertEqual(tags.shape, (2, 2))
+        self.assertEqual(tags.tolist(), [[(0, 0.01), (2, 0.01)], [(4, 0.05), (4, 0.05)]])
+
+
+if __name__ == '__main__':
+    main()
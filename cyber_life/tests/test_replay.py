@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import tempfile
+from random import Random
+from unittest import TestCase, main
+
+from cyber_life.service.rng import RandomService
+
+# 仓库根目录，子进程在这里运行才能导入 cyber_life
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 在新的进程里运行，每次都是全新的鱼缸
+_RECORD_SCRIPT = '''
+import sys
+import numpy as np
+from cyber_life import static
+static.TANK_SCREEN_WIDTH, static.TANK_SCREEN_HEIGHT = 300, 169
+from cyber_life.service.rng import RNG
+RNG.seed(42)
+from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
+from cyber_life.service.replay import InputRecorder
+from cyber_life.life.fast_forward import FAST_FORWARD
+from cyber_life.life.life_manager import LifeManager
+from cyber_life.sim import state_digest
+
+recorder = InputRecorder(sys.argv[1], RNG.master_seed, 300, 169)
+life_manager = LifeManager()
+life_manager.input_hook = recorder
+cpu = SYSTEM_INFO_MANAGER.inspectors['INSPECTOR_CPU']
+network = SYSTEM_INFO_MANAGER.inspectors['INSPECTOR_NETWORK']
+for i in range(3000):
+    if i % 100 == 0:
+        # 模拟后台线程更新检测结果，网速是原地修改的
+        cpu.performance_percent_per_core = np.linspace(0, 1, len(cpu.performance_percent_per_core)) * (i % 700) / 700
+        network.network_speeds.sent_speed = i * 10
+    if i % 500 == 250:
+        life_manager.add_food(30 + i % 200)
+    if i in (1200, 1201, 2600):
+        # 模拟电脑睡眠、界面卡住之后的快进，快进的帧数由真实时间决定，水草长节点用了随机数
+        FAST_FORWARD.advance(life_manager, 20000 + i)
+    life_manager.tick()
+recorder.close()
+print(state_digest())
+'''
+
+
+def run_python(*args: str) -> str:
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    result = subprocess.run([sys.executable, *args], cwd=_ROOT_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return result.stdout + result.stderr
+
+
+class TestRandomService(TestCase):
+    def test_streams(self):
+        rng = object.__new__(RandomService)
+        rng.__init__()
+        rng.seed(1)
+        ball = rng.stream('ball')
+        self.assertIs(rng.stream('ball'), ball)
+        first = [ball.random() for _ in range(5)]
+
+        # 其它流用了多少随机数，不影响这个流
+        rng.seed(1)
+        [rng.stream('plant').random() for _ in range(100)]
+        self.assertEqual([ball.random() for _ in range(5)], first)
+        # 和默认的 Random 不同，流之间也不同
+        self.assertNotEqual(first, [Random(1).random() for _ in range(5)])
+        self.assertNotEqual(rng.stream('plant').random(), rng.stream('ball').random())
+
+
+class TestReplay(TestCase):
+    def test_same_seed_same_result(self):
+        digests = [run_python('-m', 'cyber_life.sim', '--ticks', '2000', '--seed', seed).splitlines()[-1][-16:]
+                   for seed in ('5', '5', '6')]
+        self.assertEqual(digests[0], digests[1])
+        self.assertNotEqual(digests[0], digests[2])
+
+    def test_record_and_replay(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            record_file = os.path.join(tmp, 'run.rec')
+            recorded = run_python('-c', _RECORD_SCRIPT, record_file).splitlines()[-1]
+            replayed = run_python('-m', 'cyber_life.sim', '--ticks', '3000', '--replay', record_file)
+            self.assertEqual(replayed.splitlines()[-1][-16:], recorded)
+
+
+if __name__ == '__main__':
+    main()
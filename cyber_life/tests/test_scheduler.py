@@ -0,0 +1,94 @@
+import time
+from threading import current_thread
+from unittest import TestCase, main
+
+from cyber_life.computer_info.inspector_abc import Inspector
+from cyber_life.computer_info.scheduler import InspectionScheduler
+
+
+class CountInspector(Inspector):
+    INSPECTION_INTERVAL = 0.05
+
+    def __init__(self, cost: float = 0.0):
+        self.cost = cost
+        self.count = 0
+        self.thread_names = set()
+
+    def inspect(self):
+        self.count += 1
+        self.thread_names.add(current_thread().name)
+        time.sleep(self.cost)
+
+    def get_current_result(self):
+        return self.count
+
+
+class SlowInspector(CountInspector):
+    IS_SLOW = True
+
+
+class BrokenInspector(CountInspector):
+    def inspect(self):
+        super().inspect()
+        raise OSError('无法检测')
+
+
+class TestInspectionScheduler(TestCase):
+    def run_scheduler(self, *inspectors: Inspector, seconds: float = 0.3) -> InspectionScheduler:
+        scheduler = InspectionScheduler()
+        for inspector in inspectors:
+            scheduler.add(inspector)
+        scheduler.start()
+        time.sleep(seconds)
+        scheduler.stop()
+        return scheduler
+
+    def test_interval(self):
+        inspector = CountInspector()
+        scheduler = self.run_scheduler(inspector)
+        # 0.3 秒，间隔 0.05 秒，第一次立即检测
+        self.assertTrue(4 <= inspector.count <= 8, inspector.count)
+        self.assertEqual(inspector.thread_names, {'inspection-scheduler'})
+        self.assertEqual(scheduler.stats['CountInspector'].count, inspector.count)
+
+    def test_overrun(self):
+        inspector = CountInspector(cost=0.12)
+        scheduler = self.run_scheduler(inspector)
+        stats = scheduler.stats['CountInspector']
+        self.assertGreater(stats.overrun_count, 0)
+        self.assertGreaterEqual(stats.max_latency, 0.12)
+
+    def test_slow_inspector_in_pool(self):
+        slow = SlowInspector(cost=0.12)
+        fast = CountInspector()
+        scheduler = self.run_scheduler(slow, fast)
+        # 慢速检测不阻塞其它检测
+        self.assertGreaterEqual(fast.count, 4)
+        self.assertTrue(all(name.startswith('inspector') for name in slow.thread_names), slow.thread_names)
+        # 上一次还没结束的时候跳过
+        self.assertGreater(scheduler.stats['SlowInspector'].overrun_count, 0)
+
+    def test_interval_scale(self):
+        inspector = CountInspector()
+        scheduler = InspectionScheduler()
+        scheduler.add(inspector)
+        scheduler.set_interval_scale(10)
+        scheduler.start()
+        time.sleep(0.3)
+        # 间隔放大到 0.5 秒，只有启动时的一次
+        self.assertEqual(inspector.count, 1)
+
+        # 恢复时立即检测，之后按原来的间隔
+        scheduler.set_interval_scale(1)
+        time.sleep(0.3)
+        scheduler.stop()
+        self.assertTrue(5 <= inspector.count <= 9, inspector.count)
+
+    def test_exception(self):
+        inspector = BrokenInspector()
+        self.run_scheduler(inspector, seconds=0.2)
+        self.assertGreater(inspector.count, 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from cyber_life.life.fish.state_enum import State
+from cyber_life.life.life_manager import LifeManager
+from cyber_life.service import snapshot
+from cyber_life.service.snapshot import TankSnapshot
+
+# 仓库根目录，子进程在这里运行才能导入 cyber_life
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_sim(*args: str) -> str:
+    """
+    在新的进程里运行模拟，返回鱼缸状态摘要
+    """
+
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    result = subprocess.run([sys.executable, '-m', 'cyber_life.sim', *args], cwd=_ROOT_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return result.stderr.splitlines()[-1][-16:]
+
+
+def find_table(data: bytes, name: str) -> tuple[int, int]:
+    """
+    从快照的目录中找到表 name 的 (行数, 偏移)
+    """
+
+    count = snapshot._HEADER.unpack_from(data, 0)[2]
+    for i in range(count):
+        entry = snapshot._TABLE_ENTRY.unpack_from(data, snapshot._HEADER.size + snapshot._TABLE_ENTRY.size * i)
+        if entry[0].rstrip(b'\0').decode() == name:
+            return entry[2], entry[3]
+    raise KeyError(name)
+
+
+def corrupt(data: bytes, name: str, field: str, value) -> bytes:
+    """
+    把快照中表 name 第一行的 field 改成 value，文件头和目录保持不变
+    """
+
+    buffer = bytearray(data)
+    rows, offset = find_table(data, name)
+    table = np.frombuffer(buffer, dtype=snapshot.SECTIONS[name], count=rows, offset=offset)
+    table[field][0] = value
+    del table
+    return bytes(buffer)
+
+
+def eaten_flags(data: bytes) -> list[int]:
+    """
+    快照中每个食物是否已经被吃掉
+    """
+
+    rows, offset = find_table(data, 'food')
+    return np.frombuffer(data, dtype=snapshot.SECTIONS['food'], count=rows, offset=offset)['is_deleted'].tolist()
+
+
+def new_life_manager() -> LifeManager:
+    life_manager = object.__new__(LifeManager)
+    life_manager.__init__()
+    return life_manager
+
+
+class TestTankSnapshot(TestCase):
+    def setUp(self):
+        self.snapshot = object.__new__(TankSnapshot)
+        self.snapshot.__init__()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp.name, 'tank.snapshot')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        life_manager = new_life_manager()
+        for _ in range(3):
+            life_manager.plant.grow_node()
+        life_manager.add_food(100)
+        life_manager.add_food(200)
+        for _ in range(300):
+            life_manager.tick()
+        fish = life_manager.fish_list[0]
+        fish.state = State.FIND_FOOD
+        fish.target_food = life_manager.food_list[1]
+        fish.location_goal = fish.target_food.location
+        life_manager.add_food(50)
+        self.snapshot.save(life_manager, self.file_path)
+        self.assertFalse(os.path.exists(self.file_path + '.tmp'))
+
+        restored = new_life_manager()
+        self.assertTrue(self.snapshot.restore(restored, self.file_path))
+        self.assertEqual(restored.balls.location.tolist(), life_manager.balls.location.tolist())
+        self.assertEqual(restored.balls.energy.current_values.tolist(),
+                         life_manager.balls.energy.current_values.tolist())
+        self.assertEqual([(node.location.x, node.location.y, node.carbon) for node in restored.plant.nodes],
+                         [(node.location.x, node.location.y, node.carbon) for node in life_manager.plant.nodes])
+        # 节点重新连成链
+        self.assertEqual(len(restored.plant.nodes), 5)
+        self.assertTrue(all(a.next_node is b for a, b in zip(restored.plant.nodes, restored.plant.nodes[1:])))
+        self.assertEqual([(food.location.y, food.carbon) for food in restored.food_list],
+                         [(food.location.y, food.carbon) for food in life_manager.food_list])
+        self.assertEqual(len(restored.food_grid), 2)
+        self.assertEqual(list(restored._pending_food), [50])
+
+        restored_fish = restored.fish_list[0]
+        self.assertEqual(restored_fish.state, State.FIND_FOOD)
+        self.assertIs(restored_fish.target_food, restored.food_list[1])
+        self.assertIs(restored_fish.location_goal, restored_fish.target_food.location)
+        self.assertEqual(restored_fish.energy.current_value, fish.energy.current_value)
+
+    def test_eaten_food(self):
+        # 一条鱼这一帧刚吃掉的食物还在列表里，另一条鱼追的食物已经被吃掉、清理出了列表
+        life_manager = new_life_manager()
+        for x in (100, 200, 300):
+            life_manager.add_food(x)
+        life_manager.tick()
+        eaten, cleaned, live = life_manager.food_list
+        eaten.is_deleted = True
+        life_manager.food_list.remove(cleaned)
+        life_manager.food_grid.remove(cleaned)
+        cleaned.is_deleted = True
+        fish = life_manager.fish_list[0]
+        fish.target_food = cleaned
+        fish.location_goal = cleaned.location
+        self.snapshot.save(life_manager, self.file_path)
+
+        restored = new_life_manager()
+        self.assertTrue(self.snapshot.restore(restored, self.file_path))
+        self.assertEqual([(food.location.x, food.is_deleted) for food in restored.food_list],
+                         [(eaten.location.x, True), (live.location.x, False)])
+        self.assertEqual(len(restored.food_grid), 2)
+        restored_fish = restored.fish_list[0]
+        self.assertNotIn(restored_fish.target_food, restored.food_list)
+        self.assertTrue(restored_fish.target_food.is_deleted)
+        self.assertEqual(restored_fish.target_food.carbon, cleaned.carbon)
+        self.assertIs(restored_fish.location_goal, restored_fish.target_food.location)
+
+        # 不在食物列表里又没被吃掉的食物不存在
+        with open(self.file_path, 'rb') as file:
+            data = file.read()
+        with open(self.file_path, 'wb') as file:
+            file.write(corrupt(data, 'food', 'is_deleted', 0))
+        self.assertTrue(self.snapshot.restore(new_life_manager(), self.file_path))
+        with open(self.file_path, 'wb') as file:
+            file.write(corrupt(corrupt(data, 'food', 'is_listed', 0), 'food', 'is_deleted', 0))
+        self.assertFalse(self.snapshot.restore(new_life_manager(), self.file_path))
+
+    def test_rejects_broken_file(self):
+        life_manager = new_life_manager()
+        self.snapshot.save(life_manager, self.file_path)
+        with open(self.file_path, 'rb') as file:
+            data = file.read()
+
+        cases = {
+            'missing': None,
+            'not a snapshot': b'hello, fish' * 10,
+            'old version': data[:8] + struct.pack('<H', snapshot.VERSION - 1) + data[10:],
+            'truncated': data[:len(data) // 2],
+        }
+        for name, content in cases.items():
+            with self.subTest(name):
+                if os.path.exists(self.file_path):
+                    os.remove(self.file_path)
+                if content is not None:
+                    with open(self.file_path, 'wb') as file:
+                        file.write(content)
+                restored = new_life_manager()
+                nodes = restored.plant.nodes
+                self.assertFalse(self.snapshot.restore(restored, self.file_path))
+                self.assertIs(restored.plant.nodes, nodes)
+                # 不能恢复的文件改名，下次启动不会再读到
+                self.assertFalse(os.path.exists(self.file_path))
+                self.assertEqual(os.path.exists(self.file_path + snapshot.BROKEN_SUFFIX), content is not None)
+
+    def test_rejects_bad_values(self):
+        # 文件头和目录都对，表里的值不对，整个快照都不用，鱼缸保持原样
+        life_manager = new_life_manager()
+        self.snapshot.save(life_manager, self.file_path)
+        with open(self.file_path, 'rb') as file:
+            data = file.read()
+
+        cases = {
+            'fish state': ('fish', 'state', 200),
+            'target food': ('fish', 'target_food', 5),
+            'fish goal': ('fish', 'x_goal', np.inf),
+            'animation interval': ('fish', 'animation_interval', 0),
+            'ball location': ('ball', 'x', np.nan),
+            'wave period': ('sand_wave_flow', 'period', 0),
+            'rng position': ('rng', 'state', np.full(snapshot._RANDOM_STATE_SIZE, 1000)),
+        }
+        for name, (table, field, value) in cases.items():
+            with self.subTest(name):
+                with open(self.file_path, 'wb') as file:
+                    file.write(corrupt(data, table, field, value))
+                restored = new_life_manager()
+                nodes, fish_list = restored.plant.nodes, restored.fish_list
+                location = restored.balls.location.copy()
+                self.assertFalse(self.snapshot.restore(restored, self.file_path))
+                self.assertIs(restored.plant.nodes, nodes)
+                self.assertIs(restored.fish_list, fish_list)
+                self.assertEqual(restored.balls.location.tolist(), location.tolist())
+                self.assertTrue(os.path.exists(self.file_path + snapshot.BROKEN_SUFFIX))
+
+        # 没改过的快照还是能恢复
+        with open(self.file_path, 'wb') as file:
+            file.write(data)
+        self.assertTrue(self.snapshot.restore(new_life_manager(), self.file_path))
+
+    def test_continue_after_restore(self):
+        # 保存、恢复之后接着运行，和一直运行的结果逐位相同
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, 'tank.snapshot')
+            saved = run_sim('--ticks', '2000', '--seed', '3', '--snapshot', file_path)
+            self.assertEqual(run_sim('--ticks', '0', '--restore', file_path), saved)
+            self.assertEqual(run_sim('--ticks', '2000', '--restore', file_path),
+                             run_sim('--ticks', '4000', '--seed', '3'))
+
+    def test_continue_after_eating(self):
+        # 第 409 帧刚有一条鱼吃掉了食物，食物还没从列表中清理，恢复之后不能复活
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, 'tank.snapshot')
+            run_sim('--ticks', '409', '--seed', '7', '--feed-every', '37', '--snapshot', file_path)
+            with open(file_path, 'rb') as file:
+                data = file.read()
+            self.assertIn(1, eaten_flags(data))
+            self.assertEqual(run_sim('--ticks', '600', '--feed-every', '37', '--restore', file_path),
+                             run_sim('--ticks', '1009', '--seed', '7', '--feed-every', '37'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+from math import dist
+from random import Random
+from unittest import TestCase, main
+
+from cyber_life.tools.spatial_grid import SpatialGrid
+
+
+class TestSpatialGrid(TestCase):
+    def setUp(self):
+        self.rng = Random(1)
+        self.grid = SpatialGrid(20)
+        self.points = {}
+        for i in range(300):
+            self.points[i] = (self.rng.uniform(-50, 350), self.rng.uniform(-20, 200))
+            self.grid.insert(i, *self.points[i])
+
+    def brute_nearest(self, x, y, min_y, predicate=None):
+        candidates = [i for i, (_, py) in self.points.items()
+                      if py >= min_y and (predicate is None or predicate(i))]
+        return min(candidates, key=lambda i: dist(self.points[i], (x, y)), default=None)
+
+    def test_nearest(self):
+        for _ in range(200):
+            x, y = self.rng.uniform(-100, 400), self.rng.uniform(-50, 250)
+            min_y = self.rng.uniform(-20, 200)
+            self.assertEqual(self.grid.nearest(x, y), self.brute_nearest(x, y, -1e9))
+            self.assertEqual(self.grid.nearest(x, y, min_y), self.brute_nearest(x, y, min_y))
+
+    def test_nearest_with_predicate(self):
+        def is_even(i):
+            return i % 2 == 0
+
+        for _ in range(100):
+            x, y = self.rng.uniform(0, 300), self.rng.uniform(0, 180)
+            self.assertEqual(self.grid.nearest(x, y, 50, is_even), self.brute_nearest(x, y, 50, is_even))
+
+    def test_move_and_remove(self):
+        for i in range(0, 300, 3):
+            self.points[i] = (self.rng.uniform(0, 300), self.rng.uniform(0, 180))
+            self.grid.move(i, *self.points[i])
+        for i in range(1, 300, 3):
+            del self.points[i]
+            self.grid.remove(i)
+        self.assertEqual(len(self.grid), len(self.points))
+        for _ in range(100):
+            x, y = self.rng.uniform(0, 300), self.rng.uniform(0, 180)
+            self.assertEqual(self.grid.nearest(x, y), self.brute_nearest(x, y, -1e9))
+
+    def test_exists(self):
+        max_y = max(y for _, y in self.points.values())
+        self.assertTrue(self.grid.exists(max_y))
+        self.assertFalse(self.grid.exists(max_y + 0.001))
+        self.assertFalse(self.grid.exists(predicate=lambda i: i > 1000))
+
+    def test_empty(self):
+        grid = SpatialGrid(10)
+        self.assertIsNone(grid.nearest(0, 0))
+        self.assertFalse(grid.exists())
+        grid.insert('a', 1, 1)
+        grid.remove('a')
+        self.assertIsNone(grid.nearest(0, 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+from unittest import TestCase, main
+
+# 测试不需要显示窗口
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QFile, QIODevice, QDataStream
+from PyQt5.QtWidgets import QApplication
+
+# noinspection PyUnresolvedReferences
+from assets import assets
+from cyber_life.life.fish.sprite_atlas import FishSpriteAtlas
+
+
+def new_atlas() -> FishSpriteAtlas:
+    """
+    绕过单例，创建一个新的图集
+    """
+
+    atlas = object.__new__(FishSpriteAtlas)
+    atlas.__init__()
+    return atlas
+
+
+class TestFishSpriteAtlas(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_load(self):
+        atlas = new_atlas()
+        atlas.load()
+        self.assertTrue(atlas.is_loaded)
+        self.assertEqual(len(atlas.swim_left), FishSpriteAtlas.FRAME_COUNT)
+        self.assertEqual(len(atlas.surface_right), FishSpriteAtlas.FRAME_COUNT)
+        self.assertFalse(atlas.swim_left[0].isNull())
+        # 翻转后大小不变，旋转 45° 后变大
+        self.assertEqual(atlas.swim_right[3].size(), atlas.swim_left[3].size())
+        self.assertGreater(atlas.surface_left[3].width(), atlas.swim_left[3].width())
+        self.assertEqual(atlas.swim_right[0].toImage(), atlas.swim_left[0].toImage().mirrored(True, False))
+
+    def test_cache_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_file = os.path.join(directory, 'fish_atlas.cache')
+
+            built = new_atlas()
+            built.load(cache_file)
+            self.assertTrue(os.path.isfile(cache_file))
+
+            cached = new_atlas()
+            self.assertTrue(cached._load_cache(cache_file))
+            for built_group, cached_group in zip(built._groups(), cached._groups()):
+                self.assertEqual([p.toImage() for p in built_group], [p.toImage() for p in cached_group])
+
+    def test_broken_cache_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_file = os.path.join(directory, 'fish_atlas.cache')
+            with open(cache_file, 'wb') as f:
+                f.write(b'not an atlas')
+
+            atlas = new_atlas()
+            atlas.load(cache_file)
+            self.assertTrue(atlas.is_loaded)
+            self.assertFalse(atlas.die_right.isNull())
+            # 损坏的缓存被重新生成
+            self.assertTrue(new_atlas()._load_cache(cache_file))
+
+            # 截断在一张图的中间
+            with open(cache_file, 'rb') as f:
+                data = f.read()
+            with open(cache_file, 'wb') as f:
+                f.write(data[:len(data) // 2])
+            self.assertFalse(new_atlas()._load_cache(cache_file))
+
+    def test_huge_count(self):
+        # 文件头是对的，图片数量是一个很大的数，直接判断为损坏，不会一直读下去
+        with tempfile.TemporaryDirectory() as directory:
+            cache_file = os.path.join(directory, 'fish_atlas.cache')
+            file = QFile(cache_file)
+            file.open(QIODevice.WriteOnly)
+            stream = QDataStream(file)
+            stream.writeQString(FishSpriteAtlas.CACHE_MAGIC)
+            stream.writeInt32(FishSpriteAtlas.CACHE_VERSION)
+            stream.writeInt32(2 ** 31 - 1)
+            file.close()
+
+            atlas = new_atlas()
+            self.assertFalse(atlas._load_cache(cache_file))
+            self.assertEqual(atlas.swim_left, [])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 from colorsys import hsv_to_rgb, rgb_to_hsv
+from typing import Literal, Sequence
 
+import numpy as np
 from PyQt5.QtGui import QColor
 
 
@@ -28,3 +30,72 @@ def get_color_by_hsv_ratio(color_start: QColor, color_end: QColor, ratio: float)
         blue,
         round(alpha),
     )
+
+
+class ColorRamp:
+    """
+    预先算好的颜色渐变表
+    把几个颜色之间的渐变分成 steps 级，构造时把每一级的 QColor 都建好，
+    之后按比率取颜色只是算一个下标再查表，不再每帧插值、新建 QColor。
+    比率可以是一个数，也可以是 NumPy 数组，数组按元素查表。
+
+    颜色节点均匀分布在 0~1 上，mode='hsv' 时两个节点之间用 get_color_by_hsv_ratio 过渡。
+    返回的 QColor 是共用的，不要修改它们。
+
+    >>> ramp = ColorRamp((QColor(200, 0, 0), QColor(0, 200, 0)), steps=3)
+    >>> ramp.at(0.5).getRgb()
+    (100, 100, 0, 255)
+    >>> ramp.at(0.6) is ramp.at(0.5)
+    True
+    >>> ramp.indices(np.array([-1, 0.2, 0.8, 2])).tolist()
+    [0, 0, 2, 2]
+    """
+
+    __slots__ = ('steps', 'rgba', '_colors')
+
+    def __init__(self, colors: Sequence[QColor], steps: int = 256, mode: Literal['rgb', 'hsv'] = 'rgb'):
+        assert len(colors) >= 2 and steps >= 2
+
+        self.steps = steps
+        # 每一级在整条渐变上的位置，落在第 segment 段，段内比率是 rate
+        positions = np.linspace(0, len(colors) - 1, steps)
+        segments = np.minimum(positions.astype(np.int64), len(colors) - 2)
+        rates = positions - segments
+
+        if mode == 'rgb':
+            nodes = np.array([color.getRgb() for color in colors], dtype=np.float64)
+            rgba = nodes[segments] + (nodes[segments + 1] - nodes[segments]) * rates[:, np.newaxis]
+            self.rgba = np.round(rgba).astype(np.int32)
+        elif mode == 'hsv':
+            self.rgba = np.array([
+                get_color_by_hsv_ratio(colors[segment], colors[segment + 1], rate).getRgb()
+                for segment, rate in zip(segments.tolist(), rates.tolist())
+            ], dtype=np.int32)
+        else:
+            raise ValueError(f'不支持的模式：{mode}')
+
+        # 每一级的 QColor，shape 和 rgba 的第一维一致
+        self._colors = [QColor(*rgba) for rgba in self.rgba.tolist()]
+
+    def __len__(self) -> int:
+        return self.steps
+
+    def __getitem__(self, index: int) -> QColor:
+        return self._colors[index]
+
+    def index(self, ratio: float) -> int:
+        """
+        比率 0~1 对应的级数，超出范围的取两端
+        """
+
+        return min(self.steps - 1, max(0, round(ratio * (self.steps - 1))))
+
+    def indices(self, ratios: np.ndarray) -> np.ndarray:
+        """
+        一组比率对应的级数，和 index 一致
+        """
+
+        return np.clip(np.round(ratios * (self.steps - 1)), 0, self.steps - 1).astype(np.intp)
+
+    def at(self, ratio: float) -> QColor:
+        return self._colors[self.index(ratio)]
@@ -1,6 +1,8 @@
+from bisect import bisect_right
 from numbers import Real
 from typing import Literal
 
+import numpy as np
 from PyQt5.QtGui import QColor
 
 _SUPPORTED_NUMBER_TYPES = (int, float, complex)
@@ -51,7 +53,10 @@ class RangeDivider:
 
     每个区间左闭右开，区间数目 = 标签数目 + 1
 
-    支持遍历查找和二分查找
+    默认用 bisect 二分查找，也支持遍历查找。
+    值是小范围内的整数时（比如小时 0~23、bit_length 0~64），可以传入 lut_range 预先建一张查找表，
+    之后范围内的整数直接按下标取标签，范围外的值仍然二分查找。
+    get_tags 用 searchsorted 一次查一个 NumPy 数组。
 
     >>> RangeDivider([100, 200, 300, 400], ['a', 'b', 'c', 'd', 'e'])[360]
     'd'
@@ -60,22 +65,28 @@ class RangeDivider:
     >>> RangeDivider([100, 200, 300, 400], ['a', 'b', 'c', 'd', 'e'])[400]
     'e'
 
-    >>> RangeDivider([100, 200, 300, 400], ['a', 'b', 'c', 'd', 'e']).get_tag(360, mode='binary')
+    >>> RangeDivider([100, 200, 300, 400], ['a', 'b', 'c', 'd', 'e']).get_tag(360, mode='iter')
     'd'
-    >>> RangeDivider([100, 200, 300, 400], ['a', 'b', 'c', 'd', 'e']).get_tag(100, mode='binary')
+    >>> RangeDivider([100, 200, 300, 400], ['a', 'b', 'c', 'd', 'e']).get_tag(100, mode='iter')
     'b'
-    >>> RangeDivider([100, 200, 300, 400], ['a', 'b', 'c', 'd', 'e']).get_tag(400, mode='binary')
+    >>> RangeDivider([100, 200, 300, 400], ['a', 'b', 'c', 'd', 'e']).get_tag(400, mode='iter')
     'e'
+
+    >>> RangeDivider([5, 7, 10], ['a', 'b', 'c', 'd'], lut_range=(0, 23)).get_tag(6, mode='lut')
+    'b'
+    >>> RangeDivider([100, 200, 300, 400], ['a', 'b', 'c', 'd', 'e']).get_tags(np.array([0, 100, 250, 999])).tolist()
+    ['a', 'b', 'c', 'e']
     """
 
-    __slots__ = ('_divisions', '_tags')
+    __slots__ = ('_divisions', '_tags', '_tag_array', '_lut', '_lut_low')
 
-    def __init__(self, divisions: list | tuple, tags: list | tuple):
+    def __init__(self, divisions: list | tuple, tags: list | tuple, lut_range: tuple[int, int] | None = None):
         """
         会对传入的 divisions 去重并排序
 
         :param divisions: 范围分割点
         :param tags: 标签
+        :param lut_range: 建查找表的整数范围，两端都包含，为 None 时不建
         """
 
         assert isinstance(divisions, (list, tuple)) and isinstance(tags, (list, tuple))
@@ -86,46 +97,77 @@ class RangeDivider:
 
         assert 0 < len(self._divisions) == len(self._tags) - 1
 
-    def get_tag(self, value: Real, mode: Literal['iter', 'binary'] = 'iter'):
+        # get_tags 用的标签数组，标签可能是元组，逐个放进去，避免被 NumPy 展开成二维
+        self._tag_array = np.empty(len(self._tags), dtype=object)
+        for i, tag in enumerate(self._tags):
+            self._tag_array[i] = tag
+
+        # 查找表，第 i 个元素是 lut_range[0] + i 的标签
+        self._lut: list | None = None
+        self._lut_low = 0
+        if lut_range is not None:
+            low, high = lut_range
+            assert isinstance(low, int) and isinstance(high, int) and low <= high
+            self._lut_low = low
+            self._lut = [self._tags[bisect_right(self._divisions, value)] for value in range(low, high + 1)]
+
+    def get_tag(self, value: Real, mode: Literal['auto', 'bisect', 'binary', 'iter', 'lut'] = 'auto'):
         """
-        获取某个位置的标签，支持遍历查找和二分查找。
-        默认遍历查找，因为在数据量很小的时候，二分查找体现不出优势。
+        获取某个位置的标签
 
         :param value: 值
-        :param mode: 遍历查找或二分查找，默认为 'iter'
+        :param mode: 查找方式，默认为 'auto'：有查找表且值是表范围内的整数时查表，否则二分查找；
+                     'lut' 只查表，值不在表里时报错；'binary' 是 'bisect' 原来的名字
 
         :return: 标签
         """
 
         assert isinstance(value, Real)
 
+        if mode == 'auto' or mode == 'lut':
+            if self._lut is not None and isinstance(value, int):
+                index = value - self._lut_low
+                if 0 <= index < len(self._lut):
+                    return self._lut[index]
+            if mode == 'lut':
+                raise KeyError(f'查找表中没有这个值：{value}')
+            return self._tags[bisect_right(self._divisions, value)]
+
+        # 二分查找
+        elif mode == 'bisect' or mode == 'binary':
+            return self._tags[bisect_right(self._divisions, value)]
+
         # 遍历查找
-        if mode == 'iter':
+        elif mode == 'iter':
             for i, division in enumerate(self._divisions):
                 if value < division:
                     return self._tags[i]
             return self._tags[-1]
 
-        # 二分查找
-        elif mode == 'binary':
-            # 边界情况
-            if value < self._divisions[0]:
-                return self._tags[0]
-            elif value >= self._divisions[-1]:
-                return self._tags[-1]
-            #
-            left, right = 0, len(self._divisions) - 1  # 左闭右开
-            while right - left > 1:
-                mid = (left + right) >> 1
-                if value < self._divisions[mid]:
-                    right = mid
-                else:
-                    left = mid
-            return self._tags[right]
-
         # 啥也不是
         else:
             raise ValueError(f'不支持的模式：{mode}')
 
-    __getitem__ = get_tag  # 别名
-    __call__ = get_tag  # 别名
+    def get_tags(self, values: np.ndarray) -> np.ndarray:
+        """
+        一次获取一组值的标签，和逐个 get_tag 的结果一致
+
+        :param values: 值的数组
+        :return: 标签的数组，dtype 是 object，shape 和 values 一致
+        """
+
+        return self._tag_array[np.searchsorted(self._divisions, values, side='right')]
+
+    def __getitem__(self, value: Real):
+        """
+        和 get_tag(value) 一致，每帧都在调用，省掉参数检查和模式分派
+        """
+
+        lut = self._lut
+        if lut is not None and value.__class__ is int:
+            index = value - self._lut_low
+            if 0 <= index < len(lut):
+                return lut[index]
+        return self._tags[bisect_right(self._divisions, value)]
+
+    __call__ = __getitem__  # 别名
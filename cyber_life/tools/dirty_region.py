@@ -0,0 +1,172 @@
+"""
+脏区域
+每帧都让整个窗口重绘、合成，即使只有一个气泡动了一下。
+改为每帧由实体报告自己这一帧画在哪里（外接矩形），和上一帧报告的矩形合起来就是需要重绘的区域：
+上一帧的位置要擦掉，这一帧的位置要画上。上一帧报告过、这一帧没有报告的实体（比如被吃掉的食物）也要擦掉。
+
+逐个合并 QRegion 很慢，所以先把矩形标记到 TILE_SIZE 大小的格子上，再把连续的格子合成矩形，
+合成的矩形数只和格子数有关，和报告的矩形数无关。
+
+窗口只重绘这个区域，Qt 会把 QPainter 裁剪到这个区域，其余部分保留上一帧的内容。
+区域面积超过窗口的一定比例时，裁剪省不了多少，直接整个窗口重绘。
+实体报告的是这一帧所有会变化的地方，画的内容不变的静态图层（比如沙子）不需要报告，
+静态图层本身变化时调用 invalidate，下一帧整个窗口重绘。
+"""
+from itertools import groupby
+from math import floor, ceil
+from typing import Sequence
+
+import numpy as np
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QRegion
+
+
+class DirtyRegion:
+    """
+    收集这一帧所有实体的外接矩形，每帧调用一次 take 得到需要重绘的区域
+
+    >>> dirty = DirtyRegion(64, 64)
+    >>> dirty.take() is None  # 第一帧整个重绘
+    True
+    >>> dirty.add_rect(10, 10, 4, 4)
+    >>> dirty.take().rects()
+    [PyQt5.QtCore.QRect(8, 8, 8, 8)]
+    """
+
+    # 格子边长，px
+    TILE_SIZE = 8
+    # 需要重绘的面积超过窗口面积的这个比例时，整个窗口重绘
+    FULL_REPAINT_COVERAGE = 0.5
+    # 矩形向外扩展的像素，抗锯齿、取整都可能画到外接矩形外面一点
+    MARGIN = 1
+
+    __slots__ = ('width', 'height', '_previous', '_current', '_is_full',
+                 'frame_count', 'full_count', 'area_rate_total')
+
+    def __init__(self, width: int, height: int):
+        """
+        :param width: 窗口宽度，px
+        :param height: 窗口高度，px
+        """
+
+        self.width = width
+        self.height = height
+        # 上一帧、这一帧报告的矩形，每个元素是 left, top, right, bottom
+        self._previous: list[Sequence[float]] = []
+        self._current: list[Sequence[float]] = []
+        # 下一次 take 是否整个窗口重绘，第一帧还没有上一帧的矩形，必须整个重绘
+        self._is_full = True
+        # 统计：take 的次数、其中整个窗口重绘的次数、每次重绘面积占窗口比例之和
+        self.frame_count = 0
+        self.full_count = 0
+        self.area_rate_total = 0.0
+
+    def resize(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        下一帧整个窗口重绘，用于静态图层变化、窗口重新显示等情况
+        """
+
+        self._is_full = True
+
+    def add_rect(self, left: float, top: float, width: float, height: float, margin: float = 0):
+        """
+        报告一个外接矩形
+
+        :param margin: 额外向外扩展的像素，比如线宽的一半
+        """
+
+        margin += self.MARGIN
+        self._current.append((left - margin, top - margin, left + width + margin, top + height + margin))
+
+    def add_rects(self, rects: np.ndarray, margin: float = 0):
+        """
+        报告一批外接矩形
+
+        :param rects: shape = (n, 4)，每行是 left, top, width, height
+        :param margin: 额外向外扩展的像素
+        """
+
+        margin += self.MARGIN
+        edges = np.empty((len(rects), 4))
+        edges[:, :2] = rects[:, :2] - margin
+        edges[:, 2:] = rects[:, :2] + rects[:, 2:] + margin
+        self._current.extend(edges.tolist())
+
+    def _tiles(self, edges: list) -> list[int]:
+        """
+        被矩形覆盖的格子，每行一个整数，第 i 位是 1 表示这一行第 i 个格子被覆盖
+        矩形一般只有十几个，用整数的位运算比 NumPy 数组快
+        """
+
+        size = self.TILE_SIZE
+        rows = -(-self.height // size)
+        cols = -(-self.width // size)
+        masks = [0] * rows
+        for left, top, right, bottom in edges:
+            # 裁剪到窗口内，完全在窗口外面的矩形宽或高不是正数
+            left = max(0, floor(left / size))
+            top = max(0, floor(top / size))
+            right = min(cols, ceil(right / size))
+            bottom = min(rows, ceil(bottom / size))
+            if left >= right:
+                continue
+            mask = ((1 << (right - left)) - 1) << left
+            for row in range(top, bottom):
+                masks[row] |= mask
+        return masks
+
+    def _region(self, masks: list[int]) -> QRegion:
+        """
+        连续几行覆盖的格子相同时合成一条，每条里连续的格子合成一个矩形，
+        这些矩形按行排好、互不重叠、同一条的高度相同、左右不相接，可以直接 setRects
+        """
+
+        size = self.TILE_SIZE
+        rects = []
+        row = 0
+        for mask, rows in groupby(masks):
+            top = row * size
+            row += len(list(rows))
+            height = min(row * size, self.height) - top
+            col = 0
+            while mask:
+                # 跳过末尾的 0，再数末尾连续的 1
+                skip = (mask & -mask).bit_length() - 1
+                mask >>= skip
+                col += skip
+                run = (~mask & (mask + 1)).bit_length() - 1
+                left = col * size
+                rects.append(QRect(left, top, min((col + run) * size, self.width) - left, height))
+                mask >>= run
+                col += run
+        region = QRegion()
+        region.setRects(rects)
+        return region
+
+    def take(self) -> QRegion | None:
+        """
+        这一帧需要重绘的区域，返回 None 表示整个窗口重绘
+        之后这一帧的矩形变为上一帧的矩形
+        """
+
+        edges = self._previous + self._current
+        self._previous, self._current = self._current, []
+        self.frame_count += 1
+
+        if not self._is_full:
+            masks = self._tiles(edges)
+            tile_count = len(masks) * -(-self.width // self.TILE_SIZE)
+            area_rate = sum(mask.bit_count() for mask in masks) / tile_count
+            if area_rate <= self.FULL_REPAINT_COVERAGE:
+                self.area_rate_total += area_rate
+                return self._region(masks)
+
+        self._is_full = False
+        self.full_count += 1
+        self.area_rate_total += 1
+        return None
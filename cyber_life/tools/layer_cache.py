@@ -0,0 +1,73 @@
+"""
+图层缓存
+把很少变化的画面预先画到一张 QPixmap 上，之后每一帧只需要贴一次图
+"""
+from typing import Callable, Hashable
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainter, QPixmap
+
+
+class CachedLayer:
+    """
+    缓存的图层，只有 key 变化时才重新绘制
+
+    key 应该是绘制这个图层需要的全部输入（先量化成整数或者分档），绘制函数会以 render(painter, *key) 的形式调用，
+    这样 key 相同画出来的东西一定相同
+    """
+
+    __slots__ = ('_render', '_key', '_pixmap', 'hit_count', 'miss_count')
+
+    def __init__(self, render: Callable[..., None]):
+        """
+        :param render: 绘制函数，第一个参数是画在缓存图上的 QPainter，后面是 key 中的各项
+        """
+
+        self._render = render
+        self._key = None
+        self._pixmap: QPixmap | None = None
+        # 命中和重新绘制的次数，用于观察缓存效果
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def draw(self, painter: QPainter, width: int, height: int, key: tuple[Hashable, ...]):
+        """
+        把图层画到 painter 的左上角
+
+        :param painter: 目标画笔
+        :param width: 图层宽度，逻辑像素
+        :param height: 图层高度，逻辑像素
+        :param key: 绘制这个图层需要的输入
+        """
+
+        # 高分屏上缓存图要按照实际像素绘制，否则会模糊
+        ratio = painter.device().devicePixelRatioF()
+        full_key = (width, height, ratio, key)
+        if full_key != self._key:
+            self._pixmap = self._paint_pixmap(width, height, ratio, key)
+            self._key = full_key
+            self.miss_count += 1
+        else:
+            self.hit_count += 1
+
+        painter.drawPixmap(0, 0, self._pixmap)
+
+    def _paint_pixmap(self, width: int, height: int, ratio: float, key: tuple) -> QPixmap:
+        pixmap = QPixmap(round(width * ratio), round(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        pixmap_painter = QPainter(pixmap)
+        try:
+            self._render(pixmap_painter, *key)
+        finally:
+            pixmap_painter.end()
+        return pixmap
+
+    def clear(self):
+        """
+        丢弃缓存，下一次 draw 时一定重新绘制
+        """
+
+        self._key = None
+        self._pixmap = None
@@ -0,0 +1,102 @@
+"""
+批量绘制
+每个实体自己 setPen、setBrush 再画，Python 调用 Qt 的次数和切换画笔的次数都和实体数量成正比。
+改为实体把图元（线段、椭圆）按材质交给 PaintBatch，flush 时每种材质只切换一次画笔、画刷，
+同一材质的线段用一次 drawLines 提交，椭圆连续画完。
+
+材质按这一帧第一次出现的顺序绘制，同一材质内按加入的顺序绘制，
+所以不同材质之间的遮挡关系是材质的顺序，而不是实体的顺序。
+坐标在 flush 时一次取整，和原来逐个 round 之后再画的结果相同。
+"""
+from itertools import starmap
+from typing import Hashable
+
+import numpy as np
+from PyQt5.QtCore import QLine, Qt
+from PyQt5.QtGui import QPainter, QPen, QBrush
+
+
+class _Material:
+    """
+    一种材质和这一帧用这种材质画的图元
+    图元可以是 NumPy 数组（一批），也可以是单独的一行（一个实体），flush 时合并
+    """
+
+    __slots__ = ('pen', 'brush', 'line_arrays', 'line_rows', 'ellipse_arrays', 'ellipse_rows')
+
+    def __init__(self, pen: QPen, brush: QBrush | Qt.BrushStyle):
+        self.pen = pen
+        self.brush = brush
+        self.line_arrays: list[np.ndarray] = []
+        self.line_rows: list[tuple[float, float, float, float]] = []
+        self.ellipse_arrays: list[np.ndarray] = []
+        self.ellipse_rows: list[tuple[float, float, float, float]] = []
+
+
+def _merge(arrays: list[np.ndarray], rows: list[tuple[float, float, float, float]]) -> list[list[int]]:
+    if rows:
+        arrays = arrays + [np.array(rows, dtype=np.float64)]
+    return np.round(np.concatenate(arrays)).astype(np.int32).tolist()
+
+
+class PaintBatch:
+    """
+    按材质收集图元，一帧画完之后调用 flush
+    材质用一个可哈希的 key 区分，同一帧里同一个 key 以第一次给出的画笔、画刷为准
+    """
+
+    __slots__ = ('_materials', 'draw_calls', 'state_changes')
+
+    def __init__(self):
+        self._materials: dict[Hashable, _Material] = {}
+        # 上一次 flush 调用 Qt 绘制函数的次数、切换材质的次数，用于观察批量的效果
+        self.draw_calls = 0
+        self.state_changes = 0
+
+    def _material(self, key: Hashable, pen: QPen, brush: QBrush | Qt.BrushStyle) -> _Material:
+        material = self._materials.get(key)
+        if material is None:
+            material = self._materials[key] = _Material(pen, brush)
+        return material
+
+    def add_lines(self, key: Hashable, pen: QPen, lines: np.ndarray):
+        """
+        :param lines: shape = (n, 4)，每行是 x1, y1, x2, y2
+        """
+
+        self._material(key, pen, Qt.NoBrush).line_arrays.append(lines)
+
+    def add_line(self, key: Hashable, pen: QPen, x1: float, y1: float, x2: float, y2: float):
+        self._material(key, pen, Qt.NoBrush).line_rows.append((x1, y1, x2, y2))
+
+    def add_ellipses(self, key: Hashable, pen: QPen, brush: QBrush | Qt.BrushStyle, rects: np.ndarray):
+        """
+        :param rects: shape = (n, 4)，每行是外接矩形的 left, top, width, height
+        """
+
+        self._material(key, pen, brush).ellipse_arrays.append(rects)
+
+    def add_ellipse(self, key: Hashable, pen: QPen, brush: QBrush | Qt.BrushStyle,
+                    left: float, top: float, width: float, height: float):
+        self._material(key, pen, brush).ellipse_rows.append((left, top, width, height))
+
+    def flush(self, painter: QPainter):
+        """
+        把收集到的图元画出来，并清空
+        """
+
+        draw_calls = 0
+        for material in self._materials.values():
+            painter.setPen(material.pen)
+            painter.setBrush(material.brush)
+            if material.line_arrays or material.line_rows:
+                painter.drawLines(list(starmap(QLine, _merge(material.line_arrays, material.line_rows))))
+                draw_calls += 1
+            if material.ellipse_arrays or material.ellipse_rows:
+                # QPainter 没有一次画多个椭圆的接口，但画笔、画刷已经设置好，只剩下逐个提交
+                for left, top, width, height in _merge(material.ellipse_arrays, material.ellipse_rows):
+                    painter.drawEllipse(left, top, width, height)
+                    draw_calls += 1
+        self.draw_calls = draw_calls
+        self.state_changes = len(self._materials)
+        self._materials.clear()
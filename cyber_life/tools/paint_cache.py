@@ -0,0 +1,118 @@
+"""
+绘制资源缓存
+绘制代码每帧都在创建画笔、画刷、颜色、字体、渐变，参数其实很少变化。
+这里按样式参数缓存这些 Qt 对象，参数相同时直接返回同一个对象。
+
+透明度按 ALPHA_STEP、线宽按 WIDTH_STEP 取整之后再作为 key，渐变的透明度这类连续变化的参数也只会产生有限个对象。
+缓存有上限，超过之后淘汰最久没有用过的对象。
+返回的对象是共用的，不要修改它们。
+"""
+from collections import OrderedDict
+from typing import Callable, Hashable, TypeVar
+
+from PyQt5.QtGui import QColor, QPen, QBrush, QFont, QLinearGradient
+
+from cyber_life.tools.singleton import SingletonMeta
+
+T = TypeVar('T')
+
+# 渐变的一个颜色节点：位置 0~1，RGBA
+GradientStop = tuple[float, tuple[int, int, int, int]]
+
+
+class PaintCache(metaclass=SingletonMeta):
+    """
+    画笔、画刷、颜色、字体、渐变的缓存，只在界面线程中使用
+
+    >>> cache = PaintCache()
+    >>> cache.pen(224, 159, 0, 101, 8) is cache.pen(224, 159, 0, 99, 8)
+    True
+    >>> cache.pen(224, 159, 0, 101, 8).color().alpha()
+    100
+    """
+
+    MAX_SIZE = 1024
+    # 透明度取整到这个数的倍数，肉眼分辨不出
+    ALPHA_STEP = 4
+    # 线宽取整到这个数的倍数
+    WIDTH_STEP = 0.5
+
+    def __init__(self):
+        self._objects: OrderedDict[Hashable, object] = OrderedDict()
+        # 命中和新建的次数，新建的次数就是省下来之前每帧都要分配的对象之外，还剩下的分配次数
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    @classmethod
+    def quantize_alpha(cls, alpha: float) -> int:
+        return min(255, max(0, round(alpha / cls.ALPHA_STEP) * cls.ALPHA_STEP))
+
+    @classmethod
+    def quantize_width(cls, width: float) -> float:
+        return round(width / cls.WIDTH_STEP) * cls.WIDTH_STEP
+
+    def _get(self, key: Hashable, create: Callable[[], T]) -> T:
+        value = self._objects.get(key)
+        if value is not None:
+            self.hit_count += 1
+            self._objects.move_to_end(key)
+            return value
+        self.miss_count += 1
+        value = self._objects[key] = create()
+        if len(self._objects) > self.MAX_SIZE:
+            self._objects.popitem(last=False)
+        return value
+
+    def color(self, r: int, g: int, b: int, a: float = 255) -> QColor:
+        a = self.quantize_alpha(a)
+        return self._get(('color', r, g, b, a), lambda: QColor(r, g, b, a))
+
+    def named_color(self, name: str) -> QColor:
+        """
+        按名字的颜色，比如 'skyblue'
+        """
+
+        return self._get(('named_color', name), lambda: QColor(name))
+
+    def pen(self, r: int, g: int, b: int, a: float = 255, width: float = 1) -> QPen:
+        a = self.quantize_alpha(a)
+        width = self.quantize_width(width)
+
+        def create():
+            pen = QPen(QColor(r, g, b, a))
+            pen.setWidthF(width)
+            return pen
+
+        return self._get(('pen', r, g, b, a, width), create)
+
+    def brush(self, r: int, g: int, b: int, a: float = 255) -> QBrush:
+        a = self.quantize_alpha(a)
+        return self._get(('brush', r, g, b, a), lambda: QBrush(QColor(r, g, b, a)))
+
+    def font(self, family: str, point_size: int) -> QFont:
+        return self._get(('font', family, point_size), lambda: QFont(family, point_size))
+
+    def linear_gradient(self, x1: float, y1: float, x2: float, y2: float,
+                        stops: tuple[GradientStop, ...]) -> QLinearGradient:
+        """
+        线性渐变，stops 中颜色的透明度同样取整
+        """
+
+        stops = tuple((position, (r, g, b, self.quantize_alpha(a))) for position, (r, g, b, a) in stops)
+
+        def create():
+            gradient = QLinearGradient(x1, y1, x2, y2)
+            for position, rgba in stops:
+                gradient.setColorAt(position, QColor(*rgba))
+            return gradient
+
+        return self._get(('linear_gradient', x1, y1, x2, y2, stops), create)
+
+    def clear(self):
+        self._objects.clear()
+
+
+PAINT_CACHE = PaintCache()
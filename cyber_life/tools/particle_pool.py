@@ -0,0 +1,111 @@
+"""
+定长粒子池
+气泡这类粒子数量多、寿命短，每帧生成新对象、重建列表会不断分配内存。
+粒子池预先按最大数量分配好 NumPy 数组，粒子的每个属性是一列，死亡粒子的槽位留给之后生成的粒子。
+
+同一个粒子流里的粒子运动规律相同，基本上按生成的顺序死亡，所以槽位组成一个环形缓冲区：
+新粒子放在最新的粒子后面，最老的一段粒子死亡后空出来的槽位就是空闲槽位。
+偶尔不按顺序死亡的粒子只是标记为死亡，等前面的粒子都死亡后一起回收。
+"""
+import numpy as np
+
+
+class ParticlePool:
+    """
+    定长粒子池，满了之后再生成粒子会挤掉最老的粒子
+
+    >>> pool = ParticlePool(3, ('x', 'y'))
+    >>> for i in range(4):
+    ...     _ = pool.spawn(x=i, y=i * 10)
+    >>> len(pool), pool.dropped
+    (3, 1)
+    >>> pool['x'][pool.slots()].tolist()
+    [1.0, 2.0, 3.0]
+    >>> pool.kill(pool.slots()[:1])
+    >>> pool['y'][pool.slots()].tolist()
+    [20.0, 30.0]
+    """
+
+    __slots__ = ('capacity', 'dropped', '_columns', '_alive', '_head', '_used', '_count', '_slots')
+
+    def __init__(self, capacity: int, fields: tuple[str, ...]):
+        if capacity <= 0:
+            raise ValueError(f'粒子池的容量必须大于 0: {capacity}')
+        self.capacity = capacity
+        # 满了之后被挤掉的粒子总数
+        self.dropped = 0
+        # 属性名 -> 长度为 capacity 的数组，死亡粒子槽位上的值没有意义
+        self._columns = {field: np.zeros(capacity) for field in fields}
+        self._alive = np.zeros(capacity, dtype=bool)
+        # 最老的粒子所在的槽位，有粒子时这个槽位上的粒子一定活着
+        self._head = 0
+        # 从 _head 开始占用的槽位数，中间可能有已经死亡、还没回收的粒子
+        self._used = 0
+        # 活着的粒子数
+        self._count = 0
+        # slots() 的缓存，生成、杀死粒子之后失效
+        self._slots: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """
+        某个属性的整列数组，用 slots() 取出活着的粒子，可以原地修改
+        """
+
+        return self._columns[field]
+
+    def slots(self) -> np.ndarray:
+        """
+        活着的粒子所在的槽位，按生成的顺序排列
+        """
+
+        if self._slots is None:
+            order = (self._head + np.arange(self._used)) % self.capacity
+            self._slots = order[self._alive[order]]
+        return self._slots
+
+    def spawn(self, **values: float) -> int:
+        """
+        生成一个粒子，没有给出的属性为 0
+        :return: 粒子所在的槽位
+        """
+
+        if self._used == self.capacity:
+            # 没有空闲槽位，挤掉最老的粒子
+            self.dropped += 1
+            self.kill(np.array([self._head]))
+        slot = (self._head + self._used) % self.capacity
+        for field, column in self._columns.items():
+            column[slot] = values.get(field, 0.0)
+        self._alive[slot] = True
+        self._used += 1
+        self._count += 1
+        self._slots = None
+        return slot
+
+    def kill(self, slots: np.ndarray):
+        """
+        杀死这些槽位上的粒子，已经死亡的忽略
+        """
+
+        slots = slots[self._alive[slots]]
+        if len(slots) == 0:
+            return
+        self._alive[slots] = False
+        self._count -= len(slots)
+        self._slots = None
+        # 回收最老的一段死亡粒子
+        if self._count == 0:
+            self._head = self._used = 0
+            return
+        order = (self._head + np.arange(self._used)) % self.capacity
+        first_alive = int(np.argmax(self._alive[order]))
+        self._head = int(order[first_alive])
+        self._used -= first_alive
+
+    def clear(self):
+        self._alive[:] = False
+        self._head = self._used = self._count = 0
+        self._slots = None
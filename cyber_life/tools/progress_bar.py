@@ -1,9 +1,24 @@
+import numpy as np
+
+
 class ProgressFloat:
     """
     进度条类，应用于各种表示有最大上限值的正数。
     此类内部会维护好，让当前值在0到最大值之间变化。
+    += 和 -= 直接修改自身，每帧加减能量、氧气时不会创建新的对象。
+
+    >>> energy = ProgressFloat(90, 100)
+    >>> same = energy
+    >>> energy += 20
+    >>> print(energy, same is energy)
+    100/100 True
+    >>> energy -= 120
+    >>> energy.is_zero()
+    True
     """
 
+    __slots__ = ('current_value', 'max_value')
+
     def __init__(self, current_value: float, max_value: float):
         self.max_value = max_value
         if current_value > max_value:
@@ -54,6 +69,32 @@ class ProgressFloat:
             new_value = 0
         return ProgressFloat(new_value, self.max_value)
 
+    def __iadd__(self, other: float) -> 'ProgressFloat':
+        """
+        实现 +=，直接修改自身
+        """
+
+        new_value = self.current_value + other
+        if new_value > self.max_value:
+            new_value = self.max_value
+        elif new_value < 0:
+            new_value = 0
+        self.current_value = new_value
+        return self
+
+    def __isub__(self, other: float) -> 'ProgressFloat':
+        """
+        实现 -=，直接修改自身
+        """
+
+        new_value = self.current_value - other
+        if new_value < 0:
+            new_value = 0
+        elif new_value > self.max_value:
+            new_value = self.max_value
+        self.current_value = new_value
+        return self
+
     # 实现 <=
     def __le__(self, other: float) -> bool:
         return self.current_value <= other
@@ -85,3 +126,57 @@ class ProgressFloat:
     # 实现 round()
     def __round__(self, n: int) -> float:
         return round(self.current_value, n)
+
+
+class ProgressFloatArray:
+    """
+    一组最大值相同的 ProgressFloat，当前值存在一个 NumPy 数组里
+    生物很多的时候（比如每个 CPU 核一个生物球）用它整体加减，不需要每个生物一个对象
+
+    >>> energy = ProgressFloatArray(np.array([0.0, 50.0, 90.0]), 100)
+    >>> energy += np.array([10.0, 10.0, 20.0])
+    >>> energy.current_values.tolist(), energy.is_max().tolist()
+    ([10.0, 60.0, 100.0], [False, False, True])
+    >>> print(energy[1])
+    60.0/100
+    """
+
+    __slots__ = ('current_values', 'max_value')
+
+    def __init__(self, current_values: np.ndarray, max_value: float):
+        self.max_value = max_value
+        self.current_values = np.clip(np.asarray(current_values, dtype=np.float64), 0, max_value)
+
+    def __len__(self) -> int:
+        return len(self.current_values)
+
+    def __getitem__(self, index: int) -> ProgressFloat:
+        """
+        取出第 index 个，返回的是一份拷贝
+        """
+
+        return ProgressFloat(float(self.current_values[index]), self.max_value)
+
+    def __iadd__(self, other: float | np.ndarray) -> 'ProgressFloatArray':
+        np.add(self.current_values, other, out=self.current_values)
+        np.clip(self.current_values, 0, self.max_value, out=self.current_values)
+        return self
+
+    def __isub__(self, other: float | np.ndarray) -> 'ProgressFloatArray':
+        np.subtract(self.current_values, other, out=self.current_values)
+        np.clip(self.current_values, 0, self.max_value, out=self.current_values)
+        return self
+
+    @property
+    def rate(self) -> np.ndarray:
+        """
+        每一个当前值占总值的比例
+        """
+
+        return self.current_values / self.max_value
+
+    def is_max(self) -> np.ndarray:
+        return self.current_values >= self.max_value
+
+    def is_zero(self) -> np.ndarray:
+        return self.current_values == 0
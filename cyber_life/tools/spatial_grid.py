@@ -0,0 +1,171 @@
+"""
+均匀网格空间索引
+把平面切成边长相同的正方形格子，每个物体只登记在它所在的格子里，
+查找最近的物体时从所在格子开始一圈一圈向外找，不需要遍历全部物体
+"""
+from math import floor, inf
+from typing import Callable, Hashable, Iterator
+
+
+class SpatialGrid:
+    """
+    均匀网格空间索引
+    物体移动后需要调用 move 更新位置，只有跨格子时才会真正改动格子
+
+    >>> grid = SpatialGrid(10)
+    >>> grid.insert('a', 5, 5)
+    >>> grid.insert('b', 42, 18)
+    >>> grid.insert('c', 100, 100)
+    >>> grid.nearest(40, 20)
+    'b'
+    >>> grid.nearest(40, 20, min_y=50)
+    'c'
+    >>> grid.move('c', 1, 1)
+    >>> grid.nearest(0, 0)
+    'c'
+    >>> grid.exists(min_y=50)
+    False
+    >>> grid.remove('b')
+    >>> len(grid)
+    2
+    """
+
+    __slots__ = ('cell_size', '_cells', '_positions', '_bounds')
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        # 格子坐标 -> 格子里的物体，用 dict 当作有序集合，遍历顺序就是插入顺序，结果是确定的
+        self._cells: dict[tuple[int, int], dict[Hashable, None]] = {}
+        # 物体 -> 位置
+        self._positions: dict[Hashable, tuple[float, float]] = {}
+        # 出现过物体的格子范围 (最小列, 最小行, 最大列, 最大行)，只扩大不缩小，用于限定向外查找的圈数
+        self._bounds: tuple[int, int, int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._positions
+
+    def _cell_of(self, x: float, y: float) -> tuple[int, int]:
+        return floor(x / self.cell_size), floor(y / self.cell_size)
+
+    def insert(self, item: Hashable, x: float, y: float):
+        """
+        登记一个新物体
+        """
+
+        assert item not in self._positions, '物体已经在网格中'
+
+        self._positions[item] = (x, y)
+        cell = self._cell_of(x, y)
+        self._cells.setdefault(cell, {})[item] = None
+
+        if self._bounds is None:
+            self._bounds = (cell[0], cell[1], cell[0], cell[1])
+        else:
+            min_cx, min_cy, max_cx, max_cy = self._bounds
+            self._bounds = (min(min_cx, cell[0]), min(min_cy, cell[1]), max(max_cx, cell[0]), max(max_cy, cell[1]))
+
+    def remove(self, item: Hashable):
+        """
+        移除一个物体
+        """
+
+        x, y = self._positions.pop(item)
+        cell = self._cell_of(x, y)
+        items = self._cells[cell]
+        del items[item]
+        if not items:
+            del self._cells[cell]
+        if not self._positions:
+            self._bounds = None
+
+    def move(self, item: Hashable, x: float, y: float):
+        """
+        更新物体的位置
+        """
+
+        old_x, old_y = self._positions[item]
+        old_cell = self._cell_of(old_x, old_y)
+        new_cell = self._cell_of(x, y)
+        if old_cell == new_cell:
+            self._positions[item] = (x, y)
+            return
+        self.remove(item)
+        self.insert(item, x, y)
+
+    def _ring(self, cx: int, cy: int, ring: int) -> Iterator[tuple[int, int]]:
+        """
+        以 (cx, cy) 为中心，第 ring 圈上的所有格子坐标
+        """
+
+        if ring == 0:
+            yield cx, cy
+            return
+        for x in range(cx - ring, cx + ring + 1):
+            yield x, cy - ring
+            yield x, cy + ring
+        for y in range(cy - ring + 1, cy + ring):
+            yield cx - ring, y
+            yield cx + ring, y
+
+    def nearest(
+            self,
+            x: float,
+            y: float,
+            min_y: float = -inf,
+            predicate: Callable[[Hashable], bool] | None = None
+    ) -> Hashable | None:
+        """
+        查找离 (x, y) 最近的物体
+
+        :param x: 查找位置
+        :param y: 查找位置
+        :param min_y: 只查找 y >= min_y 的物体
+        :param predicate: 只查找满足条件的物体
+        :return: 最近的物体，没有则返回 None
+        """
+
+        if self._bounds is None:
+            return None
+
+        cx, cy = self._cell_of(x, y)
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+        min_row = max(min_cy, floor(min_y / self.cell_size)) if min_y != -inf else min_cy
+        max_ring = max(cx - min_cx, max_cx - cx, cy - min_row, max_cy - cy)
+
+        best = None
+        best_d2 = inf
+        for ring in range(max_ring + 1):
+            # 第 ring 圈上的物体离查找位置至少有 (ring - 1) 个格子的距离，已经找到的更近就不用再找了
+            if ring > 1 and best_d2 <= ((ring - 1) * self.cell_size) ** 2:
+                break
+            for cell in self._ring(cx, cy, ring):
+                if cell[1] < min_row:
+                    continue
+                items = self._cells.get(cell)
+                if not items:
+                    continue
+                for item in items:
+                    item_x, item_y = self._positions[item]
+                    if item_y < min_y or (predicate is not None and not predicate(item)):
+                        continue
+                    d2 = (item_x - x) ** 2 + (item_y - y) ** 2
+                    if d2 < best_d2:
+                        best, best_d2 = item, d2
+        return best
+
+    def exists(self, min_y: float = -inf, predicate: Callable[[Hashable], bool] | None = None) -> bool:
+        """
+        是否存在 y >= min_y 且满足条件的物体
+        """
+
+        min_row = floor(min_y / self.cell_size) if min_y != -inf else None
+        for (_, cell_y), items in self._cells.items():
+            if min_row is not None and cell_y < min_row:
+                continue
+            for item in items:
+                if self._positions[item][1] >= min_y and (predicate is None or predicate(item)):
+                    return True
+        return False
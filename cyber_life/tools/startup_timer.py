@@ -0,0 +1,62 @@
+"""
+启动耗时统计
+记录从程序启动到第一帧画面之间每个阶段花了多少时间，方便找出拖慢启动的地方
+"""
+import logging
+import time
+
+from cyber_life.tools.singleton import SingletonMeta
+
+lg = logging.getLogger(__name__)
+
+
+class StartupTimer(metaclass=SingletonMeta):
+    """
+    启动计时器，第一次导入时开始计时
+    每调用一次 mark 记录一个阶段，阶段耗时为距离上一次 mark 的时间
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._last = self._start
+        # (阶段名称, 耗时 秒)
+        self.records: list[tuple[str, float]] = []
+        self.is_reported = False
+
+    def mark(self, stage: str):
+        """
+        记录一个阶段结束，报告输出之后不再记录
+        """
+
+        if self.is_reported:
+            return
+        now = time.perf_counter()
+        self.records.append((stage, now - self._last))
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        """
+        从开始计时到最后一次 mark 的总耗时，秒
+        """
+
+        return self._last - self._start
+
+    def report(self):
+        """
+        输出启动耗时报告，只输出一次
+        """
+
+        if self.is_reported:
+            return
+        self.is_reported = True
+
+        total = self.total
+        lines = [f'启动到第一帧画面共耗时 {total * 1000:.1f} ms']
+        for stage, cost in self.records:
+            percent = cost / total * 100 if total > 0 else 0
+            lines.append(f'  {stage:<20} {cost * 1000:8.1f} ms {percent:5.1f}%')
+        lg.info('\n'.join(lines))
+
+
+STARTUP_TIMER = StartupTimer()
@@ -1,5 +1,5 @@
 from math import cos, sin, pi, hypot, dist, radians
-from random import uniform
+from random import Random, uniform
 
 
 class Vector:
@@ -8,6 +8,8 @@ class Vector:
     可以进行向量间的加减乘、判断相等、计算距离
     可以对向量取模、旋转、归一化
     GUI普遍以左上角为坐标原点
+    每一帧都要大量计算的地方，尽量用 +=、-=、*=、move_towards、add_scaled 原地修改，不创建新的对象
+    类型检查用的是 assert，用 python -O 运行（或者打包时加 --optimize 1）时会被去掉
     坐标轴：
     ┌─────────► x
     │
@@ -36,6 +38,17 @@ class Vector:
     Vector(-2.0, 1.0)
     >>> Vector(1, 1).normalize()
     Vector(0.7071067811865475, 0.7071067811865475)
+    >>> v = Vector(1, 2)
+    >>> v += Vector(3, 4)
+    >>> v *= 2
+    >>> v
+    Vector(8, 12)
+    >>> Vector(0, 0).move_towards(Vector(3, 4), 2)
+    Vector(1.2000000000000002, 1.6)
+    >>> Vector(0, 0).move_towards(Vector(3, 4), 10)
+    Vector(3, 4)
+    >>> Vector(1, 2).add_scaled(Vector(3, 4), 0.5)
+    Vector(2.5, 4.0)
     """
 
     __slots__ = ('x', 'y')
@@ -68,6 +81,27 @@ class Vector:
         assert isinstance(other, (int, float))
         return Vector(self.x * other, self.y * other)
 
+    def __iadd__(self, other: 'Vector') -> 'Vector':
+        """ self += other，原地修改 """
+        assert isinstance(other, Vector)
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other: 'Vector') -> 'Vector':
+        """ self -= other，原地修改 """
+        assert isinstance(other, Vector)
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, other: int | float) -> 'Vector':
+        """ self *= other，原地修改 """
+        assert isinstance(other, (int, float))
+        self.x *= other
+        self.y *= other
+        return self
+
     def __truediv__(self, other: int | float) -> 'Vector':
         """ Return self / other. """
         assert isinstance(other, (int, float))
@@ -94,10 +128,40 @@ class Vector:
         将向量限制在最大长度范围内
         """
 
-        if abs(self) > max_length:
-            new_self = (self * max_length).normalize()
-            self.x, self.y = new_self.x, new_self.y
+        length = abs(self)
+        if length > max_length:
+            # 和原来的 (self * max_length).normalize() 结果相同：变成了单位向量
+            self.x /= length
+            self.y /= length
+
+        return self
+
+    def add_scaled(self, other: 'Vector', k: int | float) -> 'Vector':
+        """
+        self += other * k，原地修改，不创建中间向量
+        """
+
+        assert isinstance(other, Vector) and isinstance(k, (int, float))
+        self.x += other.x * k
+        self.y += other.y * k
+        return self
+
+    def move_towards(self, target: 'Vector', step: int | float) -> 'Vector':
+        """
+        原地向着 target 移动 step 的距离，不会越过 target
+        相当于 self += (target - self).normalize() * step，但不创建中间向量
+        """
 
+        assert isinstance(target, Vector) and isinstance(step, (int, float))
+        dx = target.x - self.x
+        dy = target.y - self.y
+        distance = hypot(dx, dy)
+        if distance <= step:
+            self.x, self.y = target.x, target.y
+        else:
+            k = step / distance
+            self.x += dx * k
+            self.y += dy * k
         return self
 
     # 角度偏转
@@ -115,12 +179,13 @@ class Vector:
         return Vector(self.x * cos_val - self.y * sin_val, self.x * sin_val + self.y * cos_val)
 
     @classmethod
-    def random(cls, length: int | float = 1):
+    def random(cls, length: int | float = 1, rng: Random | None = None):
         """
         一个方向随机的指定长度的向量
+        :param rng: 使用的随机数流，默认使用 random 模块
         """
 
-        theta = uniform(0, pi * 2)
+        theta = rng.uniform(0, pi * 2) if rng is not None else uniform(0, pi * 2)
         return Vector(cos(theta) * length, sin(theta) * length)
 
     def normalize(self):
@@ -4,8 +4,10 @@
 import logging
 import sys
 
+# 最先导入，开始统计启动耗时
+from cyber_life.tools.startup_timer import STARTUP_TIMER
 from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QPainter, QColor, QIcon, QFont
+from PyQt5.QtGui import QPainter, QIcon, QFont
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QSystemTrayIcon, qApp, QMenu
 
 # 引入assets文件夹中的资源文件
@@ -14,19 +16,28 @@ from assets import assets
 from cyber_life.computer_hook.manager import SYSTEM_HOOK_MANAGER
 from cyber_life.computer_info.manager import SYSTEM_INFO_MANAGER
 from cyber_life.gui.settings_dialog import SettingsDialog
+from cyber_life.life.fast_forward import FAST_FORWARD
 from cyber_life.life.gas_manager import GAS_MANAGER
 from cyber_life.life.life_manager import LifeManager
 from cyber_life.life.tank import LIFE_TANK
+from cyber_life.service.game_loop import GAME_LOOP
+from cyber_life.service.power_mode import POWER_MODE
+from cyber_life.service.replay import InputRecorder
+from cyber_life.service.rng import RNG
 from cyber_life.service.settings import SETTINGS
-from cyber_life.static import TANK_SCREEN_WIDTH, LOG_FORMAT
+from cyber_life.service.snapshot import TANK_SNAPSHOT
+from cyber_life.static import TANK_SCREEN_WIDTH, LOG_FORMAT, RANDOM_SEED, INPUT_RECORD_FILE
+from cyber_life.static import TANK_SNAPSHOT_FILE, TANK_SNAPSHOT_INTERVAL
+from cyber_life.tools.dirty_region import DirtyRegion
+from cyber_life.tools.paint_cache import PAINT_CACHE
+
+STARTUP_TIMER.mark('导入模块')
 
 logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
 lg = logging.getLogger(__name__)
 
 
 class MainWindow(QWidget):
-    INTERVAL = 10  # 刷新间隔（ms）
-
     def __init__(self):
         lg.debug('MainWindow 初始化')
 
@@ -79,6 +90,8 @@ class MainWindow(QWidget):
         # 窗口被拖动的位置
         self.m_drag_position = None
         self.life_manager = LifeManager()
+        # 每帧只重绘变化的区域
+        self.dirty_region = DirtyRegion(self.width(), self.height())
 
         # 悬浮提示文字
         font = QFont()
@@ -96,6 +109,15 @@ class MainWindow(QWidget):
         self.dialog = SettingsDialog(self)
         # 绑定到 self 上另一个目的：防止引用计数减为 0 而触发 GC 回收
 
+        # 刷新定时器，间隔由省电模式决定，可见时按显示器的刷新率绘制，每次绘制之前按固定步长补上模拟
+        self.timer = QTimer(self, interval=POWER_MODE.interval, timeout=self.tick, timerType=Qt.PreciseTimer)
+        # 定时保存快照，防止断电、崩溃时丢失太多
+        self.snapshot_timer = QTimer(self, interval=TANK_SNAPSHOT_INTERVAL, timeout=self.save_snapshot)
+        # 接上、拔掉屏幕时重新确定检测的区域
+        # 拔掉的屏幕上的窗口要等 Qt 移到别的屏幕上之后才知道在哪，所以放到下一次事件循环
+        qApp.screenAdded.connect(lambda screen: QTimer.singleShot(0, self.update_screen))
+        qApp.screenRemoved.connect(lambda screen: QTimer.singleShot(0, self.update_screen))
+
     def __del__(self):
         lg.debug('MainWindow 析构')
 
@@ -115,6 +137,36 @@ class MainWindow(QWidget):
         self.hover_text_label.hide()
         super().leaveEvent(event)
 
+    def showEvent(self, event):
+        """
+        窗口显示
+        先恢复正常的刷新频率，窗口真正出现在屏幕上之后就会退出省电模式
+        """
+
+        self.timer.setInterval(GAME_LOOP.render_interval)
+        # 隐藏期间没有报告过变化的区域，重新显示之后的第一帧整个重绘
+        self.dirty_region.invalidate()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        """
+        窗口隐藏，进入省电模式
+        """
+
+        self.update_power_mode()
+        super().hideEvent(event)
+
+    def update_power_mode(self):
+        """
+        检查小鱼缸是否能被看到，隐藏、最小化、被完全挡住时都看不到
+        """
+
+        window = self.windowHandle()
+        is_visible = self.isVisible() and window is not None and window.isExposed()
+        POWER_MODE.set_visible(is_visible)
+        if self.timer.interval() != POWER_MODE.interval:
+            self.timer.setInterval(POWER_MODE.interval)
+
     def showSettingsDialog(self):
         """
         显示设置对话框
@@ -147,6 +199,36 @@ class MainWindow(QWidget):
             self.move(event.globalPos() - self.m_drag_position)
             event.accept()
 
+    def moveEvent(self, event):
+        """
+        窗口移动
+        """
+
+        self.update_screen()
+        super().moveEvent(event)
+
+    def update_screen(self):
+        """
+        有多块屏幕时，屏幕亮度只检测小鱼缸所在的那一块，只剩一块屏幕时检测主屏幕
+        绘制跟随小鱼缸所在屏幕的刷新率
+        """
+
+        screen = self.screen()
+        GAME_LOOP.set_display_refresh_rate(screen.refreshRate())
+        if len(QApplication.screens()) > 1:
+            # Qt 的坐标是缩放后的逻辑像素，截图用的是物理像素
+            ratio = screen.devicePixelRatio()
+            geometry = screen.geometry()
+            SYSTEM_INFO_MANAGER.INSPECTOR_SCREEN.region = (
+                round(geometry.left() * ratio),
+                round(geometry.top() * ratio),
+                round((geometry.right() + 1) * ratio),
+                round((geometry.bottom() + 1) * ratio),
+            )
+        else:
+            # 原来的副屏已经拔掉了，之前的区域可能已经不存在，截到的是黑的
+            SYSTEM_INFO_MANAGER.INSPECTOR_SCREEN.region = None
+
     def mouseReleaseEvent(self, event):
         """
         鼠标释放
@@ -159,16 +241,56 @@ class MainWindow(QWidget):
     def tick(self):
         """
         更新窗口内图像
+        先按固定步长补上距离上一次过去的时间，再画出最近两帧之间插值的样子
+        看不到小鱼缸时不绘制，只补上这段时间的模拟
+        电脑睡眠之后先把错过的时间快进过去
         """
 
-        self.life_manager.tick()
+        self.update_power_mode()
+        missed_ticks = POWER_MODE.missed_ticks()
+        if missed_ticks:
+            FAST_FORWARD.advance(self.life_manager, missed_ticks)
+            # 快进过的时间不再逐帧模拟
+            GAME_LOOP.reset()
+        if not POWER_MODE.is_visible:
+            for _ in range(POWER_MODE.catch_up_ticks()):
+                self.life_manager.tick()
+            # 省电模式已经补过了，重新显示时从那一刻开始计时
+            GAME_LOOP.reset()
+            self.dirty_region.invalidate()
+            return
+
+        ticks = GAME_LOOP.advance()
+        # 几次卡顿叠在一起积压太多时，最早的部分快进过去
+        FAST_FORWARD.advance(self.life_manager, GAME_LOOP.missed_ticks())
+        for _ in range(ticks):
+            self.life_manager.tick()
 
         o2 = round(GAS_MANAGER.oxygen, 2)
         co2 = round(GAS_MANAGER.carbon_dioxide, 2)
         brightness = round(SYSTEM_INFO_MANAGER.INSPECTOR_SCREEN.get_current_result(), 2)
         self.hover_text_label.setText(f"O₂: {o2}\nCO₂: {co2}\nbright: {brightness}")
 
-        self.update()  # 会调用 paintEvent
+        # 会调用 paintEvent，只重绘上一次和这一次绘制时变化的地方，变化太多时整个重绘
+        # 没有模拟新的帧时插值的比例也变了，所以每次都要报告、重绘
+        self.life_manager.report_bounds(self.dirty_region, GAME_LOOP.blend)
+        region = self.dirty_region.take()
+        if region is None:
+            self.update()
+        else:
+            self.update(region)
+
+    def save_snapshot(self):
+        """
+        保存小鱼缸快照
+        """
+
+        if TANK_SNAPSHOT_FILE is None:
+            return
+        try:
+            TANK_SNAPSHOT.save(self.life_manager, TANK_SNAPSHOT_FILE)
+        except OSError as e:
+            lg.warning(f'保存快照失败: {e}')
 
     def paintEvent(self, event):
         """
@@ -179,11 +301,29 @@ class MainWindow(QWidget):
         painter = QPainter(self)
 
         # 背景颜色
-        painter.fillRect(event.rect(), QColor(20, 20, 20, 255))
-        self.life_manager.paint(painter)
+        painter.fillRect(event.rect(), PAINT_CACHE.color(20, 20, 20, 255))
+        self.life_manager.paint(painter, GAME_LOOP.blend)
+
+        if not STARTUP_TIMER.is_reported:
+            STARTUP_TIMER.mark('第一帧绘制')
+            STARTUP_TIMER.report()
 
     def closeEvent(self, event):
         """重写closeEvent方法，用于关闭窗口时释放资源"""
+        lg.info(f'省电模式累计省下 CPU 时间 {POWER_MODE.cpu_time_saved:.2f} 秒')
+        self.save_snapshot()
+        lg.info(f'保存快照 {TANK_SNAPSHOT.last_size} 字节，耗时 {TANK_SNAPSHOT.last_save_seconds * 1000:.2f} ms')
+        lg.info(f'绘制资源缓存命中 {PAINT_CACHE.hit_count} 次，新建 {PAINT_CACHE.miss_count} 次，'
+                f'现有 {len(PAINT_CACHE)} 个')
+        if self.dirty_region.frame_count:
+            lg.info(f'重绘 {self.dirty_region.frame_count} 帧，其中整个窗口重绘 {self.dirty_region.full_count} 帧，'
+                    f'平均重绘面积 {self.dirty_region.area_rate_total / self.dirty_region.frame_count:.1%}')
+        if GAME_LOOP.frame_count:
+            lg.info(f'绘制 {GAME_LOOP.frame_count} 次，模拟 {GAME_LOOP.tick_count} 帧，'
+                    f'其中 {GAME_LOOP.clamped_count} 次达到每次最多模拟的帧数，'
+                    f'机器跟不上丢掉 {GAME_LOOP.dropped_seconds:.2f} 秒')
+        if self.life_manager.input_hook is not None:
+            self.life_manager.input_hook.close()
         SYSTEM_INFO_MANAGER.stop()
         SYSTEM_HOOK_MANAGER.stop()
         assets.qCleanupResources()  # 释放图像资源
@@ -193,6 +333,11 @@ class MainWindow(QWidget):
 def main():
     lg.info('赛博小鱼缸启动')
 
+    # 必须在创建生物之前指定种子
+    if RANDOM_SEED is not None:
+        RNG.seed(RANDOM_SEED)
+    lg.info(f'随机数种子 {RNG.master_seed}')
+
     try:
         # 启动系统信息管理器
         SYSTEM_INFO_MANAGER.start()
@@ -200,15 +345,34 @@ def main():
         # 启动钩子管理器
         SYSTEM_HOOK_MANAGER.start()
         lg.info('HOOK_MANAGER 启动成功')
+        STARTUP_TIMER.mark('启动监测和钩子线程')
 
         app = QApplication(sys.argv)
+        STARTUP_TIMER.mark('创建 QApplication')
+
+        # 小鱼缸和主屏幕同比例，屏幕大小直接从 QScreen 获取，不需要截屏
+        screen_size = app.primaryScreen().size()
+        LIFE_TANK.resize_by_screen(screen_size.width(), screen_size.height())
+        # 绘制跟随显示器的刷新率，static.RENDER_RATE 指定了绘制频率时不变
+        GAME_LOOP.set_display_refresh_rate(app.primaryScreen().refreshRate())
 
         main_window = MainWindow()
+        # 从托盘菜单退出时不会触发 closeEvent
+        app.aboutToQuit.connect(main_window.save_snapshot)
+        if INPUT_RECORD_FILE:
+            main_window.life_manager.input_hook = InputRecorder(
+                INPUT_RECORD_FILE, RNG.master_seed, LIFE_TANK.width, LIFE_TANK.height
+            )
+        STARTUP_TIMER.mark('创建主窗口')
+        # 记录输入时从头开始，回放时才能得到同样的结果
+        if TANK_SNAPSHOT_FILE is not None and not INPUT_RECORD_FILE:
+            TANK_SNAPSHOT.restore(main_window.life_manager, TANK_SNAPSHOT_FILE)
+            STARTUP_TIMER.mark('恢复快照')
         main_window.show()
+        STARTUP_TIMER.mark('显示主窗口')
 
-        # interval 设置为 10 表示每 10ms 刷新一次窗口
-        timer = QTimer(interval=main_window.INTERVAL, timeout=main_window.tick)  # FPS
-        timer.start()
+        main_window.timer.start()
+        main_window.snapshot_timer.start()
 
         sys.exit(app.exec_())
 